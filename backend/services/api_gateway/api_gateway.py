@@ -7,6 +7,7 @@ import os
 import json
 import logging
 import requests
+import socket
 import time
 from datetime import datetime
 from flask import Flask, request, jsonify
@@ -15,6 +16,8 @@ from flask_socketio import SocketIO, emit
 import redis
 from dotenv import load_dotenv
 
+from backend.services.common.tick_codec import decode_message, public_event
+from backend.services.common.transport import subscribe
 from backend.services.api_gateway.service_registry import service_registry
 from backend.services.api_gateway.latency_monitor import LatencyMonitor
 # from service_registry import service_registry
@@ -70,73 +73,61 @@ except Exception as e:
     logger.warning(f"⚠️ Redis connection failed: {e}")
     redis_client = None
 
-def redis_price_update_listener():
-    if not redis_client:
-        logger.warning("Redis not initialized; no real‑time updates.")
-        return
+# Consumer group when BUS_TRANSPORT=streams; one group per gateway so every instance sees every message
+API_GATEWAY_BUS_GROUP = os.getenv('API_GATEWAY_BUS_GROUP', f"api_gateway-{socket.gethostname()}")
+bus_subscribers = {}
 
-    pubsub = redis_client.pubsub()
-    pubsub.subscribe('price_updates')
-    logger.info("🔔 Subscribed to price_updates channel")
+def listen_and_emit(channel: str, emit_message):
+    """Read a bus channel and hand each decoded payload to emit_message"""
+    subscriber = subscribe(redis_client, [channel], group=API_GATEWAY_BUS_GROUP)
+    bus_subscribers[channel] = subscriber
+    logger.info(f"🔔 Subscribed to {channel} channel ({subscriber.transport})")
 
     while True:
         try:
-            message = pubsub.get_message(timeout=1)
-            if message and message['type'] == 'message':
+            messages = subscriber.read(timeout=1)
+            for message in messages:
                 try:
-                    data = json.loads(message['data'])
-                    # emit to all connected WebSocket clients
-                    socketio.emit('price_update', data)
-                    logger.info(f"Emitted price update: {data['symbol']}")
+                    emit_message(message.data)
                 except Exception as e:
-                    logger.error(f"Error emitting price update: {e}")
+                    logger.error(f"Error emitting {channel} message: {e}")
+            subscriber.ack(messages)
             # yield to eventlet
             socketio.sleep(0.1)
         except Exception as e:
-            logger.error(f"Redis listener error: {e}")
+            logger.error(f"Redis {channel} listener error: {e}")
             # Try to reconnect
             try:
-                pubsub.close()
-                pubsub = redis_client.pubsub()
-                pubsub.subscribe('price_updates')
-                logger.info("Reconnected to Redis pub/sub")
+                subscriber.reconnect()
+                logger.info(f"Reconnected to Redis for {channel}")
             except Exception as reconnect_error:
-                logger.error(f"Failed to reconnect to Redis: {reconnect_error}")
+                logger.error(f"Failed to reconnect to Redis for {channel}: {reconnect_error}")
                 socketio.sleep(5)  # Wait before retrying
 
+def emit_price_update(payload):
+    # Ticks may arrive binary; browsers always get JSON
+    data = public_event(decode_message(payload))
+    # emit to all connected WebSocket clients
+    socketio.emit('price_update', data)
+    logger.info(f"Emitted price update: {data['symbol']}")
+
+def emit_arbitrage_signal(payload):
+    signal = json.loads(payload)
+    # emit to all connected WebSocket clients
+    socketio.emit('arbitrage_signal', signal)
+    logger.info(f"Emitted arbitrage signal: {signal.get('type', 'unknown')} - {signal.get('spread_percentage', 0):.2f}%")
+
+def redis_price_update_listener():
+    if not redis_client:
+        logger.warning("Redis not initialized; no real‑time updates.")
+        return
+    listen_and_emit('price_updates', emit_price_update)
+
 def redis_arbitrage_signals_listener():
     if not redis_client:
         logger.warning("Redis not initialized; no arbitrage signal updates.")
         return
-
-    pubsub = redis_client.pubsub()
-    pubsub.subscribe('arbitrage_signals')
-    logger.info("🔔 Subscribed to arbitrage_signals channel")
-
-    while True:
-        try:
-            message = pubsub.get_message(timeout=1)
-            if message and message['type'] == 'message':
-                try:
-                    signal = json.loads(message['data'])
-                    # emit to all connected WebSocket clients
-                    socketio.emit('arbitrage_signal', signal)
-                    logger.info(f"Emitted arbitrage signal: {signal.get('type', 'unknown')} - {signal.get('spread_percentage', 0):.2f}%")
-                except Exception as e:
-                    logger.error(f"Error emitting arbitrage signal: {e}")
-            # yield to eventlet
-            socketio.sleep(0.1)
-        except Exception as e:
-            logger.error(f"Arbitrage signals Redis listener error: {e}")
-            # Try to reconnect
-            try:
-                pubsub.close()
-                pubsub = redis_client.pubsub()
-                pubsub.subscribe('arbitrage_signals')
-                logger.info("Reconnected to arbitrage signals Redis pub/sub")
-            except Exception as reconnect_error:
-                logger.error(f"Failed to reconnect to arbitrage signals Redis: {reconnect_error}")
-                socketio.sleep(5)  # Wait before retrying
+    listen_and_emit('arbitrage_signals', emit_arbitrage_signal)
 
 # Initialize latency monitor
 latency_monitor = LatencyMonitor(redis_client)
@@ -225,6 +216,7 @@ def health_check():
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
         'redis_connected': redis_client is not None,
+        'bus': {channel: subscriber.get_stats() for channel, subscriber in bus_subscribers.items()},
         'services_registered': list(service_registry.get_all_services().keys()),
         'port': os.getenv('PORT', '5000'),
         'host': '0.0.0.0'
@@ -269,6 +261,16 @@ def rule_test_routing(rule_id):
     """Route CEP rule test requests to CEP engine service"""
     return route_request("cep_engine", f"/rules/{rule_id}/test", "POST")
 
+@app.route('/api/rules/backtest', methods=['POST'])
+def rules_backtest_routing():
+    """Route CEP rule backtest requests to CEP engine service"""
+    return route_request("cep_engine", "/rules/backtest", "POST")
+
+@app.route('/api/rules/<int:rule_id>/profile', methods=['GET'])
+def rule_profile_routing(rule_id):
+    """Route CEP rule profile requests to CEP engine service"""
+    return route_request("cep_engine", f"/rules/{rule_id}/profile", "GET")
+
 @app.route('/api/tasks', methods=['GET', 'POST'])
 def task_routing():
     """Route task requests to celery worker service"""
@@ -14,6 +14,9 @@ from flask_cors import CORS
 import redis
 from dotenv import load_dotenv
 
+from backend.services.common.tick_codec import decode_message
+from backend.services.common.transport import publish, subscribe
+
 # Load environment variables
 load_dotenv()
 
@@ -80,7 +83,7 @@ ARBITRAGE_CONFIG = {
 demo_signals = [
     {
         'id': 1,
-        'symbols': ['BTCUSDT', 'ETHUSDT'],
+        'symbols': ['BTC/USDT', 'ETH/USDT'],
         'prices': [45000.0, 3200.0],
         'spread': 0.85,
         'spread_percentage': 0.85,
@@ -100,7 +103,7 @@ demo_signals = [
     },
     {
         'id': 3,
-        'symbols': ['ADAUSDT', 'DOTUSDT'],
+        'symbols': ['ADA/USDT', 'DOT/USDT'],
         'prices': [0.45, 6.80],
         'spread': 0.12,
         'spread_percentage': 0.45,
@@ -117,17 +120,27 @@ signal_id_counter = len(demo_signals) + 1
 # In-memory price cache for HFT-style detection
 latest_prices = {}
 
+# Consumer group when BUS_TRANSPORT=streams
+ARBITRAGE_BUS_GROUP = os.getenv('ARBITRAGE_BUS_GROUP', 'arbitrage')
+bus_subscriber = None
+
 def redis_price_listener():
     """Listen for price updates from Redis and update in-memory cache"""
+    global bus_subscriber
     if not redis_client:
         return
-    pubsub = redis_client.pubsub()
-    pubsub.subscribe('price_updates')
-    logger.info("👂 Listening for price updates...")
-    for message in pubsub.listen():
-        if message['type'] == 'message':
+    bus_subscriber = subscribe(redis_client, ['price_updates'], group=ARBITRAGE_BUS_GROUP)
+    logger.info(f"👂 Listening for price updates ({bus_subscriber.transport})...")
+    while True:
+        try:
+            messages = bus_subscriber.read(timeout=1.0)
+        except Exception as e:
+            logger.error(f"Error reading price updates: {e}")
+            time.sleep(1)
+            continue
+        for message in messages:
             try:
-                data = json.loads(message['data'])
+                data = decode_message(message.data)
                 symbol = data['symbol']
                 price = data['price']
                 timestamp = data.get('timestamp')
@@ -135,6 +148,10 @@ def redis_price_listener():
                 detect_arbitrage_opportunities()
             except Exception as e:
                 logger.error(f"Error processing price update: {e}")
+        try:
+            bus_subscriber.ack(messages)
+        except Exception as e:
+            logger.error(f"Error acknowledging price updates: {e}")
 
 
 def detect_arbitrage_opportunities():
@@ -284,7 +301,7 @@ def create_arbitrage_signal(opportunity):
             redis_client.expire(signal_key, 86400)  # 24 hours
             
             # Publish to Redis channel
-            redis_client.publish('arbitrage_signals', json.dumps(signal))
+            publish(redis_client, 'arbitrage_signals', json.dumps(signal))
         
         logger.info(f"🚨 Arbitrage signal created: {signal['type']} - {signal['spread_percentage']:.2f}% spread ({severity})")
         
@@ -310,7 +327,8 @@ def health_check():
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
         'signals_count': len(arbitrage_signals),
-        'redis_connected': redis_client is not None
+        'redis_connected': redis_client is not None,
+        'bus': bus_subscriber.get_stats() if bus_subscriber else None
     })
 
 @app.route('/signals', methods=['GET'])
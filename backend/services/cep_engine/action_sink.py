@@ -0,0 +1,121 @@
+"""
+ASCEP CEP Engine - Action Sink
+Buffers rule action messages per channel and publishes them through Redis
+pipelines on a background thread, so a slow Redis never stalls evaluation.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Tuple
+
+from backend.services.common.transport import publish
+
+logger = logging.getLogger(__name__)
+
+
+class ActionSink:
+    """Bounded, batched publisher for CEP rule actions"""
+
+    def __init__(self, redis_client, max_queue: int = 10000, batch_size: int = 200,
+                 flush_interval: float = 0.1, dumps: Callable = json.dumps):
+        self.redis_client = redis_client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dumps = dumps
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.stats = {
+            'submitted': 0,
+            'published': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'flush_errors': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+
+        # Start background flush thread
+        self.running = True
+        self.flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flush_thread.start()
+
+    def submit(self, channel: str, message: Dict) -> bool:
+        """Queue one action message; drops it (and counts the drop) when the queue is full"""
+        try:
+            self.queue.put_nowait((channel, message))
+        except queue.Full:
+            with self.lock:
+                self.stats['dropped'] += 1
+            return False
+        with self.lock:
+            self.stats['submitted'] += 1
+        return True
+
+    def submit_many(self, actions: Iterable[Tuple[str, Dict]]):
+        """Queue a batch of (channel, message) actions"""
+        for channel, message in actions:
+            self.submit(channel, message)
+
+    def _flush_loop(self):
+        """Collect queued actions until the size or time threshold, then flush"""
+        while self.running:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        """Serialize and publish a batch, grouped per channel, in one pipeline"""
+        channels = {}
+        for channel, message in batch:
+            channels.setdefault(channel, []).append(message)
+
+        start = time.perf_counter()
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for channel, messages in channels.items():
+                for message in messages:
+                    publish(pipe, channel, self.dumps(message))
+            pipe.execute()
+            failed = False
+        except Exception as e:
+            failed = True
+            logger.error(f"Error flushing {len(batch)} CEP actions: {e}")
+        flush_ms = (time.perf_counter() - start) * 1000
+
+        with self.lock:
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = flush_ms
+            self.stats['total_flush_ms'] += flush_ms
+            if flush_ms > self.stats['max_flush_ms']:
+                self.stats['max_flush_ms'] = flush_ms
+            if failed:
+                self.stats['flush_errors'] += 1
+                self.stats['dropped'] += len(batch)
+            else:
+                self.stats['published'] += len(batch)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+        stats['queued'] = self.queue.qsize()
+        stats['avg_flush_ms'] = stats['total_flush_ms'] / stats['flushes'] if stats['flushes'] else 0
+        return stats
+
+    def stop(self):
+        """Stop the flush thread"""
+        self.running = False
+        if self.flush_thread.is_alive():
+            self.flush_thread.join()
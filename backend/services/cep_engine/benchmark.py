@@ -0,0 +1,314 @@
+"""
+ASCEP CEP Engine - Throughput Benchmark
+Synthetic load generator and benchmark harness for the CEP engine.
+
+In-process mode drives `process_event` directly (no Redis, no action
+publishing) and reports events/sec, per-event latency percentiles and the
+memory cost of compiled rules. End-to-end mode publishes the same stream to a
+local Redis, registers the rules on a running engine through its HTTP API and
+measures event-to-action latency with probe events.
+
+    python -m backend.services.cep_engine.benchmark inprocess --rules 1000 --events 200000
+    python -m backend.services.cep_engine.benchmark e2e --rules 200 --rate 5000 --duration 30
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import threading
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from backend.services.cep_engine.profiling import percentile
+from backend.services.common.transport import publish
+
+DEFAULT_MIX = 'price_spike=0.3,volume_surge=0.2,trend_reversal=0.2,price_move_arbitrage=0.1,custom=0.2'
+PROBE_MARKER = 'cep-bench-probe'
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'pattern=weight,...' into normalized weights"""
+    weights = {}
+    for item in mix.split(','):
+        pattern, _, weight = item.partition('=')
+        weights[pattern.strip()] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("rule mix weights must sum to a positive number")
+    return {pattern: weight / total for pattern, weight in weights.items()}
+
+
+def symbol_names(count: int) -> List[str]:
+    return [f"SYM{index}/USD" for index in range(count)]
+
+
+def generate_rules(count: int, mix: Dict[str, float], symbols: List[str], seed: int = 1) -> List[Dict]:
+    """Rule definitions with varied parameters, so only part of the graph is shared"""
+    rng = random.Random(seed)
+    patterns = list(mix)
+    weights = [mix[pattern] for pattern in patterns]
+    rules = []
+    for rule_id in range(1, count + 1):
+        pattern = rng.choices(patterns, weights)[0]
+        if pattern == 'price_spike':
+            conditions = {'price_change_threshold': rng.choice([0.05, 0.1, 0.25, 0.5, 1.0])}
+        elif pattern == 'volume_surge':
+            conditions = {'surge_ratio': rng.choice([1.5, 2.0, 3.0]), 'baseline_window': rng.choice([10, 20, 50])}
+        elif pattern == 'trend_reversal':
+            fast = rng.choice([5, 8, 12])
+            conditions = {'fast_window': fast, 'slow_window': fast * rng.choice([2, 3])}
+        elif pattern == 'price_move_arbitrage':
+            conditions = {'window_seconds': rng.choice([5, 10, 30]), 'min_move_percentage': rng.choice([0.1, 0.5])}
+        else:
+            conditions = {'custom_condition': rng.choice(symbols)}
+        # About half the rules watch a single symbol
+        if pattern != 'custom' and rng.random() < 0.5:
+            conditions['symbol'] = rng.choice(symbols)
+        rules.append({
+            'rule_id': rule_id,
+            'name': f"bench-{pattern}-{rule_id}",
+            'pattern': pattern,
+            'action': 'log_event',
+            'conditions': conditions,
+            'enabled': True
+        })
+    return rules
+
+
+def generate_events(count: int, symbols: List[str], rate: float = 1000.0,
+                    arbitrage_every: int = 200, seed: int = 2) -> Iterator[Dict]:
+    """Random-walk ticks (with volume and book) plus periodic arbitrage signals"""
+    rng = random.Random(seed)
+    prices = {symbol: 100.0 for symbol in symbols}
+    volumes = {symbol: 1000000.0 for symbol in symbols}
+    clock = datetime(2024, 1, 1)
+    step = timedelta(seconds=1.0 / rate)
+    for index in range(count):
+        clock += step
+        timestamp = clock.isoformat()
+        if arbitrage_every and index % arbitrage_every == arbitrage_every - 1:
+            legs = rng.sample(symbols, min(2, len(symbols)))
+            yield {
+                'symbols': legs,
+                'prices': [prices[leg] for leg in legs],
+                'spread_percentage': rng.uniform(0.05, 0.5),
+                'type': 'cross_currency',
+                'timestamp': timestamp
+            }
+            continue
+        symbol = rng.choice(symbols)
+        price = prices[symbol] = max(1.0, prices[symbol] * (1 + rng.gauss(0, 0.002)))
+        volume = volumes[symbol] * rng.uniform(0.9, 1.1)
+        if rng.random() < 0.01:
+            volume *= 3
+        yield {
+            'symbol': symbol,
+            'price': price,
+            'volume': volume,
+            'bid': price * 0.9999,
+            'ask': price * 1.0001,
+            'timestamp': timestamp,
+            'source': 'bench',
+            'type': 'price_update'
+        }
+
+
+def latency_summary(samples_ns: List[int]) -> Dict:
+    samples_us = [sample / 1000 for sample in samples_ns]
+    return {
+        'p50_us': percentile(samples_us, 0.50),
+        'p90_us': percentile(samples_us, 0.90),
+        'p99_us': percentile(samples_us, 0.99),
+        'p999_us': percentile(samples_us, 0.999),
+        'max_us': max(samples_us) if samples_us else 0.0
+    }
+
+
+def run_inprocess(args) -> Dict:
+    """Drive process_event directly with rules compiled into this process's engine"""
+    from backend.services.cep_engine import cep_engine_service as engine
+
+    # Measure evaluation, not Redis round trips
+    engine.action_sink = None
+    symbols = symbol_names(args.symbols)
+    rules = generate_rules(args.rules, parse_mix(args.mix), symbols, seed=args.seed)
+    events = list(generate_events(args.events, symbols, rate=args.rate or 1000.0, seed=args.seed + 1))
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for rule_dict in rules:
+        engine.apply_rule_definition(rule_dict)
+    rules_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # Warm operator state so steady-state latency is measured
+    warmup = min(len(events), args.warmup)
+    for event_data in events[:warmup]:
+        engine.process_event(event_data)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    latencies = []
+    interval = 1.0 / args.rate if args.rate else 0.0
+    next_send = time.perf_counter()
+    start = time.perf_counter()
+    for event_data in events[warmup:]:
+        if interval:
+            # Paced mode: hold the configured arrival rate
+            next_send += interval
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        event_start = time.perf_counter_ns()
+        engine.process_event(event_data)
+        latencies.append(time.perf_counter_ns() - event_start)
+    elapsed = time.perf_counter() - start
+    measured = len(events) - warmup
+
+    return {
+        'mode': 'inprocess',
+        'rules': len(rules),
+        'symbols': len(symbols),
+        'events': measured,
+        'warmup_events': warmup,
+        'duration_s': elapsed,
+        'events_per_second': measured / elapsed if elapsed > 0 else 0.0,
+        'latency': latency_summary(latencies),
+        'triggers': engine.processing_stats['triggers'],
+        'graph': engine.rule_graph.get_stats(),
+        'rules_memory_bytes': rules_bytes,
+        'memory_per_1000_rules_kb': rules_bytes / max(len(rules), 1) * 1000 / 1024,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'rss_growth_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    }
+
+
+def _http(method: str, url: str, payload: Dict = None) -> Dict:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=10) as response:
+        return json.loads(response.read() or b'{}')
+
+
+def run_e2e(args) -> Dict:
+    """Publish through Redis to a running engine and time probe events to their actions"""
+    import redis
+
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    client.ping()
+    symbols = symbol_names(args.symbols)
+    rules = generate_rules(args.rules, parse_mix(args.mix), symbols, seed=args.seed)
+
+    # Rules are created through the API so every engine replica picks them up
+    created = []
+    for rule_dict in rules:
+        body = {field: rule_dict[field] for field in ('name', 'pattern', 'action', 'conditions')}
+        created.append(_http('POST', f"{args.engine_url}/rules", body)['rule']['rule_id'])
+    probe_rule = _http('POST', f"{args.engine_url}/rules", {
+        'name': 'bench-probe',
+        'pattern': 'custom',
+        'action': 'log_event',
+        'conditions': {'custom_condition': PROBE_MARKER}
+    })['rule']['rule_id']
+    created.append(probe_rule)
+
+    latencies = []
+    listener_ready = threading.Event()
+    stop = threading.Event()
+
+    def listen():
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe('logs')
+        listener_ready.set()
+        while not stop.is_set():
+            message = pubsub.get_message(timeout=0.5)
+            if not message:
+                continue
+            received = time.time()
+            entry = json.loads(message['data'])
+            if entry.get('rule_id') != probe_rule:
+                continue
+            sent = entry.get('event_data', {}).get('bench_sent')
+            if sent:
+                latencies.append(int((received - sent) * 1e9))
+
+    listener = threading.Thread(target=listen, daemon=True)
+    listener.start()
+    listener_ready.wait(5)
+
+    stats_before = _http('GET', f"{args.engine_url}/stats")['processing']
+    rate = args.rate or 1000.0
+    total = int(rate * args.duration)
+    interval = 1.0 / rate
+    pipe = client.pipeline(transaction=False)
+    next_send = time.perf_counter()
+    start = time.perf_counter()
+    sent = 0
+    for index, event_data in enumerate(generate_events(total, symbols, rate=rate, seed=args.seed + 1)):
+        if index % args.probe_every == 0:
+            event_data = {'custom': PROBE_MARKER, 'bench_sent': time.time(), 'timestamp': event_data['timestamp']}
+        publish(pipe, 'events', json.dumps(event_data))
+        sent += 1
+        next_send += interval
+        if len(pipe) >= 100 or next_send > time.perf_counter():
+            pipe.execute()
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    pipe.execute()
+    publish_elapsed = time.perf_counter() - start
+
+    # Let the engine drain before reading its counters
+    time.sleep(args.drain)
+    stats_after = _http('GET', f"{args.engine_url}/stats")['processing']
+    stop.set()
+    listener.join(2)
+
+    for rule_id in created:
+        _http('DELETE', f"{args.engine_url}/rules/{rule_id}")
+
+    processed = stats_after['events'] - stats_before['events']
+    return {
+        'mode': 'e2e',
+        'rules': len(rules),
+        'symbols': len(symbols),
+        'published_events': sent,
+        'publish_rate': sent / publish_elapsed if publish_elapsed > 0 else 0.0,
+        'engine_events_processed': processed,
+        'engine_events_per_second': processed / (publish_elapsed + args.drain),
+        'probes_received': len(latencies),
+        'event_to_action_latency': latency_summary(latencies)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ASCEP CEP engine throughput benchmark')
+    parser.add_argument('mode', choices=['inprocess', 'e2e'])
+    parser.add_argument('--rules', type=int, default=1000, help='number of rules to register')
+    parser.add_argument('--symbols', type=int, default=50, help='symbol cardinality')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='rule mix as pattern=weight,...')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='events/sec (in-process: 0 = as fast as possible; e2e default 1000)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--events', type=int, default=100000, help='in-process: events to evaluate')
+    parser.add_argument('--warmup', type=int, default=10000, help='in-process: events before measuring')
+    parser.add_argument('--duration', type=float, default=30, help='e2e: seconds to publish for')
+    parser.add_argument('--probe-every', type=int, default=100, help='e2e: events between latency probes')
+    parser.add_argument('--drain', type=float, default=3, help='e2e: seconds to wait for the engine to drain')
+    parser.add_argument('--redis-url', default=os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    parser.add_argument('--engine-url', default=os.getenv('CEP_ENGINE_URL', 'http://localhost:5004'))
+    args = parser.parse_args(argv)
+
+    result = run_inprocess(args) if args.mode == 'inprocess' else run_e2e(args)
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,28 @@ from flask_cors import CORS
 import redis
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+from backend.services.common.tick_codec import decode_message, is_binary, public_event
+from backend.services.common.transport import subscribe as bus_subscribe
+from backend.services.cep_engine.action_sink import ActionSink
+from backend.services.cep_engine.backtest import run_backtest
+from backend.services.cep_engine.checkpoint import CheckpointStore
+from backend.services.cep_engine.event_time import EventClock, parse_event_time
+from backend.services.cep_engine.partitioning import PartitionedEngine
+from backend.services.cep_engine.profiling import RuleProfiler, merge_summaries
+from backend.services.cep_engine.recorder import (
+    EventRecorder, iter_recorded_events, recording_files
+)
+from backend.services.cep_engine.rule_graph import RuleGraph, compile_rule
+from backend.services.cep_engine.throttling import ActionThrottle, ThrottleSpec
+
 # Load environment variables
 load_dotenv()
 
@@ -64,19 +86,119 @@ except Exception as e:
 cep_rules = {}
 rule_id_counter = 1
 active_patterns = {}
+rule_graph = RuleGraph()
+
+# Rule hot-reload: every replica applies versioned changes from this channel
+CEP_RULES_CHANNEL = os.getenv('CEP_RULES_CHANNEL', 'cep_rule_updates')
+RULE_DEFINITION_FIELDS = ('name', 'pattern', 'action', 'conditions', 'throttle', 'enabled')
+rules_version = 0
+rules_sync_lock = threading.RLock()
+
+# Trigger statistics: counted in memory, flushed to Redis in one pipeline per interval
+CEP_STATS_FLUSH_INTERVAL = float(os.getenv('CEP_STATS_FLUSH_INTERVAL', 5))  # seconds
+trigger_stats = {
+    'flushes': 0,
+    'flush_errors': 0,
+    'last_flush': None,
+    'last_flush_rules': 0
+}
+
+# Event loop tuning
+CEP_BATCH_SIZE = int(os.getenv('CEP_BATCH_SIZE', 500))
+CEP_BATCH_TIMEOUT = float(os.getenv('CEP_BATCH_TIMEOUT', 0.05))  # seconds spent draining one batch
+CEP_LOG_SAMPLE_EVERY = int(os.getenv('CEP_LOG_SAMPLE_EVERY', 10000))  # events between debug summaries
+
+# Consumer group when BUS_TRANSPORT=streams
+CEP_BUS_GROUP = os.getenv('CEP_BUS_GROUP', 'cep_engine')
+bus_subscriber = None
+
+# Rule action publishing
+CEP_ACTION_QUEUE_SIZE = int(os.getenv('CEP_ACTION_QUEUE_SIZE', 10000))
+CEP_ACTION_BATCH_SIZE = int(os.getenv('CEP_ACTION_BATCH_SIZE', 200))
+CEP_ACTION_FLUSH_INTERVAL = float(os.getenv('CEP_ACTION_FLUSH_INTERVAL', 0.1))  # seconds
+
+action_sink = ActionSink(
+    redis_client,
+    max_queue=CEP_ACTION_QUEUE_SIZE,
+    batch_size=CEP_ACTION_BATCH_SIZE,
+    flush_interval=CEP_ACTION_FLUSH_INTERVAL,
+    dumps=json_dumps
+) if redis_client else None
+
+# Partitioned evaluation (1 = evaluate in-process)
+CEP_WORKERS = int(os.getenv('CEP_WORKERS', 1))
+CEP_PARTITION_KEY = os.getenv('CEP_PARTITION_KEY', 'symbol')
+CEP_WORKER_QUEUE_SIZE = int(os.getenv('CEP_WORKER_QUEUE_SIZE', 1000))  # batches per worker
+
+partitioned_engine = None
+
+# Rule profiling and CPU budget
+CEP_PROFILE_SAMPLE_EVERY = int(os.getenv('CEP_PROFILE_SAMPLE_EVERY', 32))  # events between timed evaluations
+CEP_RULE_CPU_BUDGET_US = float(os.getenv('CEP_RULE_CPU_BUDGET_US', 0))  # mean µs per evaluation, 0 = unlimited
+CEP_RULE_BUDGET_ACTION = os.getenv('CEP_RULE_BUDGET_ACTION', 'alert')  # 'alert' or 'disable'
+
+rule_profiler = RuleProfiler(sample_every=CEP_PROFILE_SAMPLE_EVERY, budget_us=CEP_RULE_CPU_BUDGET_US)
+
+# Event recording (replay source for backtests)
+CEP_RECORD_EVENTS = os.getenv('CEP_RECORD_EVENTS', 'false').lower() == 'true'
+CEP_RECORDINGS_DIR = os.getenv('CEP_RECORDINGS_DIR', os.path.join(os.getcwd(), 'cep_recordings'))
+CEP_BACKTEST_MAX_EVENTS = int(os.getenv('CEP_BACKTEST_MAX_EVENTS', 5000000))
+CEP_RECORDING_RETENTION_DAYS = int(os.getenv('CEP_RECORDING_RETENTION_DAYS', 7))  # 0 keeps recordings forever
+
+# Operator state checkpoints (replay after restart needs the event recordings)
+CEP_CHECKPOINT_PATH = os.getenv('CEP_CHECKPOINT_PATH', '')
+CEP_CHECKPOINT_INTERVAL = float(os.getenv('CEP_CHECKPOINT_INTERVAL', 5))  # seconds
+CEP_CHECKPOINT_COMPACT_EVERY = int(os.getenv('CEP_CHECKPOINT_COMPACT_EVERY', 50))  # deltas per full snapshot
+
+event_recorder = EventRecorder(
+    CEP_RECORDINGS_DIR,
+    retention_days=CEP_RECORDING_RETENTION_DAYS
+) if CEP_RECORD_EVENTS or CEP_CHECKPOINT_PATH else None
+checkpoint_store = CheckpointStore(
+    CEP_CHECKPOINT_PATH,
+    compact_every=CEP_CHECKPOINT_COMPACT_EVERY
+) if CEP_CHECKPOINT_PATH else None
+
+# Event-time processing: reorder by source timestamp behind per-source watermarks
+CEP_EVENT_TIME = os.getenv('CEP_EVENT_TIME', 'false').lower() == 'true'
+CEP_ALLOWED_LATENESS_MS = float(os.getenv('CEP_ALLOWED_LATENESS_MS', 500))
+CEP_SOURCE_IDLE_TIMEOUT = float(os.getenv('CEP_SOURCE_IDLE_TIMEOUT', 5))  # seconds
+CEP_REORDER_BUFFER_SIZE = int(os.getenv('CEP_REORDER_BUFFER_SIZE', 100000))  # events
+
+event_clock = EventClock(
+    allowed_lateness_ms=CEP_ALLOWED_LATENESS_MS,
+    idle_timeout=CEP_SOURCE_IDLE_TIMEOUT,
+    max_buffered=CEP_REORDER_BUFFER_SIZE
+) if CEP_EVENT_TIME else None
+
+processing_stats = {
+    'events': 0,
+    'batches': 0,
+    'triggers': 0,
+    'decode_errors': 0,
+    'suppressed': 0,
+    'errors': 0
+}
+
+# Per-rule, per-key action throttling (rules opt in with a `throttle` object)
+action_throttle = ActionThrottle()
 
 class CEPRule:
     """CEP Rule class for managing complex event processing rules"""
     
-    def __init__(self, rule_id, name, pattern, action, conditions=None, enabled=True):
+    def __init__(self, rule_id, name, pattern, action, conditions=None, enabled=True, throttle=None):
         self.rule_id = rule_id
         self.name = name
         self.pattern = pattern
         self.action = action
         self.conditions = conditions or {}
+        self.throttle = throttle
+        self.throttle_spec = ThrottleSpec.from_dict(throttle)
         self.created_at = datetime.utcnow().isoformat()
         self.last_triggered = None
         self.trigger_count = 0
+        self.flushed_count = 0  # part of trigger_count already added to Redis
+        self.suppressed_count = 0
         self.enabled = enabled
     
     def to_dict(self):
@@ -86,103 +208,53 @@ class CEPRule:
             'pattern': self.pattern,
             'action': self.action,
             'conditions': self.conditions,
+            'throttle': self.throttle,
             'created_at': self.created_at,
             'last_triggered': self.last_triggered,
             'trigger_count': self.trigger_count,
+            'suppressed_count': self.suppressed_count,
             'enabled': self.enabled
         }
     
-    def evaluate(self, event_data):
-        """Evaluate if the rule should be triggered based on event data"""
-        try:
-            # Simple pattern matching (can be extended with more sophisticated logic)
-            if self.pattern == 'price_spike':
-                return self._evaluate_price_spike(event_data)
-            elif self.pattern == 'volume_surge':
-                return self._evaluate_volume_surge(event_data)
-            elif self.pattern == 'arbitrage_opportunity':
-                return self._evaluate_arbitrage_opportunity(event_data)
-            elif self.pattern == 'trend_reversal':
-                return self._evaluate_trend_reversal(event_data)
-            else:
-                return self._evaluate_custom_pattern(event_data)
+    def evaluate(self, events):
+        """Evaluate sample events in order on a private rule graph; one bool per event
         
-        except Exception as e:
-            logger.error(f"Error evaluating rule {self.rule_id}: {e}")
-            return False
-    
-    def _evaluate_price_spike(self, event_data):
-        """Evaluate price spike pattern"""
-        symbol = event_data.get('symbol')
-        price = event_data.get('price', 0)
-        threshold = self.conditions.get('price_change_threshold', 5.0)  # 5% default
-        
-        # Get previous price from Redis
-        if redis_client:
-            prev_price_data = redis_client.hgetall(f"price:{symbol}")
-            if prev_price_data and 'price' in prev_price_data:
-                prev_price = float(prev_price_data['price'])
-                if prev_price > 0:
-                    price_change = ((price - prev_price) / prev_price) * 100
-                    return abs(price_change) >= threshold
-        
-        return False
-    
-    def _evaluate_volume_surge(self, event_data):
-        """Evaluate volume surge pattern"""
-        volume = event_data.get('volume', 0)
-        threshold = self.conditions.get('volume_threshold', 1000000)  # 1M default
-        return volume >= threshold
-    
-    def _evaluate_arbitrage_opportunity(self, event_data):
-        """Evaluate arbitrage opportunity pattern"""
-        spread = event_data.get('spread_percentage', 0)
-        threshold = self.conditions.get('spread_threshold', 0.1)  # 0.1% default
-        return spread >= threshold
-    
-    def _evaluate_trend_reversal(self, event_data):
-        """Evaluate trend reversal pattern"""
-        # This would require historical data analysis
-        # For now, return False
-        return False
-    
-    def _evaluate_custom_pattern(self, event_data):
-        """Evaluate custom pattern using regex or other logic"""
-        custom_condition = self.conditions.get('custom_condition')
-        if custom_condition:
-            # Simple string matching for now
-            return custom_condition in str(event_data)
-        return False
+        Uses the same operators as live evaluation, so windowed patterns
+        (price_spike, relative volume_surge, trend_reversal, price_move_arbitrage)
+        need their earlier ticks in the same call. Live engine state is not touched.
+        """
+        graph = RuleGraph()
+        graph.add_rule(self.rule_id, self.pattern, self.conditions)
+        return [bool(graph.evaluate(event_data)) for event_data in events]
     
     def trigger(self, event_data):
-        """Trigger the rule action"""
+        """Trigger the rule action and return the (channel, message) to publish"""
         self.last_triggered = datetime.utcnow().isoformat()
         self.trigger_count += 1
         
-        # Execute action
+        logger.debug(f"🚨 CEP Rule triggered: {self.name} (ID: {self.rule_id})")
+        
+        # Build action
+        event_data = public_event(event_data)
         if self.action == 'create_signal':
-            self._create_signal(event_data)
+            return self._create_signal(event_data)
         elif self.action == 'send_alert':
-            self._send_alert(event_data)
+            return self._send_alert(event_data)
         elif self.action == 'log_event':
-            self._log_event(event_data)
-        
-        logger.info(f"🚨 CEP Rule triggered: {self.name} (ID: {self.rule_id})")
+            return self._log_event(event_data)
+        return None
     
     def _create_signal(self, event_data):
         """Create arbitrage signal"""
-        if redis_client:
-            signal = {
-                'rule_id': self.rule_id,
-                'rule_name': self.name,
-                'pattern': self.pattern,
-                'event_data': event_data,
-                'timestamp': datetime.utcnow().isoformat(),
-                'severity': 'high' if self.trigger_count > 5 else 'medium'
-            }
-            
-            # Publish to Redis channel
-            redis_client.publish('cep_signals', json.dumps(signal))
+        signal = {
+            'rule_id': self.rule_id,
+            'rule_name': self.name,
+            'pattern': self.pattern,
+            'event_data': event_data,
+            'timestamp': datetime.utcnow().isoformat(),
+            'severity': 'high' if self.trigger_count > 5 else 'medium'
+        }
+        return 'cep_signals', signal
     
     def _send_alert(self, event_data):
         """Send alert (placeholder for notification system)"""
@@ -194,9 +266,7 @@ class CEPRule:
             'event_data': event_data,
             'timestamp': datetime.utcnow().isoformat()
         }
-        
-        if redis_client:
-            redis_client.publish('alerts', json.dumps(alert))
+        return 'alerts', alert
     
     def _log_event(self, event_data):
         """Log event (placeholder for logging system)"""
@@ -208,55 +278,479 @@ class CEPRule:
             'event_data': event_data,
             'timestamp': datetime.utcnow().isoformat()
         }
+        return 'logs', log_entry
+
+def register_rule(rule):
+    """Compile a rule into the shared operator graph (or drop it when disabled)"""
+    rule_profiler.reset(rule.rule_id)
+    action_throttle.reset(rule.rule_id)
+    rule.throttle_spec = ThrottleSpec.from_dict(rule.throttle)
+    if rule.enabled:
+        rule_graph.add_rule(rule.rule_id, rule.pattern, rule.conditions)
+    else:
+        rule_graph.remove_rule(rule.rule_id)
+    if partitioned_engine:
+        partitioned_engine.broadcast_rule(rule.to_dict())
+
+def unregister_rule(rule):
+    """Remove a rule from the shared operator graph"""
+    rule_graph.remove_rule(rule.rule_id)
+    rule_profiler.reset(rule.rule_id)
+    action_throttle.reset(rule.rule_id)
+    if partitioned_engine:
+        partitioned_engine.broadcast_delete(rule.rule_id)
+
+def rule_from_dict(rule_dict):
+    """Build a CEPRule from its stored dictionary form"""
+    rule = CEPRule(
+        rule_id=int(rule_dict['rule_id']),
+        name=rule_dict['name'],
+        pattern=rule_dict['pattern'],
+        action=rule_dict['action'],
+        conditions=rule_dict.get('conditions', {}),
+        enabled=rule_dict.get('enabled', True),
+        throttle=rule_dict.get('throttle')
+    )
+    rule.created_at = rule_dict.get('created_at', rule.created_at)
+    rule.last_triggered = rule_dict.get('last_triggered')
+    rule.trigger_count = rule_dict.get('trigger_count', 0)
+    rule.flushed_count = rule.trigger_count
+    rule.suppressed_count = rule_dict.get('suppressed_count', 0)
+    return rule
+
+def apply_rule_definition(rule_dict):
+    """Create or update a rule from its dictionary form, keeping live counters"""
+    rule_id = int(rule_dict['rule_id'])
+    rule = cep_rules.get(rule_id)
+    if rule is None:
+        rule = cep_rules[rule_id] = rule_from_dict(rule_dict)
+    else:
+        rule.name = rule_dict['name']
+        rule.pattern = rule_dict['pattern']
+        rule.action = rule_dict['action']
+        rule.conditions = rule_dict.get('conditions', {})
+        rule.throttle = rule_dict.get('throttle')
+        rule.enabled = rule_dict.get('enabled', True)
+    register_rule(rule)
+    return rule
+
+def rule_definition(rule_dict):
+    """The fields of a stored rule that affect evaluation (no counters)"""
+    return {field: rule_dict.get(field) for field in RULE_DEFINITION_FIELDS}
+
+def next_rule_id():
+    """Allocate a rule id, unique across replicas when Redis is available"""
+    global rule_id_counter
+    if redis_client:
+        return int(redis_client.incr('cep_rules:next_id'))
+    rule_id = rule_id_counter
+    rule_id_counter += 1
+    return rule_id
+
+def publish_rule_change(rule_id, rule_dict=None):
+    """Persist a rule (or its deletion when rule_dict is None) and announce it with a new version"""
+    global rules_version
+    if not redis_client:
+        return None
+    
+    # Store and version in one MULTI so a resync never sees a version without its change
+    pipe = redis_client.pipeline()
+    if rule_dict is None:
+        pipe.hdel('cep_rules', rule_id)
+        pipe.hdel('cep_rule_triggers', rule_id)
+        pipe.hdel('cep_rule_last_triggered', rule_id)
+    else:
+        pipe.hset('cep_rules', rule_id, json.dumps(rule_dict))
+    pipe.incr('cep_rules:version')
+    version = pipe.execute()[-1]
+    
+    redis_client.publish(CEP_RULES_CHANNEL, json.dumps({
+        'version': version,
+        'rule_id': rule_id,
+        'rule': rule_dict
+    }))
+    with rules_sync_lock:
+        # Already applied locally; a gap means another replica's change is still in flight
+        if version == rules_version + 1:
+            rules_version = version
+    return version
+
+def sync_rules_from_redis():
+    """Reconcile local rules with the Redis rule store; only changed rules are recompiled"""
+    global rules_version, rule_id_counter
+    
+    with rules_sync_lock:
+        pipe = redis_client.pipeline()
+        pipe.hgetall('cep_rules')
+        pipe.get('cep_rules:version')
+        stored_rules, version = pipe.execute()
         
-        if redis_client:
-            redis_client.publish('logs', json.dumps(log_entry))
+        stored = {}
+        for rule_data in stored_rules.values():
+            rule_dict = json.loads(rule_data)
+            stored[int(rule_dict['rule_id'])] = rule_dict
+        
+        for rule_id in [rule_id for rule_id in cep_rules if rule_id not in stored]:
+            unregister_rule(cep_rules.pop(rule_id))
+        for rule_id, rule_dict in stored.items():
+            rule = cep_rules.get(rule_id)
+            if rule is None or rule_definition(rule.to_dict()) != rule_definition(rule_dict):
+                apply_rule_definition(rule_dict)
+        
+        rules_version = int(version or 0)
+        
+        # Ids allocated before the shared counter existed must not be handed out again
+        max_rule_id = max(stored, default=0)
+        rule_id_counter = max(rule_id_counter, max_rule_id + 1)
+        if int(redis_client.get('cep_rules:next_id') or 0) < max_rule_id:
+            redis_client.set('cep_rules:next_id', max_rule_id)
+        
+        return len(cep_rules)
 
-def process_event(event_data):
-    """Process incoming event through all CEP rules"""
-    try:
-        triggered_rules = []
+def apply_rule_change(change):
+    """Apply a versioned rule change from the control channel"""
+    global rules_version
+    
+    with rules_sync_lock:
+        version = change['version']
+        if version <= rules_version:
+            return
+        if version != rules_version + 1:
+            logger.warning(f"⚠️ Rule version gap ({rules_version} -> {version}); resyncing from Redis")
+            sync_rules_from_redis()
+            return
         
-        for rule in cep_rules.values():
-            if not getattr(rule, 'enabled', True):
-                continue
-            if rule.evaluate(event_data):
-                rule.trigger(event_data)
-                triggered_rules.append(rule.rule_id)
+        rule_id = int(change['rule_id'])
+        if change['rule'] is None:
+            rule = cep_rules.pop(rule_id, None)
+            if rule:
+                unregister_rule(rule)
+        else:
+            rule = cep_rules.get(rule_id)
+            if rule is None or rule_definition(rule.to_dict()) != rule_definition(change['rule']):
+                apply_rule_definition(change['rule'])
+        rules_version = version
+        logger.info(f"🔄 Applied rule change v{version} for rule {rule_id}")
+
+def rule_sync_thread():
+    """Background thread applying rule changes published by any CEP replica"""
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CEP_RULES_CHANNEL)
+            # Changes published while (re)subscribing are picked up by a full sync
+            sync_rules_from_redis()
+            for message in pubsub.listen():
+                if message['type'] == 'message':
+                    apply_rule_change(json.loads(message['data']))
+        except Exception as e:
+            logger.error(f"Error in rule sync: {e}")
+            time.sleep(1)
+
+def load_trigger_stats():
+    """Restore persisted trigger counters (summed across replicas) into the loaded rules"""
+    pipe = redis_client.pipeline()
+    pipe.hgetall('cep_rule_triggers')
+    pipe.hgetall('cep_rule_last_triggered')
+    counts, last_triggered = pipe.execute()
+    
+    for rule_id, rule in list(cep_rules.items()):
+        key = str(rule_id)
+        if key in counts:
+            rule.trigger_count = rule.flushed_count = int(counts[key])
+        if key in last_triggered:
+            rule.last_triggered = last_triggered[key]
+
+def flush_trigger_stats():
+    """Write trigger counts accumulated since the last flush in one Redis round trip"""
+    increments = {}
+    last_triggered = {}
+    for rule_id, rule in list(cep_rules.items()):
+        count = rule.trigger_count
+        if count > rule.flushed_count:
+            increments[rule_id] = (count, count - rule.flushed_count)
+            last_triggered[rule_id] = rule.last_triggered
+    if not increments:
+        return
+    
+    # HINCRBY lets every replica add its own triggers to one shared total
+    pipe = redis_client.pipeline(transaction=False)
+    for rule_id, (_, delta) in increments.items():
+        pipe.hincrby('cep_rule_triggers', rule_id, delta)
+    pipe.hset('cep_rule_last_triggered', mapping=last_triggered)
+    pipe.execute()
+    
+    for rule_id, (count, _) in increments.items():
+        rule = cep_rules.get(rule_id)
+        if rule:
+            rule.flushed_count = count
+    trigger_stats['flushes'] += 1
+    trigger_stats['last_flush'] = datetime.utcnow().isoformat()
+    trigger_stats['last_flush_rules'] = len(increments)
+
+def trigger_stats_thread():
+    """Background thread persisting trigger counters every CEP_STATS_FLUSH_INTERVAL seconds"""
+    while True:
+        time.sleep(CEP_STATS_FLUSH_INTERVAL)
+        try:
+            flush_trigger_stats()
+        except Exception as e:
+            trigger_stats['flush_errors'] += 1
+            logger.error(f"Error flushing trigger stats: {e}")
+
+def merge_worker_report(report):
+    """Fold trigger counters reported by partition workers into the parent's rules"""
+    for rule_id, (delta, last_triggered, suppressed) in report['triggers'].items():
+        rule = cep_rules.get(rule_id)
+        if rule is None:
+            continue
+        rule.trigger_count += delta
+        rule.suppressed_count += suppressed
+        if last_triggered and (not rule.last_triggered or last_triggered > rule.last_triggered):
+            rule.last_triggered = last_triggered
+    
+    if report.get('violations'):
+        handle_budget_violations(report['violations'])
+
+def rule_profile(rule_id):
+    """Profile summary for a rule, merged across partition workers when partitioned"""
+    if partitioned_engine:
+        summaries = [
+            report['profiles'][rule_id]
+            for report in list(partitioned_engine.worker_stats.values())
+            if rule_id in report.get('profiles', {})
+        ]
+        return merge_summaries(summaries) or rule_profiler.summarize(rule_id, 0, 0)
+    return rule_profiler.summarize(rule_id, *rule_graph.rule_counters(rule_id))
+
+def handle_budget_violations(rule_ids):
+    """Alert on (and optionally disable) rules whose mean evaluation cost exceeds the budget"""
+    for rule_id in rule_ids:
+        rule = cep_rules.get(rule_id)
+        if rule is None or not rule.enabled:
+            continue
         
-        if triggered_rules:
-            logger.info(f"📊 Event processed: {len(triggered_rules)} rules triggered")
+        profile = rule_profile(rule_id)
+        disable = CEP_RULE_BUDGET_ACTION == 'disable'
+        logger.warning(
+            f"⚠️ CEP Rule {rule.name} (ID: {rule_id}) exceeds CPU budget: "
+            f"{profile['mean_eval_us']:.1f}µs > {CEP_RULE_CPU_BUDGET_US}µs per evaluation"
+            f"{' - disabling' if disable else ''}"
+        )
+        
+        if disable:
+            rule.enabled = False
+            register_rule(rule)
+            publish_rule_change(rule_id, rule.to_dict())
         
-        return triggered_rules
+        if action_sink:
+            action_sink.submit('alerts', {
+                'type': 'cep_rule_budget',
+                'rule_id': rule_id,
+                'rule_name': rule.name,
+                'message': f"CEP Rule '{rule.name}' exceeds its CPU budget",
+                'profile': profile,
+                'disabled': disable,
+                'timestamp': datetime.utcnow().isoformat()
+            })
+
+def process_events(events, join_only=False):
+    """Process a batch of events through the rule graph, queueing actions together
     
-    except Exception as e:
-        logger.error(f"Error processing event: {e}")
-        return []
+    join_only marks tick copies the partition router sends so price move joins
+    see every leg: only join operators buffer them, nothing matches and they
+    are not counted as events.
+    """
+    triggered_rules = []
+    actions = []
+    
+    for event_data in events:
+        try:
+            # Shared operators are computed once; matches fan out to dependent rules
+            for rule_id in rule_graph.evaluate(event_data, rule_profiler, join_only):
+                rule = cep_rules.get(rule_id)
+                if rule is None:
+                    continue
+                # Throttled matches are dropped before any action message is built
+                if rule.throttle_spec and not action_throttle.allow(rule_id, rule.throttle_spec, event_data):
+                    rule.suppressed_count += 1
+                    processing_stats['suppressed'] += 1
+                    continue
+                start = time.perf_counter_ns()
+                action = rule.trigger(event_data)
+                rule_profiler.record_action(rule_id, time.perf_counter_ns() - start)
+                if action:
+                    actions.append(action)
+                triggered_rules.append(rule_id)
+        except Exception as e:
+            processing_stats['errors'] += 1
+            logger.error(f"Error processing event: {e}")
+    
+    if not join_only:
+        processing_stats['events'] += len(events)
+    processing_stats['triggers'] += len(triggered_rules)
+    
+    # Serialization and publishing happen on the action sink's flush thread
+    if action_sink and actions:
+        action_sink.submit_many(actions)
+    
+    return triggered_rules
+
+def process_event(event_data):
+    """Process incoming event through all CEP rules"""
+    return process_events([event_data])
+
+def dispatch_events(events):
+    """Evaluate a batch in-process or route it to the partition workers"""
+    if not events:
+        return
+    processing_stats['batches'] += 1
+    if partitioned_engine:
+        processing_stats['events'] += len(events)
+        partitioned_engine.submit(events)
+    else:
+        process_events(events)
+        violations = rule_profiler.pop_violations()
+        if violations:
+            handle_budget_violations(violations)
 
 def cep_processing_thread():
-    """Background thread for processing events from Redis"""
+    """Background thread draining Redis events in batches"""
     if not redis_client:
         return
     
-    pubsub = redis_client.pubsub()
-    pubsub.subscribe('events', 'price_updates', 'arbitrage_signals')
-    
-    logger.info("👂 CEP Engine listening for events...")
-    
-    for message in pubsub.listen():
-        if message['type'] == 'message':
-            try:
-                event_data = json.loads(message['data'])
-                logger.info(f"📊 Processing event: {event_data.get('type', 'unknown')}")
-                
-                # Process through CEP rules
-                triggered_rules = process_event(event_data)
-                
-                if triggered_rules:
-                    logger.info(f"🚨 Rules triggered: {triggered_rules}")
-                
-            except Exception as e:
-                logger.error(f"Error processing event: {e}")
+    global bus_subscriber
+    bus_subscriber = bus_subscribe(redis_client, ('events', 'price_updates', 'arbitrage_signals'), group=CEP_BUS_GROUP)
+    
+    logger.info(f"👂 CEP Engine listening for events ({bus_subscriber.transport})...")
+    
+    next_sample = CEP_LOG_SAMPLE_EVERY
+    next_checkpoint = time.monotonic() + CEP_CHECKPOINT_INTERVAL
+    while True:
+        try:
+            # Block for the first message, then drain whatever is already buffered
+            messages = bus_subscriber.read(CEP_BATCH_SIZE, timeout=1.0, max_wait=CEP_BATCH_TIMEOUT)
+            if not messages:
+                if event_clock:
+                    # Quiet stream: idle sources no longer hold the watermark back
+                    dispatch_events(event_clock.poll())
+                continue
+            
+            batch = []
+            raw_batch = []
+            for message in messages:
+                try:
+                    event_data = decode_message(message.data, loads=json_loads)
+                    batch.append((event_data, message.channel))
+                    if event_recorder:
+                        # Recordings stay JSONL whatever the wire format
+                        raw_batch.append(json.dumps(public_event(event_data)) if is_binary(message.data) else message.data.decode('utf-8'))
+                except ValueError:
+                    processing_stats['decode_errors'] += 1
+            
+            if not batch:
+                bus_subscriber.ack(messages)
+                continue
+            
+            if event_recorder:
+                event_recorder.write(raw_batch)
+            
+            if event_clock:
+                dispatch_events(event_clock.push_batch(batch))
+            else:
+                dispatch_events([event_data for event_data, _ in batch])
+            
+            # Checkpoint between batches so state and recording offset agree
+            if checkpoint_store and not partitioned_engine and time.monotonic() >= next_checkpoint:
+                next_checkpoint = time.monotonic() + CEP_CHECKPOINT_INTERVAL
+                position = event_recorder.position()
+                if checkpoint_store.save(rule_graph, position, event_clock) and position and not CEP_RECORD_EVENTS:
+                    # Recordings kept only for restart replay are superseded by the full snapshot
+                    event_recorder.prune(before=position[0])
+            
+            # Acknowledge only after evaluation (streams: unacked entries are redelivered)
+            bus_subscriber.ack(messages)
+            
+            if processing_stats['events'] >= next_sample:
+                next_sample = processing_stats['events'] + CEP_LOG_SAMPLE_EVERY
+                logger.debug(f"📊 CEP processing stats: {processing_stats}")
+        
+        except Exception as e:
+            logger.error(f"Error processing events: {e}")
+            time.sleep(1)
+
+def restore_checkpoint():
+    """Restore operator state from the last checkpoint, then replay events recorded after it"""
+    if not checkpoint_store:
+        return
+    if CEP_WORKERS > 1:
+        logger.warning("⚠️ CEP checkpoints are not supported in partitioned mode; starting cold")
+        return
+    
+    start = time.perf_counter()
+    try:
+        state, position, clock_state = checkpoint_store.load()
+        restored = rule_graph.restore(state)
+        if event_clock and clock_state:
+            # Events buffered for reordering were recorded (and acked) but not yet evaluated
+            event_clock.restore(clock_state)
+        
+        replayed = 0
+        if position:
+            path, offset = position
+            name = os.path.basename(path)
+            paths = [p for p in recording_files(CEP_RECORDINGS_DIR) if os.path.basename(p) >= name]
+            if not paths or os.path.basename(paths[0]) != name:
+                offset = 0
+            # Rebuild state only: actions for these events were published before the restart
+            for event_data in iter_recorded_events(paths, offset=offset, loads=json_loads):
+                if event_clock:
+                    for ready in event_clock.push_batch(((event_data, 'replay'),)):
+                        rule_graph.evaluate(ready)
+                else:
+                    rule_graph.evaluate(event_data)
+                replayed += 1
+        
+        logger.info(
+            f"♻️ Restored {restored} CEP operators and replayed {replayed} events "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+    except Exception as e:
+        logger.error(f"Error restoring CEP checkpoint: {e}")
+
+def start_service():
+    """Load rules, restore operator state and start the background threads"""
+    if redis_client:
+        try:
+            loaded = sync_rules_from_redis()
+            load_trigger_stats()
+            logger.info(f"📊 Loaded {loaded} rules from Redis (version {rules_version})")
+        except Exception as e:
+            logger.error(f"Error loading rules from Redis: {e}")
+    
+    restore_checkpoint()
+    start_event_processing()
+    
+    if redis_client:
+        threading.Thread(target=rule_sync_thread, daemon=True).start()
+        threading.Thread(target=trigger_stats_thread, daemon=True).start()
+
+def start_event_processing():
+    """Start the event loop, fanning out to partition workers when CEP_WORKERS > 1"""
+    global partitioned_engine
+    
+    if CEP_WORKERS > 1:
+        partitioned_engine = PartitionedEngine(
+            CEP_WORKERS,
+            partition_key=CEP_PARTITION_KEY,
+            queue_size=CEP_WORKER_QUEUE_SIZE
+        )
+        partitioned_engine.start(report_handler=merge_worker_report)
+        for rule in list(cep_rules.values()):
+            partitioned_engine.broadcast_rule(rule.to_dict())
+    
+    processing_thread = threading.Thread(target=cep_processing_thread, daemon=True)
+    processing_thread.start()
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -283,8 +777,6 @@ def get_rules():
 @app.route('/rules', methods=['POST'])
 def create_rule():
     """Create a new CEP rule"""
-    global rule_id_counter
-    
     try:
         data = request.get_json()
         if not data:
@@ -296,22 +788,26 @@ def create_rule():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
+        # Validate before allocating an id
+        compile_rule(data['pattern'], data.get('conditions', {}))
+        ThrottleSpec.from_dict(data.get('throttle'))
+        
         # Create new rule
         rule = CEPRule(
-            rule_id=rule_id_counter,
+            rule_id=next_rule_id(),
             name=data['name'],
             pattern=data['pattern'],
             action=data['action'],
             conditions=data.get('conditions', {}),
-            enabled=data.get('enabled', True)
+            enabled=data.get('enabled', True),
+            throttle=data.get('throttle')
         )
+        register_rule(rule)
         
-        cep_rules[rule_id_counter] = rule
-        rule_id_counter += 1
+        cep_rules[rule.rule_id] = rule
         
-        # Store in Redis
-        if redis_client:
-            redis_client.hset('cep_rules', rule.rule_id, json.dumps(rule.to_dict()))
+        # Store in Redis and announce to the other replicas
+        publish_rule_change(rule.rule_id, rule.to_dict())
         
         logger.info(f"✅ CEP Rule created: {rule.name} (ID: {rule.rule_id})")
         
@@ -320,6 +816,8 @@ def create_rule():
             'rule': rule.to_dict()
         }), 201
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error creating rule: {e}")
         return jsonify({'error': str(e)}), 500
@@ -344,6 +842,9 @@ def update_rule(rule_id):
             return jsonify({'error': 'No data provided'}), 400
         
         rule = cep_rules[rule_id]
+        # Validate the new definition before mutating the live rule
+        compile_rule(data.get('pattern', rule.pattern), data.get('conditions', rule.conditions))
+        ThrottleSpec.from_dict(data.get('throttle', rule.throttle))
         
         # Update fields
         if 'name' in data:
@@ -354,12 +855,14 @@ def update_rule(rule_id):
             rule.action = data['action']
         if 'conditions' in data:
             rule.conditions = data['conditions']
+        if 'throttle' in data:
+            rule.throttle = data['throttle']
         if 'enabled' in data:
             rule.enabled = data['enabled']
+        register_rule(rule)
         
-        # Update in Redis
-        if redis_client:
-            redis_client.hset('cep_rules', rule_id, json.dumps(rule.to_dict()))
+        # Update in Redis and announce to the other replicas
+        publish_rule_change(rule_id, rule.to_dict())
         
         logger.info(f"✅ CEP Rule updated: {rule.name} (ID: {rule_id})")
         
@@ -368,6 +871,8 @@ def update_rule(rule_id):
             'rule': rule.to_dict()
         })
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error updating rule: {e}")
         return jsonify({'error': str(e)}), 500
@@ -380,10 +885,10 @@ def delete_rule(rule_id):
             return jsonify({'error': 'Rule not found'}), 404
         
         rule = cep_rules.pop(rule_id)
+        unregister_rule(rule)
         
-        # Remove from Redis
-        if redis_client:
-            redis_client.hdel('cep_rules', rule_id)
+        # Remove from Redis and announce to the other replicas
+        publish_rule_change(rule_id)
         
         logger.info(f"✅ CEP Rule deleted: {rule.name} (ID: {rule_id})")
         
@@ -407,14 +912,20 @@ def test_rule(rule_id):
         if not data:
             return jsonify({'error': 'No test data provided'}), 400
         
+        # A list of events is evaluated in order, so windowed patterns can be exercised
+        events = data if isinstance(data, list) else [data]
+        if not all(isinstance(event, dict) for event in events):
+            return jsonify({'error': 'Test data must be an event object or a list of event objects'}), 400
+        
         rule = cep_rules[rule_id]
-        result = rule.evaluate(data)
+        matches = rule.evaluate(events)
         
         return jsonify({
             'rule_id': rule_id,
             'rule_name': rule.name,
             'test_data': data,
-            'result': result,
+            'result': any(matches),
+            'matches': matches,
             'timestamp': datetime.utcnow().isoformat()
         })
     
@@ -422,10 +933,78 @@ def test_rule(rule_id):
         logger.error(f"Error testing rule: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/rules/<int:rule_id>/profile', methods=['GET'])
+def get_rule_profile(rule_id):
+    """Get evaluation cost and match statistics for a CEP rule"""
+    if rule_id not in cep_rules:
+        return jsonify({'error': 'Rule not found'}), 404
+    
+    profile = rule_profile(rule_id)
+    profile['rule_name'] = cep_rules[rule_id].name
+    profile['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(profile)
+
+@app.route('/rules/backtest', methods=['POST'])
+def backtest_rules():
+    """Backtest rule definitions against recorded events in an isolated engine"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        # Rule definitions: inline definitions and/or existing rule ids
+        definitions = []
+        for index, rule_data in enumerate(data.get('rules', [])):
+            if 'pattern' not in rule_data:
+                return jsonify({'error': f'Missing required field: pattern (rule {index})'}), 400
+            definitions.append({
+                'rule_id': rule_data.get('rule_id', f'backtest-{index + 1}'),
+                'name': rule_data.get('name'),
+                'pattern': rule_data['pattern'],
+                'conditions': rule_data.get('conditions', {})
+            })
+        for rule_id in data.get('rule_ids', []):
+            if rule_id not in cep_rules:
+                return jsonify({'error': f'Rule not found: {rule_id}'}), 404
+            definitions.append(cep_rules[rule_id].to_dict())
+        if not definitions:
+            return jsonify({'error': 'No rules provided'}), 400
+        
+        # Event source: inline events, one recording file, or a time range of recordings
+        start = parse_event_time(data.get('start'))
+        end = parse_event_time(data.get('end'))
+        if 'events' in data:
+            events = data['events']
+        elif 'events_file' in data:
+            path = os.path.join(CEP_RECORDINGS_DIR, os.path.basename(data['events_file']))
+            if not os.path.isfile(path):
+                return jsonify({'error': f"Recording not found: {data['events_file']}"}), 404
+            events = iter_recorded_events([path], start, end, loads=json_loads)
+        elif start or end:
+            events = iter_recorded_events(recording_files(CEP_RECORDINGS_DIR, start, end), start, end, loads=json_loads)
+        else:
+            return jsonify({'error': 'Provide events, events_file or a start/end time range'}), 400
+        
+        max_events = min(int(data.get('limit', CEP_BACKTEST_MAX_EVENTS)), CEP_BACKTEST_MAX_EVENTS)
+        result = run_backtest(definitions, events, max_events=max_events)
+        result['timestamp'] = datetime.utcnow().isoformat()
+        return jsonify(result)
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error running backtest: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/stats', methods=['GET'])
 def get_stats():
     """Get CEP engine statistics"""
     total_triggers = sum(rule.trigger_count for rule in cep_rules.values())
+    profiles = sorted(
+        (rule_profile(rule_id) for rule_id in list(cep_rules)),
+        key=lambda profile: profile['estimated_total_eval_ms'],
+        reverse=True
+    )
     active_rules = len([rule for rule in cep_rules.values() if rule.trigger_count > 0])
     
     return jsonify({
@@ -433,6 +1012,18 @@ def get_stats():
         'active_rules': active_rules,
         'total_triggers': total_triggers,
         'average_triggers_per_rule': total_triggers / len(cep_rules) if cep_rules else 0,
+        'graph': rule_graph.get_stats(),
+        'processing': dict(processing_stats),
+        'actions': action_sink.get_stats() if action_sink else None,
+        'partitions': partitioned_engine.get_stats() if partitioned_engine else None,
+        'rule_profiles': profiles[:10],
+        'checkpoint': checkpoint_store.get_stats() if checkpoint_store else None,
+        'event_time': event_clock.get_stats() if event_clock else None,
+        'bus': bus_subscriber.get_stats() if bus_subscriber else None,
+        'rules_version': rules_version,
+        'throttle': action_throttle.get_stats(),
+        'trigger_stats': dict(trigger_stats),
+        'cpu_budget_us': CEP_RULE_CPU_BUDGET_US,
         'timestamp': datetime.utcnow().isoformat()
     })
 
@@ -448,40 +1039,21 @@ def service_info():
             '/rules': 'Get/create CEP rules',
             '/rules/<id>': 'Get/update/delete specific rule',
             '/rules/<id>/test': 'Test rule with sample data',
+            '/rules/<id>/profile': 'Rule evaluation cost and match statistics',
+            '/rules/backtest': 'Backtest rules against recorded events',
             '/stats': 'CEP engine statistics'
         },
         'active_rules': len(cep_rules),
-        'supported_patterns': ['price_spike', 'volume_surge', 'arbitrage_opportunity', 'trend_reversal', 'custom']
+        'supported_patterns': [
+            'price_spike', 'volume_surge', 'arbitrage_opportunity', 'trend_reversal',
+            'price_move_arbitrage', 'custom'
+        ]
     })
 
 if __name__ == '__main__':
     logger.info("🚀 Starting ASCEP CEP Engine Service...")
     
-    # Load existing rules from Redis
-    if redis_client:
-        try:
-            stored_rules = redis_client.hgetall('cep_rules')
-            for rule_id, rule_data in stored_rules.items():
-                rule_dict = json.loads(rule_data)
-                rule = CEPRule(
-                    rule_id=int(rule_dict['rule_id']),
-                    name=rule_dict['name'],
-                    pattern=rule_dict['pattern'],
-                    action=rule_dict['action'],
-                    conditions=rule_dict.get('conditions', {}),
-                    enabled=rule_dict.get('enabled', True)
-                )
-                rule.last_triggered = rule_dict.get('last_triggered')
-                rule.trigger_count = rule_dict.get('trigger_count', 0)
-                cep_rules[rule.rule_id] = rule
-            
-            logger.info(f"📊 Loaded {len(cep_rules)} rules from Redis")
-        except Exception as e:
-            logger.error(f"Error loading rules from Redis: {e}")
-    
-    # Start event processing thread
-    processing_thread = threading.Thread(target=cep_processing_thread, daemon=True)
-    processing_thread.start()
+    start_service()
     
     logger.info("✅ CEP Engine service started!")
     app.run(host='0.0.0.0', port=5004, debug=False) 
\ No newline at end of file
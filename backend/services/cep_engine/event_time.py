@@ -0,0 +1,166 @@
+"""
+ASCEP CEP Engine - Event Time
+Source timestamps, per-source watermarks and a bounded reorder buffer.
+
+Each source (the event's `source` field, or the Redis channel it arrived on)
+tracks the highest event time it has produced. The engine watermark is the
+minimum over active sources minus the allowed lateness; buffered events are
+released to the rules in event-time order once the watermark passes them.
+Events older than the watermark are late: they are counted and dropped
+instead of being folded into state out of order. Sources that go quiet for
+longer than the idle timeout stop holding the watermark back.
+"""
+
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def parse_event_time(timestamp) -> Optional[datetime]:
+    """Parse an event timestamp (ISO string or epoch seconds) into a naive UTC datetime"""
+    if timestamp is None:
+        return None
+    try:
+        if isinstance(timestamp, (int, float)):
+            return datetime.utcfromtimestamp(timestamp)
+        parsed = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = datetime.utcfromtimestamp(parsed.timestamp())
+        return parsed
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def event_time_seconds(event: Dict) -> Optional[float]:
+    """Event time of an event as UTC epoch seconds, or None when it has no usable timestamp"""
+    timestamp_ns = event.get('timestamp_ns')
+    if timestamp_ns is not None:
+        return timestamp_ns / 1e9  # binary ticks carry the parsed time
+    parsed = parse_event_time(event.get('timestamp'))
+    if parsed is None:
+        return None
+    return (parsed - _EPOCH).total_seconds()
+
+
+class EventClock:
+    """Watermark tracker and reorder buffer for event-time processing"""
+
+    def __init__(self, allowed_lateness_ms: float = 500, idle_timeout: float = 5.0,
+                 max_buffered: int = 100000):
+        self.allowed_lateness = allowed_lateness_ms / 1000
+        self.idle_timeout = idle_timeout
+        self.max_buffered = max_buffered
+        self.sources = {}        # source -> [max event time, monotonic time last seen]
+        self.buffer = []         # heap of (event time, arrival seq, event)
+        self.seq = 0
+        self.watermark = float('-inf')
+        self.late_by_source = {}
+        self.stats = {
+            'released': 0,
+            'late': 0,
+            'no_event_time': 0,
+            'forced_releases': 0
+        }
+
+    def push_batch(self, events: Iterable[Tuple[Dict, str]]) -> List[Dict]:
+        """Add (event, default source) pairs; returns the events now ready, in event-time order"""
+        ready = []
+        now = time.monotonic()
+        for event, default_source in events:
+            event_time = event_time_seconds(event)
+            if event_time is None:
+                # Nothing to order by: process in arrival order
+                self.stats['no_event_time'] += 1
+                ready.append(event)
+                continue
+
+            source = event.get('source') or default_source
+            if event_time < self.watermark:
+                self.stats['late'] += 1
+                self.late_by_source[source] = self.late_by_source.get(source, 0) + 1
+                continue
+
+            tracked = self.sources.get(source)
+            if tracked is None:
+                self.sources[source] = [event_time, now]
+            else:
+                if event_time > tracked[0]:
+                    tracked[0] = event_time
+                tracked[1] = now
+
+            self.seq += 1
+            heapq.heappush(self.buffer, (event_time, self.seq, event))
+
+        ready.extend(self._release(now))
+        return ready
+
+    def poll(self) -> List[Dict]:
+        """Release events held back only by sources that have since gone idle"""
+        if not self.buffer:
+            return []
+        return self._release(time.monotonic())
+
+    def _release(self, now: float) -> List[Dict]:
+        active = [max_time for max_time, last_seen in self.sources.values()
+                  if now - last_seen <= self.idle_timeout]
+        if active:
+            candidate = min(active) - self.allowed_lateness
+        elif self.sources:
+            candidate = max(max_time for max_time, _ in self.sources.values())
+        else:
+            return []
+        if candidate > self.watermark:
+            self.watermark = candidate
+
+        ready = []
+        buffer = self.buffer
+        while buffer and buffer[0][0] <= self.watermark:
+            ready.append(heapq.heappop(buffer)[2])
+
+        # Bound memory: a stuck source cannot hold back an unbounded backlog
+        while len(buffer) > self.max_buffered:
+            event_time, _, event = heapq.heappop(buffer)
+            self.watermark = max(self.watermark, event_time)
+            self.stats['forced_releases'] += 1
+            ready.append(event)
+
+        self.stats['released'] += len(ready)
+        return ready
+
+    def snapshot(self) -> Dict:
+        """Buffered events and watermarks, for checkpoints (the buffer is small: one lateness window)"""
+        return {
+            'buffer': list(self.buffer),
+            'seq': self.seq,
+            'watermark': self.watermark,
+            'sources': {source: max_time for source, (max_time, _) in self.sources.items()}
+        }
+
+    def restore(self, state: Dict):
+        """Reload a snapshot; restored sources count as active until the idle timeout passes"""
+        now = time.monotonic()
+        self.buffer = list(state['buffer'])
+        heapq.heapify(self.buffer)
+        self.seq = state['seq']
+        self.watermark = state['watermark']
+        self.sources = {source: [max_time, now] for source, max_time in state['sources'].items()}
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            **self.stats,
+            'buffered': len(self.buffer),
+            'allowed_lateness_ms': self.allowed_lateness * 1000,
+            'watermark': datetime.utcfromtimestamp(self.watermark).isoformat() if self.watermark > 0 else None,
+            'late_by_source': dict(self.late_by_source),
+            'sources': {
+                source: {
+                    'max_event_time': datetime.utcfromtimestamp(max_time).isoformat(),
+                    'idle': now - last_seen > self.idle_timeout
+                }
+                for source, (max_time, last_seen) in self.sources.items()
+            }
+        }
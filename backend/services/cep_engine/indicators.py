@@ -0,0 +1,118 @@
+"""
+ASCEP CEP Engine - Streaming Indicators
+Incremental EMA/MACD/RSI state shared across CEP rules
+"""
+
+from array import array
+from typing import Dict, NamedTuple
+
+# Slot layout of TrendState.values
+FAST_EMA = 0
+SLOW_EMA = 1
+SIGNAL_EMA = 2
+PREV_DIFF = 3
+AVG_GAIN = 4
+AVG_LOSS = 5
+LAST_PRICE = 6
+COUNT = 7
+_SLOTS = 8
+
+
+class TrendSpec(NamedTuple):
+    """Parameters that identify one shared trend indicator"""
+    fast_window: int = 12
+    slow_window: int = 26
+    signal_window: int = 0   # 0 = compare fast vs slow EMA, >0 = MACD vs signal line
+    rsi_window: int = 0      # 0 = no RSI confirmation
+
+    @classmethod
+    def from_conditions(cls, conditions: Dict) -> 'TrendSpec':
+        """Build a spec from rule conditions, validating the windows"""
+        spec = cls(
+            fast_window=int(conditions.get('fast_window', 12)),
+            slow_window=int(conditions.get('slow_window', 26)),
+            signal_window=int(conditions.get('signal_window', 0) or 0),
+            rsi_window=int(conditions.get('rsi_window', 0) or 0)
+        )
+        if spec.fast_window < 1 or spec.slow_window <= spec.fast_window:
+            raise ValueError('trend_reversal requires 1 <= fast_window < slow_window')
+        if spec.signal_window < 0 or spec.rsi_window < 0:
+            raise ValueError('signal_window and rsi_window must be non-negative')
+        return spec
+
+
+class TrendState:
+    """O(1)-per-tick EMA crossover state for one (symbol, spec) pair"""
+
+    __slots__ = ('spec', 'values', 'alphas', 'warmup', 'signal')
+
+    def __init__(self, spec: TrendSpec):
+        self.spec = spec
+        self.values = array('d', [0.0] * _SLOTS)
+        self.alphas = (
+            2.0 / (spec.fast_window + 1),
+            2.0 / (spec.slow_window + 1),
+            2.0 / (spec.signal_window + 1) if spec.signal_window else 0.0
+        )
+        self.warmup = spec.slow_window + spec.signal_window
+        self.signal = 0  # 1 = bullish crossover, -1 = bearish crossover, 0 = none
+
+    def update(self, price: float) -> int:
+        """Advance the indicator by one tick and return the crossover signal"""
+        v = self.values
+        count = v[COUNT]
+
+        if count == 0:
+            v[FAST_EMA] = v[SLOW_EMA] = v[LAST_PRICE] = price
+            v[COUNT] = 1
+            self.signal = 0
+            return 0
+
+        fast_alpha, slow_alpha, signal_alpha = self.alphas
+        v[FAST_EMA] += fast_alpha * (price - v[FAST_EMA])
+        v[SLOW_EMA] += slow_alpha * (price - v[SLOW_EMA])
+        macd = v[FAST_EMA] - v[SLOW_EMA]
+        if signal_alpha:
+            v[SIGNAL_EMA] += signal_alpha * (macd - v[SIGNAL_EMA])
+            diff = macd - v[SIGNAL_EMA]
+        else:
+            diff = macd
+
+        rsi_window = self.spec.rsi_window
+        if rsi_window:
+            change = price - v[LAST_PRICE]
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            # Simple average until the window fills, Wilder smoothing afterwards
+            period = count if count < rsi_window else rsi_window
+            v[AVG_GAIN] += (gain - v[AVG_GAIN]) / period
+            v[AVG_LOSS] += (loss - v[AVG_LOSS]) / period
+
+        v[LAST_PRICE] = price
+        count += 1
+        v[COUNT] = count
+        prev_diff = v[PREV_DIFF]
+        v[PREV_DIFF] = diff
+
+        signal = 0
+        if count > self.warmup:
+            if prev_diff <= 0 < diff:
+                signal = 1
+            elif prev_diff >= 0 > diff:
+                signal = -1
+            # RSI confirms momentum: bullish above 50, bearish below 50
+            if signal and rsi_window:
+                rsi = self.rsi()
+                if (signal > 0 and rsi < 50) or (signal < 0 and rsi > 50):
+                    signal = 0
+
+        self.signal = signal
+        return signal
+
+    def rsi(self) -> float:
+        """Current RSI value (50 when there is no movement yet)"""
+        avg_gain = self.values[AVG_GAIN]
+        avg_loss = self.values[AVG_LOSS]
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
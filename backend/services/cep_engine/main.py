@@ -22,11 +22,13 @@ logger = logging.getLogger(__name__)
 service_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, service_dir)
 
-from backend.services.cep_engine.cep_engine_service import app
+from backend.services.cep_engine.cep_engine_service import app, start_service
 # from cep_engine_service import app
 
 if __name__ == '__main__':
     logger.info("🚀 Starting ASCEP CEP Engine Service...")
     logger.info("🧠 Service will be available at: http://localhost:5004")
     
+    start_service()
+    
     app.run(host='0.0.0.0', port=5004, debug=False) 
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+ASCEP CEP Engine - Partitioned Evaluation
+Hash-routes events by a key (symbol by default) to N worker processes.
+Each worker owns its own rule graph, keyed state and action sink; rule
+definitions are broadcast to every worker. Events for one key always go
+to the same worker queue, so per-key ordering is preserved.
+
+Multi-symbol events (arbitrage signals) are evaluated in the partition of
+their first leg only. So that price_move_arbitrage there can look at every
+leg's ticks, while a join rule is enabled and events are partitioned by
+symbol, every tick is also copied to the other partitions, where only join
+operators see it and nothing can match.
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def _partition_of(value, partitions: int) -> int:
+    return zlib.crc32(str(value).encode()) % partitions
+
+
+def partition_for(event: Dict, key: str, partitions: int) -> int:
+    """Stable partition index for an event (crc32, not the per-process salted hash())"""
+    value = event.get(key)
+    if value is None:
+        # Multi-symbol events (arbitrage signals) are routed by their first leg
+        symbols = event.get('symbols')
+        value = symbols[0] if symbols else ''
+    return _partition_of(value, partitions)
+
+
+def is_join_tick(event: Dict) -> bool:
+    """A tick a price move join buffers (see PriceMoveJoin.compute)"""
+    return bool(event.get('symbol')) and isinstance(event.get('price'), (int, float))
+
+
+def _worker_main(worker_id: int, inbox, outbox, report_interval: float):
+    """Worker process entry point: evaluates routed events with private state"""
+    # Each worker imports its own copy of the engine (graph, rules, Redis, action sink)
+    from backend.services.cep_engine import cep_engine_service as engine
+
+    engine.logger.info(f"🧩 CEP worker {worker_id} started")
+    reported_counts = {}
+    reported_suppressed = {}
+    next_report = time.monotonic() + report_interval
+
+    while True:
+        try:
+            kind, payload = inbox.get(timeout=report_interval)
+        except queue.Empty:
+            kind, payload = None, None
+
+        try:
+            if kind == 'events':
+                engine.process_events(payload)
+            elif kind == 'join_events':
+                engine.process_events(payload, join_only=True)
+            elif kind == 'rule':
+                rule = engine.apply_rule_definition(payload)
+                # Counters copied from the parent's definition are not this worker's to report
+                reported_counts.setdefault(rule.rule_id, rule.trigger_count)
+                reported_suppressed.setdefault(rule.rule_id, rule.suppressed_count)
+            elif kind == 'delete':
+                rule = engine.cep_rules.pop(payload, None)
+                if rule:
+                    engine.unregister_rule(rule)
+                reported_counts.pop(payload, None)
+                reported_suppressed.pop(payload, None)
+            elif kind == 'stop':
+                break
+        except Exception as e:
+            engine.logger.error(f"CEP worker {worker_id} error: {e}")
+
+        if time.monotonic() >= next_report:
+            next_report = time.monotonic() + report_interval
+            triggers = {}
+            for rule_id, rule in list(engine.cep_rules.items()):
+                delta = rule.trigger_count - reported_counts.get(rule_id, 0)
+                suppressed = rule.suppressed_count - reported_suppressed.get(rule_id, 0)
+                if delta or suppressed:
+                    triggers[rule_id] = (delta, rule.last_triggered, suppressed)
+                    reported_counts[rule_id] = rule.trigger_count
+                    reported_suppressed[rule_id] = rule.suppressed_count
+            outbox.put((worker_id, {
+                'triggers': triggers,
+                'profiles': {
+                    rule_id: engine.rule_profile(rule_id) for rule_id in list(engine.cep_rules)
+                },
+                'violations': engine.rule_profiler.pop_violations(),
+                'processing': dict(engine.processing_stats),
+                'actions': engine.action_sink.get_stats() if engine.action_sink else None
+            }))
+
+
+class PartitionedEngine:
+    """Routes event batches to a pool of worker processes by partition key"""
+
+    def __init__(self, workers: int, partition_key: str = 'symbol',
+                 queue_size: int = 1000, report_interval: float = 2.0):
+        self.workers = workers
+        self.partition_key = partition_key
+        # spawn: workers must not inherit the parent's threads, sockets or locks
+        context = multiprocessing.get_context('spawn')
+        self.inboxes = [context.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.outbox = context.Queue()
+        self.processes = [
+            context.Process(
+                target=_worker_main,
+                args=(worker_id, inbox, self.outbox, report_interval),
+                name=f"cep-worker-{worker_id}",
+                daemon=True
+            )
+            for worker_id, inbox in enumerate(self.inboxes)
+        ]
+        self.worker_stats = {}
+        self.routed = [0] * workers
+        self.mirrored = 0
+        self.join_rules = set()  # enabled rules with a price move join
+
+    def start(self, report_handler=None):
+        """Start worker processes and the thread collecting their reports"""
+        for process in self.processes:
+            process.start()
+        threading.Thread(target=self._collect_reports, args=(report_handler,), daemon=True).start()
+        logger.info(f"🧩 Started {self.workers} CEP workers partitioned by '{self.partition_key}'")
+
+    def submit(self, events: List[Dict]):
+        """Route a batch of events; blocks (backpressure) when a worker queue is full"""
+        mirror = bool(self.join_rules) and self.partition_key == 'symbol'
+        runs = {}  # partition -> [[kind, events]], in batch order
+        for event in events:
+            index = partition_for(event, self.partition_key, self.workers)
+            self._append(runs, index, 'events', event)
+            self.routed[index] += 1
+            if mirror and is_join_tick(event):
+                for other in range(self.workers):
+                    if other != index:
+                        self._append(runs, other, 'join_events', event)
+                self.mirrored += 1
+        for index, partition_runs in runs.items():
+            for kind, batch in partition_runs:
+                self.inboxes[index].put((kind, batch))
+
+    @staticmethod
+    def _append(runs, index, kind, event):
+        # Consecutive events of one kind share a message; order within a partition is kept
+        partition_runs = runs.setdefault(index, [])
+        if partition_runs and partition_runs[-1][0] == kind:
+            partition_runs[-1][1].append(event)
+        else:
+            partition_runs.append([kind, [event]])
+
+    def broadcast_rule(self, rule_dict: Dict):
+        """Send a rule definition (create or update) to every worker"""
+        if rule_dict.get('pattern') == 'price_move_arbitrage' and rule_dict.get('enabled', True):
+            self.join_rules.add(rule_dict['rule_id'])
+        else:
+            self.join_rules.discard(rule_dict['rule_id'])
+        for inbox in self.inboxes:
+            inbox.put(('rule', rule_dict))
+
+    def broadcast_delete(self, rule_id: int):
+        """Remove a rule from every worker"""
+        self.join_rules.discard(rule_id)
+        for inbox in self.inboxes:
+            inbox.put(('delete', rule_id))
+
+    def _collect_reports(self, report_handler):
+        while True:
+            try:
+                worker_id, report = self.outbox.get()
+                self.worker_stats[worker_id] = report
+                if report_handler:
+                    report_handler(report)
+            except Exception as e:
+                logger.error(f"Error collecting CEP worker report: {e}")
+                time.sleep(1)
+
+    def get_stats(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'partition_key': self.partition_key,
+            'alive': sum(1 for process in self.processes if process.is_alive()),
+            'routed_events': list(self.routed),
+            'mirrored_ticks': self.mirrored,
+            'worker_stats': {
+                worker_id: {'processing': report['processing'], 'actions': report['actions']}
+                for worker_id, report in self.worker_stats.items()
+            }
+        }
+
+    def stop(self):
+        for inbox in self.inboxes:
+            inbox.put(('stop', None))
@@ -0,0 +1,167 @@
+"""
+ASCEP CEP Engine - Rule Profiling
+Sampled per-rule evaluation cost and action latency accounting.
+
+Evaluation and match counts come from the operator graph's counters (free on
+the hot path). Timing is taken on one event out of every `sample_every`
+with the monotonic nanosecond clock; the cost of a shared operator is split
+evenly between the rules that use it.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+
+def percentile(samples, q: float) -> float:
+    """Nearest-rank percentile of a sample collection"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * q))
+    return ordered[index]
+
+
+class RuleProfile:
+    """Rolling cost samples for one rule"""
+
+    __slots__ = ('eval_samples', 'sampled_ns', 'sampled_evaluations',
+                 'action_samples', 'actions', 'action_ns', 'over_budget')
+
+    def __init__(self, sample_size: int):
+        self.eval_samples = deque(maxlen=sample_size)    # amortized ns per sampled evaluation
+        self.sampled_ns = 0
+        self.sampled_evaluations = 0
+        self.action_samples = deque(maxlen=sample_size)  # ns spent building/queueing actions
+        self.actions = 0
+        self.action_ns = 0
+        self.over_budget = False
+
+
+class RuleProfiler:
+    """Collects sampled rule costs and flags rules that exceed a CPU budget"""
+
+    def __init__(self, sample_every: int = 32, sample_size: int = 512,
+                 budget_us: float = 0, min_samples: int = 50):
+        self.sample_every = max(1, sample_every)
+        self.sample_size = sample_size
+        self.budget_ns = budget_us * 1000
+        self.min_samples = min_samples
+        self.counter = 0
+        self.profiles = {}
+        self.violations = set()
+        self.lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        """True for one event out of every `sample_every`"""
+        self.counter += 1
+        if self.counter >= self.sample_every:
+            self.counter = 0
+            return True
+        return False
+
+    def _profile(self, rule_id) -> RuleProfile:
+        profile = self.profiles.get(rule_id)
+        if profile is None:
+            profile = self.profiles[rule_id] = RuleProfile(self.sample_size)
+        return profile
+
+    def record_evaluation(self, graph, timings: Dict):
+        """Attribute per-operator timings of one sampled event to the rules that ran"""
+        refcounts = graph.refcounts
+        with self.lock:
+            for rule_id, keys in graph.rule_chains.items():
+                if keys[-1] not in timings:
+                    continue  # the rule's chain was cut short before its predicate
+                cost = 0.0
+                for key in keys[1:]:
+                    cost += timings.get(key, 0) / refcounts[key]
+                profile = self._profile(rule_id)
+                profile.eval_samples.append(cost)
+                profile.sampled_ns += cost
+                profile.sampled_evaluations += 1
+
+                if (self.budget_ns and not profile.over_budget
+                        and profile.sampled_evaluations >= self.min_samples
+                        and profile.sampled_ns / profile.sampled_evaluations > self.budget_ns):
+                    profile.over_budget = True
+                    self.violations.add(rule_id)
+
+    def record_action(self, rule_id, elapsed_ns: int):
+        with self.lock:
+            profile = self._profile(rule_id)
+            profile.action_samples.append(elapsed_ns)
+            profile.actions += 1
+            profile.action_ns += elapsed_ns
+
+    def reset(self, rule_id):
+        """Forget a rule's samples (after it is updated or deleted)"""
+        with self.lock:
+            self.profiles.pop(rule_id, None)
+            self.violations.discard(rule_id)
+
+    def pop_violations(self) -> List:
+        """Return and clear the rules that newly exceeded the budget"""
+        with self.lock:
+            violations = list(self.violations)
+            self.violations.clear()
+        return violations
+
+    def summarize(self, rule_id, evaluations: int, matches: int) -> Dict:
+        """Profile summary for a rule, given its graph evaluation/match counters"""
+        with self.lock:
+            profile = self.profiles.get(rule_id)
+            eval_samples = list(profile.eval_samples) if profile else []
+            action_samples = list(profile.action_samples) if profile else []
+            mean_ns = profile.sampled_ns / profile.sampled_evaluations if profile and profile.sampled_evaluations else 0.0
+            actions = profile.actions if profile else 0
+            action_ns = profile.action_ns if profile else 0
+            over_budget = profile.over_budget if profile else False
+
+        return {
+            'rule_id': rule_id,
+            'evaluations': evaluations,
+            'matches': matches,
+            'match_rate': matches / evaluations if evaluations else 0.0,
+            'sampled_evaluations': len(eval_samples),
+            'mean_eval_us': mean_ns / 1000,
+            'p50_eval_us': percentile(eval_samples, 0.50) / 1000,
+            'p99_eval_us': percentile(eval_samples, 0.99) / 1000,
+            'estimated_total_eval_ms': mean_ns * evaluations / 1e6,
+            'actions': actions,
+            'mean_action_us': action_ns / actions / 1000 if actions else 0.0,
+            'p99_action_us': percentile(action_samples, 0.99) / 1000,
+            'over_budget': over_budget
+        }
+
+
+def merge_summaries(summaries: List[Dict]) -> Optional[Dict]:
+    """Combine per-worker summaries of one rule (p50 is evaluation-weighted, p99 is the max)"""
+    if not summaries:
+        return None
+    if len(summaries) == 1:
+        return summaries[0]
+
+    evaluations = sum(s['evaluations'] for s in summaries)
+    matches = sum(s['matches'] for s in summaries)
+    actions = sum(s['actions'] for s in summaries)
+
+    def weighted(field, weight):
+        total = sum(s[weight] for s in summaries)
+        return sum(s[field] * s[weight] for s in summaries) / total if total else 0.0
+
+    return {
+        'rule_id': summaries[0]['rule_id'],
+        'evaluations': evaluations,
+        'matches': matches,
+        'match_rate': matches / evaluations if evaluations else 0.0,
+        'sampled_evaluations': sum(s['sampled_evaluations'] for s in summaries),
+        'mean_eval_us': weighted('mean_eval_us', 'evaluations'),
+        'p50_eval_us': weighted('p50_eval_us', 'evaluations'),
+        'p99_eval_us': max(s['p99_eval_us'] for s in summaries),
+        'estimated_total_eval_ms': sum(s['estimated_total_eval_ms'] for s in summaries),
+        'actions': actions,
+        'mean_action_us': weighted('mean_action_us', 'actions'),
+        'p99_action_us': max(s['p99_action_us'] for s in summaries),
+        'over_budget': any(s['over_budget'] for s in summaries)
+    }
@@ -0,0 +1,120 @@
+"""
+ASCEP CEP Engine - Event Recorder
+Appends raw events to daily JSON-lines files so they can be replayed
+(backtests, restart recovery) without touching live state.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from backend.services.cep_engine.event_time import parse_event_time
+
+logger = logging.getLogger(__name__)
+
+
+class EventRecorder:
+    """Writes raw event payloads to `events-YYYYMMDD.jsonl` files, one per UTC day
+
+    Files older than `retention_days` (0 keeps them all) are deleted when
+    the day rolls over.
+    """
+
+    def __init__(self, directory: str, retention_days: int = 0):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.date = None
+        self.file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, date: str) -> str:
+        return os.path.join(self.directory, f"events-{date}.jsonl")
+
+    def write(self, raw_events: List[str]):
+        """Append a batch of raw JSON payloads"""
+        if not raw_events:
+            return
+        date = datetime.utcnow().strftime('%Y%m%d')
+        if date != self.date:
+            self.close()
+            self.date = date
+            self.file = open(self.path_for(date), 'ab')
+            if self.retention_days > 0:
+                cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).strftime('%Y%m%d')
+                self.prune(before=self.path_for(cutoff))
+        self.file.write(('\n'.join(raw_events) + '\n').encode('utf-8'))
+        self.file.flush()
+
+    def position(self) -> Optional[Tuple[str, int]]:
+        """(path, byte offset) just past the last recorded event"""
+        if self.file is None:
+            return None
+        return self.file.name, self.file.tell()
+
+    def prune(self, before: str) -> int:
+        """Delete recording files that sort before `before` (never the open file)"""
+        current = self.file.name if self.file else None
+        removed = 0
+        for path in recording_files(self.directory):
+            if os.path.basename(path) >= os.path.basename(before) or path == current:
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove recording {path}: {e}")
+        if removed:
+            logger.info(f"🧹 Removed {removed} old event recording(s)")
+        return removed
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def recording_files(directory: str, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> List[str]:
+    """Recording files whose day overlaps [start, end], oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    first = start.strftime('%Y%m%d') if start else None
+    last = end.strftime('%Y%m%d') if end else None
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('events-') and name.endswith('.jsonl')):
+            continue
+        date = name[len('events-'):-len('.jsonl')]
+        if (first and date < first) or (last and date > last):
+            continue
+        paths.append(os.path.join(directory, name))
+    return paths
+
+
+def iter_recorded_events(paths: Iterable[str], start: Optional[datetime] = None,
+                         end: Optional[datetime] = None, loads: Callable = json.loads,
+                         offset: int = 0) -> Iterator[dict]:
+    """Yield recorded events in file order, optionally filtered by event time
+
+    `offset` is a byte position in the first file to resume from.
+    """
+    for index, path in enumerate(paths):
+        with open(path, 'rb') as f:
+            if index == 0 and offset:
+                f.seek(offset)
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    event = loads(line)
+                except ValueError:
+                    continue
+                if start or end:
+                    event_time = parse_event_time(event.get('timestamp'))
+                    if event_time is None:
+                        continue
+                    if (start and event_time < start) or (end and event_time > end):
+                        continue
+                yield event
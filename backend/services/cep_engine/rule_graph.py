@@ -0,0 +1,555 @@
+"""
+ASCEP CEP Engine - Shared Operator Graph
+Compiles enabled CEP rules into a deduplicated operator DAG
+(source -> filter -> window/join -> aggregate -> predicate) so common
+subexpressions are computed once per event and fanned out to every rule
+that depends on them.
+"""
+
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, Optional
+
+from backend.services.cep_engine.event_time import event_time_seconds
+from backend.services.cep_engine.indicators import TrendSpec, TrendState
+from backend.services.common.tick_codec import public_event
+
+
+class Operator:
+    """Base class for graph operators
+
+    Every operator has exactly one input, so its key (which embeds the
+    input key) identifies the whole upstream chain. Two rules that compile
+    to the same key share the operator instance and its state.
+    """
+
+    kind = 'operator'
+
+    def __init__(self, parent: Optional['Operator'], *params):
+        self.parent = parent
+        self.params = params
+        self.key = (self.kind,) + params + ((parent.key,) if parent else ())
+        self.children = []
+        self.rule_ids = set()
+        self.evaluations = 0   # times compute() ran
+        self.passed = 0        # times it produced an output (matches, for predicates)
+
+    def compute(self, event: Dict, value):
+        """Return the operator output for an event, or None to stop propagation"""
+        raise NotImplementedError
+
+    def snapshot(self, full: bool = False) -> Optional[Dict]:
+        """Keyed state changed since the last snapshot (all of it when full), or None"""
+        return None
+
+    def restore(self, state: Dict):
+        """Load keyed state produced by snapshot()"""
+
+
+class Source(Operator):
+    kind = 'source'
+
+    def __init__(self):
+        super().__init__(None)
+
+    def compute(self, event, value):
+        return event
+
+
+class Filter(Operator):
+    """Pass the input through only when the event matches"""
+
+    kind = 'filter'
+
+    def compute(self, event, value):
+        name, arg = self.params
+        if name == 'tick':
+            price = event.get('price')
+            if event.get('symbol') and isinstance(price, (int, float)):
+                return value
+            return None
+        if name == 'symbol':
+            return value if event.get('symbol') == arg else None
+        if name == 'leg':
+            return value if arg in (event.get('symbols') or ()) else None
+        if name == 'field':
+            if event.get('symbol') and isinstance(event.get(arg), (int, float)):
+                return value
+            return None
+        return None
+
+
+class Window(Operator):
+    """Per-symbol count window over a numeric event field"""
+
+    kind = 'window'
+
+    def __init__(self, parent, field, size):
+        super().__init__(parent, field, size)
+        self.windows = {}      # symbol -> deque of the last `size` values
+        self.last_tick = {}    # symbol -> timestamp of the last appended tick
+        self.dirty = set()     # symbols changed since the last snapshot
+
+    def compute(self, event, value):
+        field, size = self.params
+        symbol = event['symbol']
+        window = self.windows.get(symbol)
+        if window is None:
+            window = self.windows[symbol] = deque(maxlen=size)
+
+        # The same tick arrives on both 'events' and 'price_updates'
+        timestamp = event.get('timestamp')
+        if timestamp is not None and self.last_tick.get(symbol) == timestamp:
+            return None
+        self.last_tick[symbol] = timestamp
+        window.append(float(event.get(field, 0)))
+        self.dirty.add(symbol)
+        return window
+
+    def snapshot(self, full=False):
+        symbols = list(self.windows) if full else self.dirty
+        state = {symbol: (list(self.windows[symbol]), self.last_tick.get(symbol)) for symbol in symbols}
+        self.dirty = set()
+        return state or None
+
+    def restore(self, state):
+        size = self.params[1]
+        for symbol, (values, timestamp) in state.items():
+            self.windows[symbol] = deque(values, maxlen=size)
+            self.last_tick[symbol] = timestamp
+
+
+class Aggregate(Operator):
+    """Derived value computed from the input (window, event or keyed state)"""
+
+    kind = 'aggregate'
+
+    def __init__(self, parent, name, arg=None):
+        super().__init__(parent, name, arg)
+        self.states = {}       # symbol -> TrendState (trend aggregates only)
+        self.last_tick = {}
+        self.dirty = set()
+
+    def compute(self, event, value):
+        name, arg = self.params
+        if name == 'pct_change':
+            if len(value) < 2 or value[0] <= 0:
+                return None
+            return ((value[-1] - value[0]) / value[0]) * 100
+        if name == 'field':
+            field_value = event.get(arg, 0)
+            return field_value if isinstance(field_value, (int, float)) else None
+        if name == 'text':
+            return str(public_event(event))
+        if name == 'trend':
+            return self._update_trend(event, arg)
+        return None
+
+    def _update_trend(self, event, spec):
+        symbol = event['symbol']
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = TrendState(spec)
+
+        timestamp = event.get('timestamp')
+        if timestamp is not None and self.last_tick.get(symbol) == timestamp:
+            return None
+        self.last_tick[symbol] = timestamp
+        self.dirty.add(symbol)
+        return state.update(float(event['price']))
+
+    def snapshot(self, full=False):
+        symbols = list(self.states) if full else self.dirty
+        state = {
+            symbol: (self.states[symbol].values.tobytes(), self.states[symbol].signal, self.last_tick.get(symbol))
+            for symbol in symbols
+        }
+        self.dirty = set()
+        return state or None
+
+    def restore(self, state):
+        spec = self.params[1]
+        for symbol, (values, signal, timestamp) in state.items():
+            trend = self.states[symbol] = TrendState(spec)
+            trend.values = array('d')
+            trend.values.frombytes(values)
+            trend.signal = signal
+            self.last_tick[symbol] = timestamp
+
+
+class Baseline(Operator):
+    """Per-symbol ratio of a numeric field to its rolling (EWMA) baseline
+
+    The ratio is taken against the baseline before the current tick is
+    folded in, and only once `window` ticks have been seen for the symbol.
+    """
+
+    kind = 'baseline'
+
+    def __init__(self, parent, field, window):
+        super().__init__(parent, field, window)
+        self.alpha = 2.0 / (window + 1)
+        self.states = {}       # symbol -> [baseline, ticks seen, last ratio]
+        self.last_tick = {}
+        self.dirty = set()
+
+    def compute(self, event, value):
+        field, window = self.params
+        symbol = event['symbol']
+        state = self.states.get(symbol)
+
+        timestamp = event.get('timestamp')
+        if timestamp is not None and self.last_tick.get(symbol) == timestamp:
+            return None
+        self.last_tick[symbol] = timestamp
+        self.dirty.add(symbol)
+
+        current = float(event[field])
+        if state is None:
+            self.states[symbol] = [current, 1, None]
+            return None
+        baseline, count, _ = state
+        ratio = current / baseline if count >= window and baseline > 0 else None
+        state[0] = baseline + self.alpha * (current - baseline)
+        state[1] = count + 1
+        state[2] = ratio
+        return ratio
+
+    def snapshot(self, full=False):
+        symbols = list(self.states) if full else self.dirty
+        state = {symbol: (tuple(self.states[symbol]), self.last_tick.get(symbol)) for symbol in symbols}
+        self.dirty = set()
+        return state or None
+
+    def restore(self, state):
+        for symbol, (values, timestamp) in state.items():
+            self.states[symbol] = list(values)
+            self.last_tick[symbol] = timestamp
+
+
+class PriceMoveJoin(Operator):
+    """Keyed, windowed join of arbitrage signals against recent ticks of their legs
+
+    Ticks are buffered per symbol (at most `max_buffer` each, evicted once
+    older than `window_seconds` in event time) and produce no output. A
+    signal (an event with `symbols`) looks up the buffer of every leg and
+    outputs the largest price move, in percent, seen within the window
+    before the signal.
+    """
+
+    kind = 'join'
+
+    def __init__(self, parent, window_seconds, max_buffer):
+        super().__init__(parent, window_seconds, max_buffer)
+        self.buffers = {}      # symbol -> deque of (event time, price)
+        self.last_tick = {}
+        self.dirty = set()
+
+    def compute(self, event, value):
+        symbols = event.get('symbols')
+        if symbols:
+            event_time = event_time_seconds(event)
+            return self.max_move(symbols, event_time) if event_time is not None else None
+
+        symbol = event.get('symbol')
+        price = event.get('price')
+        if symbol and isinstance(price, (int, float)):
+            timestamp = event.get('timestamp')
+            if self.last_tick.get(symbol) == timestamp:
+                return None
+            event_time = event_time_seconds(event)
+            if event_time is None:
+                return None
+            buffer = self.buffers.get(symbol)
+            if buffer is None:
+                buffer = self.buffers[symbol] = deque(maxlen=self.params[1])
+            buffer.append((event_time, float(price)))
+            self.last_tick[symbol] = timestamp
+            self._evict(symbol, event_time)
+            self.dirty.add(symbol)
+        return None
+
+    def _evict(self, symbol, now):
+        buffer = self.buffers[symbol]
+        horizon = now - self.params[0]
+        while buffer and buffer[0][0] < horizon:
+            buffer.popleft()
+        if not buffer:
+            del self.buffers[symbol]
+            self.last_tick.pop(symbol, None)
+            self.dirty.add(symbol)
+
+    def max_move(self, symbols, event_time: float) -> Optional[float]:
+        """Largest (max - min) / min price move of any leg within the window, in percent"""
+        best = None
+        for symbol in symbols:
+            if symbol not in self.buffers:
+                continue
+            self._evict(symbol, event_time)
+            buffer = self.buffers.get(symbol)
+            if not buffer:
+                continue
+            prices = [price for tick_time, price in buffer if tick_time <= event_time]
+            if len(prices) < 2:
+                continue
+            low = min(prices)
+            if low <= 0:
+                continue
+            move = (max(prices) - low) / low * 100
+            if best is None or move > best:
+                best = move
+        return best
+
+    def snapshot(self, full=False):
+        symbols = list(self.buffers) if full else self.dirty
+        # Evicted symbols snapshot as None so restores drop them
+        state = {
+            symbol: (list(self.buffers[symbol]), self.last_tick.get(symbol)) if symbol in self.buffers else None
+            for symbol in symbols
+        }
+        self.dirty = set()
+        return state or None
+
+    def restore(self, state):
+        max_buffer = self.params[1]
+        for symbol, entry in state.items():
+            if entry is None:
+                self.buffers.pop(symbol, None)
+                self.last_tick.pop(symbol, None)
+                continue
+            ticks, timestamp = entry
+            self.buffers[symbol] = deque(ticks, maxlen=max_buffer)
+            self.last_tick[symbol] = timestamp
+
+
+class Predicate(Operator):
+    """Boolean test on the input value; a match is fanned out to its rule ids"""
+
+    kind = 'predicate'
+
+    def compute(self, event, value):
+        op, arg = self.params
+        if op == 'abs_gte':
+            matched = abs(value) >= arg
+        elif op == 'gte':
+            matched = value >= arg
+        elif op == 'contains':
+            matched = arg in value
+        elif op == 'direction':
+            matched = value > 0 if arg == 'bullish' else value < 0 if arg == 'bearish' else value != 0
+        else:
+            matched = False
+        return True if matched else None
+
+
+def compile_rule(pattern: str, conditions: Dict) -> List[Operator]:
+    """Compile a rule definition into its operator chain (source first)
+
+    Returns an empty list for rules that can never match.
+    """
+    source = Source()
+    symbol = conditions.get('symbol')
+
+    if pattern == 'price_spike':
+        tick = Filter(source, 'tick', None)
+        window = Window(tick, 'price', 2)
+        value = Aggregate(window, 'pct_change')
+        chain = [source, tick, window, value]
+        predicate = ('abs_gte', float(conditions.get('price_change_threshold', 5.0)))
+    elif pattern == 'volume_surge' and 'surge_ratio' in conditions:
+        # Relative surge: volume against the symbol's own rolling baseline
+        window = int(conditions.get('baseline_window', 20))
+        if window < 1:
+            raise ValueError("baseline_window must be at least 1")
+        ticks = Filter(source, 'field', 'volume')
+        value = Baseline(ticks, 'volume', window)
+        chain = [source, ticks, value]
+        predicate = ('gte', float(conditions['surge_ratio']))
+    elif pattern == 'volume_surge':
+        value = Aggregate(source, 'field', 'volume')
+        chain = [source, value]
+        predicate = ('gte', float(conditions.get('volume_threshold', 1000000)))
+    elif pattern == 'arbitrage_opportunity':
+        value = Aggregate(source, 'field', 'spread_percentage')
+        chain = [source, value]
+        predicate = ('gte', float(conditions.get('spread_threshold', 0.1)))
+    elif pattern == 'trend_reversal':
+        tick = Filter(source, 'tick', None)
+        value = Aggregate(tick, 'trend', TrendSpec.from_conditions(conditions))
+        chain = [source, tick, value]
+        predicate = ('direction', conditions.get('direction', 'any'))
+    elif pattern == 'price_move_arbitrage':
+        window_seconds = float(conditions.get('window_seconds', 10))
+        max_buffer = int(conditions.get('max_buffer', 256))
+        if window_seconds <= 0 or max_buffer < 2:
+            raise ValueError("window_seconds must be positive and max_buffer at least 2")
+        value = PriceMoveJoin(source, window_seconds, max_buffer)
+        chain = [source, value]
+        predicate = ('gte', float(conditions.get('min_move_percentage', 0.5)))
+        if symbol:
+            # Signals carry their cycle in `symbols`; restrict to cycles with this leg
+            chain.append(Filter(value, 'leg', symbol))
+            symbol = None
+    else:
+        custom_condition = conditions.get('custom_condition')
+        if not custom_condition:
+            return []
+        value = Aggregate(source, 'text')
+        chain = [source, value]
+        predicate = ('contains', custom_condition)
+
+    # Symbol filters sit after the shared aggregate so per-symbol state is reused
+    if symbol:
+        chain.append(Filter(chain[-1], 'symbol', symbol))
+    chain.append(Predicate(chain[-1], *predicate))
+    return chain
+
+
+class RuleGraph:
+    """Deduplicated operator DAG shared by all enabled rules"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.root = Source()
+        self.nodes = {self.root.key: self.root}
+        self.refcounts = {self.root.key: 0}
+        self.rule_chains = {}  # rule_id -> [operator keys]
+        self.baselines = {}    # rule_id -> predicate (evaluations, passed) when the rule joined
+        self.last_ticks = {}   # symbol -> (timestamp, source) of the last tick evaluated
+        self.duplicates = 0
+
+    def add_rule(self, rule_id, pattern: str, conditions: Dict):
+        """Add (or replace) a rule, reusing any operators already in the graph"""
+        chain = compile_rule(pattern, conditions)
+        with self.lock:
+            old_chain = self.rule_chains.pop(rule_id, None)
+            keys = []
+            parent = None
+            for operator in chain:
+                node = self.nodes.get(operator.key)
+                if node is None:
+                    node = self.nodes[operator.key] = operator
+                    node.parent = parent
+                    self.refcounts[operator.key] = 0
+                    parent.children.append(node)
+                self.refcounts[node.key] += 1
+                keys.append(node.key)
+                parent = node
+            if parent is not None:
+                parent.rule_ids.add(rule_id)
+                self.rule_chains[rule_id] = keys
+                self.baselines[rule_id] = (parent.evaluations, parent.passed)
+
+            # Release the old chain after the new one so shared state survives updates
+            if old_chain:
+                self._release(rule_id, old_chain)
+
+    def remove_rule(self, rule_id):
+        """Remove a rule and any operators no other rule depends on"""
+        with self.lock:
+            keys = self.rule_chains.pop(rule_id, None)
+            self.baselines.pop(rule_id, None)
+            if keys:
+                self._release(rule_id, keys)
+
+    def _release(self, rule_id, keys):
+        # An update that compiles to the same predicate keeps its rule id there
+        current = self.rule_chains.get(rule_id)
+        if not current or current[-1] != keys[-1]:
+            self.nodes[keys[-1]].rule_ids.discard(rule_id)
+        for key in reversed(keys):
+            self.refcounts[key] -= 1
+            node = self.nodes[key]
+            if self.refcounts[key] == 0 and node is not self.root:
+                del self.nodes[key]
+                del self.refcounts[key]
+                node.parent.children.remove(node)
+
+    def evaluate(self, event: Dict, profiler=None, join_only: bool = False) -> List:
+        """Push one event through the graph and return the matched rule ids
+
+        When a profiler is given, operator timings are taken on the events
+        it selects for sampling. With join_only, only join operators see
+        the event (to buffer a tick) and nothing is matched. A tick repeating the
+        symbol's previous (timestamp, source), as when it arrives on both
+        'events' and 'price_updates', is dropped before any operator.
+        """
+        matched = []
+        timings = {} if profiler is not None and profiler.should_sample() else None
+        with self.lock:
+            symbol = event.get('symbol')
+            timestamp = event.get('timestamp')
+            if symbol is not None and timestamp is not None:
+                tick = (timestamp, event.get('source'))
+                if self.last_ticks.get(symbol) == tick:
+                    self.duplicates += 1
+                    return matched
+                self.last_ticks[symbol] = tick
+            stack = [(self.root, event)]
+            while stack:
+                node, value = stack.pop()
+                for child in node.children:
+                    if join_only and node is self.root and child.kind != 'join':
+                        continue
+                    child.evaluations += 1
+                    if timings is None:
+                        output = child.compute(event, value)
+                    else:
+                        start = time.perf_counter_ns()
+                        output = child.compute(event, value)
+                        timings[child.key] = time.perf_counter_ns() - start
+                    if output is None:
+                        continue
+                    child.passed += 1
+                    if child.rule_ids and not join_only:
+                        matched.extend(child.rule_ids)
+                    if child.children and not join_only:
+                        stack.append((child, output))
+            if timings:
+                profiler.record_evaluation(self, timings)
+        return matched
+
+    def rule_counters(self, rule_id):
+        """(evaluations, matches) of a rule's predicate since the rule joined the graph"""
+        with self.lock:
+            keys = self.rule_chains.get(rule_id)
+            if not keys:
+                return 0, 0
+            node = self.nodes[keys[-1]]
+            evaluations, passed = self.baselines[rule_id]
+            return node.evaluations - evaluations, node.passed - passed
+
+    def snapshot(self, full: bool = False) -> Dict:
+        """Operator key -> keyed state for every stateful operator (changes only unless full)"""
+        with self.lock:
+            state = {}
+            for key, node in self.nodes.items():
+                node_state = node.snapshot(full)
+                if node_state:
+                    state[key] = node_state
+            return state
+
+    def restore(self, state: Dict) -> int:
+        """Load operator state by key; returns how many operators were restored"""
+        restored = 0
+        with self.lock:
+            for key, node_state in state.items():
+                node = self.nodes.get(key)
+                if node is not None:
+                    node.restore(node_state)
+                    restored += 1
+        return restored
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            operators = {}
+            for node in self.nodes.values():
+                operators[node.kind] = operators.get(node.kind, 0) + 1
+            return {
+                'rules': len(self.rule_chains),
+                'operators': operators,
+                'shared_operators': sum(1 for count in self.refcounts.values() if count > 1),
+                'duplicate_ticks': self.duplicates
+            }
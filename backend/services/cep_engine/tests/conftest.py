@@ -0,0 +1,5 @@
+import os
+import sys
+
+# cep_engine modules import each other through the backend.services package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
@@ -0,0 +1,112 @@
+"""
+Checkpoint files: a full snapshot plus deltas restores the same operator
+state, compaction rewrites the base and a torn final record is ignored.
+"""
+
+from backend.services.cep_engine.checkpoint import CheckpointStore
+from backend.services.cep_engine.event_time import EventClock
+from backend.services.cep_engine.rule_graph import RuleGraph
+
+RULES = [
+    (1, 'price_spike', {'price_change_threshold': 1}),
+    (2, 'trend_reversal', {'fast_window': 2, 'slow_window': 4}),
+    (3, 'volume_surge', {'surge_ratio': 2, 'baseline_window': 2}),
+]
+
+
+def build_graph():
+    graph = RuleGraph()
+    for rule in RULES:
+        graph.add_rule(*rule)
+    return graph
+
+
+def ticks(symbol, start, count):
+    return [
+        {'symbol': symbol, 'price': 100.0 + (index % 5) * 1.5, 'volume': 10.0 + index,
+         'timestamp': f"2024-01-01T00:00:{index:02d}", 'source': 'Binance'}
+        for index in range(start, start + count)
+    ]
+
+
+def test_restore_from_full_snapshot_plus_deltas(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'state.ckpt'))
+    graph = build_graph()
+
+    for event in ticks('BTC/USDT', 0, 6):
+        graph.evaluate(event)
+    assert store.save(graph, ('day1.jsonl', 10)) is True   # first record is full
+    for event in ticks('ETH/USDT', 0, 6):
+        graph.evaluate(event)
+    assert store.save(graph, ('day1.jsonl', 20)) is False  # delta: ETH only
+    for event in ticks('BTC/USDT', 6, 3):
+        graph.evaluate(event)
+    assert store.save(graph, ('day1.jsonl', 30)) is False
+
+    state, position, clock = store.load()
+    assert position == ('day1.jsonl', 30)
+    assert clock is None
+
+    restored = build_graph()
+    assert restored.restore(state) == 3  # window, trend aggregate and baseline
+    assert restored.snapshot(full=True) == graph.snapshot(full=True)
+
+    # Both graphs continue identically
+    for event in ticks('BTC/USDT', 9, 5) + ticks('ETH/USDT', 6, 5):
+        assert sorted(restored.evaluate(event)) == sorted(graph.evaluate(event))
+
+
+def test_compaction_writes_a_new_base(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'state.ckpt'), compact_every=2)
+    graph = build_graph()
+    fulls = []
+    for batch in range(5):
+        for event in ticks('BTC/USDT', batch * 3, 3):
+            graph.evaluate(event)
+        fulls.append(store.save(graph, ('day1.jsonl', batch)))
+    assert fulls == [True, False, False, True, False]
+    assert store.get_stats()['compactions'] == 2
+
+    state, position, _ = store.load()
+    restored = build_graph()
+    restored.restore(state)
+    assert position == ('day1.jsonl', 4)
+    assert restored.snapshot(full=True) == graph.snapshot(full=True)
+
+
+def test_torn_final_record_is_ignored(tmp_path):
+    path = tmp_path / 'state.ckpt'
+    store = CheckpointStore(str(path))
+    graph = build_graph()
+    for event in ticks('BTC/USDT', 0, 4):
+        graph.evaluate(event)
+    store.save(graph, ('day1.jsonl', 1))
+    expected = graph.snapshot(full=True)
+    for event in ticks('BTC/USDT', 4, 4):
+        graph.evaluate(event)
+    store.save(graph, ('day1.jsonl', 2))
+
+    # Crash mid-append: the last record is cut short
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+
+    state, position, _ = CheckpointStore(str(path)).load()
+    restored = build_graph()
+    restored.restore(state)
+    assert position == ('day1.jsonl', 1)
+    assert restored.snapshot(full=True) == expected
+
+
+def test_clock_is_saved_with_the_latest_record(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'state.ckpt'))
+    clock = EventClock(allowed_lateness_ms=1000)
+    clock.push_batch([({'symbol': 'BTC/USDT', 'price': 1.0, 'timestamp': 100.0}, 'events')])
+    store.save(build_graph(), None, clock)
+
+    _, _, saved = store.load()
+    assert [event for _, _, event in saved['buffer']] == [{'symbol': 'BTC/USDT', 'price': 1.0, 'timestamp': 100.0}]
+    assert saved['watermark'] == 99.0
+
+
+def test_missing_file_loads_empty(tmp_path):
+    assert CheckpointStore(str(tmp_path / 'none.ckpt')).load() == ({}, None, None)
@@ -0,0 +1,108 @@
+"""
+Watermark release order, late-event accounting, idle sources, the buffer
+bound and snapshot/restore of the reorder buffer.
+"""
+
+import pytest
+
+from backend.services.cep_engine import event_time
+from backend.services.cep_engine.event_time import EventClock, event_time_seconds
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def monotonic(monkeypatch):
+    clock = FakeMonotonic()
+    monkeypatch.setattr(event_time.time, 'monotonic', clock)
+    return clock
+
+
+def event(seconds, source=None, **fields):
+    event = {'symbol': 'BTC/USDT', 'price': 1.0, 'timestamp': seconds, **fields}
+    if source:
+        event['source'] = source
+    return event
+
+
+def times(events):
+    return [item['timestamp'] for item in events]
+
+
+def test_event_time_sources():
+    assert event_time_seconds({'timestamp': '1970-01-01T00:00:10'}) == 10.0
+    assert event_time_seconds({'timestamp': '1970-01-01T00:00:10Z'}) == 10.0
+    assert event_time_seconds({'timestamp': 'x', 'timestamp_ns': 2_500_000_000}) == 2.5
+    assert event_time_seconds({'timestamp': 'not a time'}) is None
+
+
+def test_release_waits_for_the_watermark(monotonic):
+    clock = EventClock(allowed_lateness_ms=1000)
+    # Watermark = 12 - 1: 10 and 11 are ready, 12 is held back
+    assert times(clock.push_batch([(event(12), 'a'), (event(10), 'a'), (event(11), 'a')])) == [10, 11]
+    assert clock.watermark == 11
+    assert times(clock.push_batch([(event(11.5), 'a')])) == []
+    assert times(clock.push_batch([(event(14), 'a')])) == [11.5, 12]
+    assert clock.get_stats()['buffered'] == 1
+
+
+def test_slowest_active_source_holds_the_watermark(monotonic):
+    clock = EventClock(allowed_lateness_ms=0, idle_timeout=5)
+    assert times(clock.push_batch([(event(20), 'fast'), (event(10), 'slow')])) == [10]
+    assert times(clock.push_batch([(event(25), 'fast')])) == []
+
+    # Once the slow source is idle it no longer holds the watermark back
+    monotonic.now += 6
+    assert times(clock.poll()) == [20, 25]
+    assert clock.get_stats()['sources']['slow']['idle']
+
+
+def test_late_events_are_counted_per_source_and_dropped(monotonic):
+    clock = EventClock(allowed_lateness_ms=500)
+    clock.push_batch([(event(10, source='Binance'), 'price_updates')])
+    assert clock.watermark == 9.5
+    released = clock.push_batch([(event(9), 'events'), (event(9.2, source='Binance'), 'price_updates'),
+                                 (event(9.6), 'events')])
+    assert released == []
+    stats = clock.get_stats()
+    assert stats['late'] == 2
+    assert stats['late_by_source'] == {'events': 1, 'Binance': 1}
+    assert stats['buffered'] == 2
+
+
+def test_events_without_time_pass_in_arrival_order(monotonic):
+    clock = EventClock()
+    untimed = {'symbol': 'BTC/USDT', 'price': 1.0}
+    assert clock.push_batch([(untimed, 'events')]) == [untimed]
+    assert clock.get_stats()['no_event_time'] == 1
+
+
+def test_buffer_bound_forces_the_oldest_out(monotonic):
+    clock = EventClock(allowed_lateness_ms=0, max_buffered=2)
+    assert times(clock.push_batch([(event(100), 'stuck')])) == [100]
+    released = clock.push_batch([(event(101), 'live'), (event(102), 'live'), (event(103), 'live')])
+    # 'stuck' holds the watermark at 100; the buffer keeps only two events
+    assert times(released) == [101]
+    assert clock.stats['forced_releases'] == 1
+    assert clock.watermark == 101
+
+
+def test_snapshot_and_restore(monotonic):
+    clock = EventClock(allowed_lateness_ms=1000)
+    clock.push_batch([(event(10), 'a'), (event(12), 'a'), (event(11.5), 'a')])
+    state = clock.snapshot()
+
+    restored = EventClock(allowed_lateness_ms=1000)
+    restored.restore(state)
+    assert restored.watermark == clock.watermark == 11
+    assert times(restored.push_batch([(event(13), 'a')])) == [11.5, 12]
+    assert times(clock.push_batch([(event(13), 'a')])) == [11.5, 12]
+    # Events now behind the restored watermark are late, as before the restart
+    assert restored.push_batch([(event(11), 'a')]) == []
+    assert restored.stats['late'] == 1
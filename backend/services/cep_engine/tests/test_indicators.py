@@ -0,0 +1,102 @@
+"""
+Incremental EMA/MACD/RSI state against direct reference computations.
+"""
+
+import pytest
+
+from backend.services.cep_engine.indicators import (
+    FAST_EMA, SLOW_EMA, SIGNAL_EMA, TrendSpec, TrendState
+)
+
+PRICES = [100.0, 101.5, 99.8, 102.3, 103.1, 101.0, 98.7, 97.9, 99.4, 100.2,
+          104.8, 106.1, 105.0, 103.2, 101.9, 100.5, 102.7, 104.4, 107.9, 108.3]
+
+
+def reference_ema(values, window):
+    """Closed form of an EMA seeded with the first value"""
+    alpha = 2.0 / (window + 1)
+    n = len(values) - 1
+    return (1 - alpha) ** n * values[0] + sum(
+        alpha * (1 - alpha) ** (n - k) * values[k] for k in range(1, n + 1)
+    )
+
+
+def reference_rsi(values, window):
+    """Simple average over the first `window` changes, Wilder smoothing after"""
+    changes = [b - a for a, b in zip(values, values[1:])]
+    gains = [max(change, 0.0) for change in changes]
+    losses = [max(-change, 0.0) for change in changes]
+    head = min(window, len(changes))
+    avg_gain = sum(gains[:head]) / head
+    avg_loss = sum(losses[:head]) / head
+    for gain, loss in zip(gains[head:], losses[head:]):
+        avg_gain = (avg_gain * (window - 1) + gain) / window
+        avg_loss = (avg_loss * (window - 1) + loss) / window
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+@pytest.mark.parametrize('count', [2, 5, 14, len(PRICES)])
+def test_emas_and_rsi_match_reference(count):
+    state = TrendState(TrendSpec(fast_window=3, slow_window=8, rsi_window=5))
+    for price in PRICES[:count]:
+        state.update(price)
+    assert state.values[FAST_EMA] == pytest.approx(reference_ema(PRICES[:count], 3))
+    assert state.values[SLOW_EMA] == pytest.approx(reference_ema(PRICES[:count], 8))
+    assert state.rsi() == pytest.approx(reference_rsi(PRICES[:count], 5))
+
+
+def test_signal_line_tracks_macd():
+    spec = TrendSpec(fast_window=3, slow_window=8, signal_window=4)
+    state = TrendState(spec)
+    macds = []
+    for index, price in enumerate(PRICES):
+        state.update(price)
+        history = PRICES[:index + 1]
+        macds.append(reference_ema(history, 3) - reference_ema(history, 8))
+    # The signal EMA starts from zero at the first tick, so it is seeded with 0
+    assert state.values[SIGNAL_EMA] == pytest.approx(reference_ema([0.0] + macds[1:], 4))
+
+
+def test_crossovers_after_warmup():
+    spec = TrendSpec(fast_window=3, slow_window=8)
+    state = TrendState(spec)
+    signals = [state.update(price) for price in PRICES]
+
+    previous = None
+    expected = []
+    for index in range(len(PRICES)):
+        history = PRICES[:index + 1]
+        diff = reference_ema(history, 3) - reference_ema(history, 8)
+        signal = 0
+        if index >= spec.slow_window and previous is not None:
+            if previous <= 0 < diff:
+                signal = 1
+            elif previous >= 0 > diff:
+                signal = -1
+        expected.append(signal)
+        previous = diff if index else 0.0
+    assert signals == expected
+    assert 1 in signals
+
+
+def test_rsi_vetoes_crossovers_against_momentum():
+    falling = [100.0 - index for index in range(12)]
+    # A small bounce crosses the EMAs up while RSI is still far below 50
+    prices = falling + [93.0]
+    plain = TrendState(TrendSpec(fast_window=2, slow_window=4))
+    confirmed = TrendState(TrendSpec(fast_window=2, slow_window=4, rsi_window=10))
+    plain_signals = [plain.update(price) for price in prices]
+    confirmed_signals = [confirmed.update(price) for price in prices]
+    assert 1 in plain_signals
+    assert confirmed.rsi() < 50
+    assert 1 not in confirmed_signals
+
+
+def test_spec_validation():
+    with pytest.raises(ValueError):
+        TrendSpec.from_conditions({'fast_window': 10, 'slow_window': 5})
+    with pytest.raises(ValueError):
+        TrendSpec.from_conditions({'rsi_window': -1})
+    assert TrendSpec.from_conditions({'signal_window': None}) == TrendSpec()
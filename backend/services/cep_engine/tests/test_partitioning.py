@@ -0,0 +1,101 @@
+"""
+Partition routing: signals go to one owner; with a join rule, ticks are
+mirrored to the other partitions in batch order and never match there.
+"""
+
+from backend.services.cep_engine.partitioning import PartitionedEngine, partition_for
+from backend.services.cep_engine.rule_graph import RuleGraph
+
+JOIN_RULE = {'rule_id': 7, 'pattern': 'price_move_arbitrage', 'enabled': True,
+             'conditions': {'window_seconds': 10, 'min_move_percentage': 0.5}}
+
+
+class Inbox:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+
+def router(workers=3):
+    # Routing only: no worker processes are spawned
+    engine = PartitionedEngine.__new__(PartitionedEngine)
+    engine.workers = workers
+    engine.partition_key = 'symbol'
+    engine.inboxes = [Inbox() for _ in range(workers)]
+    engine.routed = [0] * workers
+    engine.mirrored = 0
+    engine.join_rules = set()
+    return engine
+
+
+def tick(symbol, price, second):
+    return {'symbol': symbol, 'price': price, 'timestamp': f"2024-01-01T00:00:{second:02d}"}
+
+
+def signal(symbols, second):
+    return {'symbols': symbols, 'spread_percentage': 0.3, 'timestamp': f"2024-01-01T00:00:{second:02d}"}
+
+
+def delivered(engine, index):
+    return [(kind, event) for kind, batch in engine.inboxes[index].items
+            if kind in ('events', 'join_events') for event in batch]
+
+
+def test_signal_goes_only_to_its_first_leg():
+    engine = router()
+    event = signal(['BTC/USDT', 'ETH/USDT', 'ETH/BTC'], 1)
+    engine.submit([event])
+    owner = partition_for(event, 'symbol', 3)
+    assert owner == partition_for({'symbol': 'BTC/USDT'}, 'symbol', 3)
+    assert [delivered(engine, index) for index in range(3)] == [
+        [('events', event)] if index == owner else [] for index in range(3)
+    ]
+
+
+def test_ticks_are_mirrored_only_while_a_join_rule_is_enabled():
+    engine = router()
+    ticks = [tick('BTC/USDT', 1.0, 1), tick('ETH/USDT', 2.0, 1)]
+    engine.submit(ticks)
+    assert engine.mirrored == 0
+    assert sum(len(delivered(engine, index)) for index in range(3)) == 2
+
+    engine.broadcast_rule(JOIN_RULE)
+    engine.submit(ticks)
+    assert engine.mirrored == 2
+    for index in range(3):
+        kinds = {event['symbol']: kind for kind, event in delivered(engine, index)[-2:]}
+        expected = {event['symbol']: 'events' if partition_for(event, 'symbol', 3) == index else 'join_events'
+                    for event in ticks}
+        assert kinds == expected
+
+    engine.broadcast_rule({**JOIN_RULE, 'enabled': False})
+    engine.submit(ticks)
+    assert engine.mirrored == 2
+
+
+def test_mirrored_ticks_keep_batch_order():
+    engine = router()
+    engine.broadcast_rule(JOIN_RULE)
+    events = [tick('ETH/USDT', 100.0, 1), tick('ETH/USDT', 102.0, 2),
+              signal(['BTC/USDT', 'ETH/USDT'], 3), tick('ETH/USDT', 90.0, 4)]
+    engine.submit(events)
+    owner = partition_for(events[2], 'symbol', 3)
+    assert [event for _, event in delivered(engine, owner)] == events
+
+
+def test_only_the_owner_matches():
+    engine = router()
+    engine.broadcast_rule(JOIN_RULE)
+    events = [tick('ETH/USDT', 100.0, 1), tick('ETH/USDT', 102.0, 2), signal(['BTC/USDT', 'ETH/USDT'], 3)]
+    engine.submit(events)
+
+    matches = []
+    for index in range(3):
+        graph = RuleGraph()
+        graph.add_rule(JOIN_RULE['rule_id'], JOIN_RULE['pattern'], JOIN_RULE['conditions'])
+        for kind, event in delivered(engine, index):
+            for rule_id in graph.evaluate(event, join_only=kind == 'join_events'):
+                matches.append((index, rule_id))
+    assert matches == [(partition_for(events[2], 'symbol', 3), 7)]
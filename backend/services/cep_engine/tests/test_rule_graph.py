@@ -0,0 +1,86 @@
+"""
+Operator sharing, refcounted removal and rule updates in the shared graph.
+"""
+
+from backend.services.cep_engine.rule_graph import RuleGraph
+
+
+def tick(symbol, price, timestamp, source='Binance', **fields):
+    return {'symbol': symbol, 'price': price, 'timestamp': timestamp, 'source': source, **fields}
+
+
+def kinds(graph):
+    return graph.get_stats()['operators']
+
+
+def test_rules_share_identical_operators():
+    graph = RuleGraph()
+    graph.add_rule(1, 'price_spike', {'price_change_threshold': 1})
+    graph.add_rule(2, 'price_spike', {'price_change_threshold': 5})
+    graph.add_rule(3, 'price_spike', {'price_change_threshold': 1, 'symbol': 'ETH/USDT'})
+
+    # One filter -> window -> pct_change chain; predicates and the symbol filter differ
+    assert kinds(graph) == {'source': 1, 'filter': 2, 'window': 1, 'aggregate': 1, 'predicate': 3}
+    assert graph.get_stats()['shared_operators'] == 4
+
+    graph.evaluate(tick('BTC/USDT', 100.0, 't1'))
+    assert sorted(graph.evaluate(tick('BTC/USDT', 102.0, 't2'))) == [1]
+    graph.evaluate(tick('ETH/USDT', 100.0, 't1'))
+    assert sorted(graph.evaluate(tick('ETH/USDT', 110.0, 't2'))) == [1, 2, 3]
+
+
+def test_removal_releases_only_unshared_operators():
+    graph = RuleGraph()
+    graph.add_rule(1, 'price_spike', {'price_change_threshold': 1})
+    graph.add_rule(2, 'price_spike', {'price_change_threshold': 5})
+    graph.evaluate(tick('BTC/USDT', 100.0, 't1'))
+
+    graph.remove_rule(2)
+    assert kinds(graph) == {'source': 1, 'filter': 1, 'window': 1, 'aggregate': 1, 'predicate': 1}
+    # The surviving rule keeps the shared window state
+    assert graph.evaluate(tick('BTC/USDT', 102.0, 't2')) == [1]
+
+    graph.remove_rule(1)
+    assert kinds(graph) == {'source': 1}
+    assert graph.refcounts == {graph.root.key: 0}
+    assert graph.root.children == []
+
+
+def test_update_keeps_state_and_rule_id():
+    graph = RuleGraph()
+    graph.add_rule(1, 'price_spike', {'price_change_threshold': 1})
+    graph.evaluate(tick('BTC/USDT', 100.0, 't1'))
+
+    # Same definition: the rule keeps its predicate and stays matchable
+    graph.add_rule(1, 'price_spike', {'price_change_threshold': 1})
+    assert graph.evaluate(tick('BTC/USDT', 102.0, 't2')) == [1]
+
+    # New threshold: only the predicate is replaced, the window survives
+    graph.add_rule(1, 'price_spike', {'price_change_threshold': 0.5})
+    assert kinds(graph) == {'source': 1, 'filter': 1, 'window': 1, 'aggregate': 1, 'predicate': 1}
+    assert graph.evaluate(tick('BTC/USDT', 101.0, 't3')) == [1]
+
+
+def test_repeated_tick_is_evaluated_once():
+    graph = RuleGraph()
+    graph.add_rule(1, 'price_spike', {'price_change_threshold': 1})
+    graph.add_rule(2, 'volume_surge', {'volume_threshold': 10})
+    first = tick('BTC/USDT', 100.0, 't1', volume=20)
+    second = tick('BTC/USDT', 110.0, 't2', volume=20)
+
+    results = [graph.evaluate(event) for event in (first, dict(first), second, dict(second))]
+    assert [sorted(result) for result in results] == [[2], [], [1, 2], []]
+    assert graph.get_stats()['duplicate_ticks'] == 2
+
+    # Another source with the same timestamp is a different tick
+    assert graph.evaluate(tick('BTC/USDT', 110.0, 't2', source='Other', volume=20)) == [2]
+
+
+def test_rule_counters_start_when_the_rule_joins():
+    graph = RuleGraph()
+    graph.add_rule(1, 'volume_surge', {'volume_threshold': 10})
+    graph.evaluate(tick('BTC/USDT', 1.0, 't1', volume=20))
+    graph.add_rule(2, 'volume_surge', {'volume_threshold': 10})
+    graph.evaluate(tick('BTC/USDT', 1.0, 't2', volume=20))
+    assert graph.rule_counters(1) == (2, 2)
+    assert graph.rule_counters(2) == (1, 1)
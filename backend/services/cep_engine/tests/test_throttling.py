@@ -0,0 +1,120 @@
+"""
+Rate windows, cooldowns and duplicate suppression, including allow() and
+reset() racing across threads.
+"""
+
+import threading
+
+import pytest
+
+from backend.services.cep_engine.throttling import ActionThrottle, ThrottleSpec
+
+
+def match(symbol='BTC/USDT', price=1.0, timestamp='t', **fields):
+    return {'symbol': symbol, 'price': price, 'timestamp': timestamp, **fields}
+
+
+def test_rate_window_per_key():
+    throttle = ActionThrottle()
+    spec = ThrottleSpec(max_actions=2, interval_seconds=10)
+    assert [throttle.allow(1, spec, match(), now=t) for t in (0, 1, 2)] == [True, True, False]
+    assert throttle.allow(1, spec, match('ETH/USDT'), now=2)   # other key
+    assert throttle.allow(2, spec, match(), now=2)             # other rule
+    assert throttle.allow(1, spec, match(), now=10)            # next window
+    assert throttle.get_stats()['suppressed_rate'] == 1
+
+
+def test_cooldown():
+    throttle = ActionThrottle()
+    spec = ThrottleSpec(cooldown_seconds=5)
+    assert [throttle.allow(1, spec, match(), now=t) for t in (0, 4.9, 5)] == [True, False, True]
+    assert throttle.get_stats()['suppressed_cooldown'] == 1
+
+
+def test_duplicates_ignore_volatile_fields():
+    throttle = ActionThrottle()
+    spec = ThrottleSpec(dedup_seconds=30)
+    assert throttle.allow(1, spec, match(timestamp='t1', timestamp_ns=1, id='a'), now=0)
+    assert not throttle.allow(1, spec, match(timestamp='t2', timestamp_ns=2, id='b'), now=1)
+    assert throttle.allow(1, spec, match(price=2.0), now=2)
+    assert throttle.allow(1, spec, match(price=2.0), now=33)
+
+
+def test_multi_symbol_events_key_on_their_legs():
+    throttle = ActionThrottle()
+    spec = ThrottleSpec(max_actions=1, interval_seconds=60)
+    signal = {'symbols': ['BTC/USDT', 'ETH/BTC', 'ETH/USDT'], 'spread_percentage': 0.4}
+    assert throttle.allow(1, spec, signal, now=0)
+    assert not throttle.allow(1, spec, dict(signal), now=1)
+    assert throttle.allow(1, spec, {**signal, 'symbols': ['BTC/USDT', 'SOL/USDT']}, now=1)
+
+
+def test_reset_drops_only_that_rule():
+    throttle = ActionThrottle()
+    spec = ThrottleSpec(max_actions=1, interval_seconds=60)
+    throttle.allow(1, spec, match(), now=0)
+    throttle.allow(2, spec, match(), now=0)
+    throttle.reset(1)
+    assert throttle.allow(1, spec, match(), now=1)
+    assert not throttle.allow(2, spec, match(), now=1)
+
+
+def test_spec_validation():
+    assert ThrottleSpec.from_dict(None) is None
+    with pytest.raises(ValueError):
+        ThrottleSpec.from_dict({'max_actions': -1})
+    with pytest.raises(ValueError):
+        ThrottleSpec.from_dict({'max_actions': 1, 'interval_seconds': 0})
+
+
+def test_concurrent_allow_never_exceeds_the_window():
+    throttle = ActionThrottle()
+    spec = ThrottleSpec(max_actions=50, interval_seconds=3600)
+    allowed = []
+    start = threading.Barrier(8)
+
+    def worker():
+        start.wait()
+        allowed.append(sum(throttle.allow(1, spec, match(), now=0) for _ in range(200)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 50
+    stats = throttle.get_stats()
+    assert stats['allowed'] == 50
+    assert stats['suppressed_rate'] == 8 * 200 - 50
+
+
+def test_reset_while_allowing():
+    throttle = ActionThrottle()
+    spec = ThrottleSpec(max_actions=1, interval_seconds=3600)
+    errors = []
+    done = threading.Event()
+
+    def allow_many():
+        try:
+            for index in range(20000):
+                throttle.allow(1, spec, match(f"S{index % 500}"), now=0)
+        except Exception as e:  # e.g. dict changed size during iteration
+            errors.append(e)
+        finally:
+            done.set()
+
+    def reset_many():
+        try:
+            while not done.is_set():
+                throttle.reset(1)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=allow_many), threading.Thread(target=reset_many)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    stats = throttle.get_stats()
+    assert stats['allowed'] + stats['suppressed_rate'] == 20000
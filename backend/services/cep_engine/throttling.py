@@ -0,0 +1,136 @@
+"""
+ASCEP CEP Engine - Action Throttling
+Per-rule, per-key rate limits, cooldowns and duplicate suppression applied
+to rule matches before an action message is built.
+
+A rule opts in with a `throttle` object:
+
+    {"key": "symbol", "max_actions": 5, "interval_seconds": 60,
+     "cooldown_seconds": 10, "dedup_seconds": 30}
+
+Every setting is optional; zero disables it. State is kept per
+(rule id, key value), where the key value comes from the named event field
+(multi-symbol events such as arbitrage signals fall back to their joined
+`symbols`).
+"""
+
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+# Fields that differ between otherwise identical events
+_VOLATILE_FIELDS = frozenset(('timestamp', 'timestamp_ns', 'id'))
+
+
+class ThrottleSpec(NamedTuple):
+    """Throttle settings for one rule"""
+    key: str = 'symbol'
+    max_actions: int = 0
+    interval_seconds: float = 60.0
+    cooldown_seconds: float = 0.0
+    dedup_seconds: float = 0.0
+
+    @classmethod
+    def from_dict(cls, config: Optional[Dict]) -> Optional['ThrottleSpec']:
+        """Build a spec from a rule's `throttle` object; None when throttling is off"""
+        if not config:
+            return None
+        spec = cls(
+            key=str(config.get('key', 'symbol')),
+            max_actions=int(config.get('max_actions', 0)),
+            interval_seconds=float(config.get('interval_seconds', 60)),
+            cooldown_seconds=float(config.get('cooldown_seconds', 0)),
+            dedup_seconds=float(config.get('dedup_seconds', 0))
+        )
+        if spec.max_actions < 0 or spec.cooldown_seconds < 0 or spec.dedup_seconds < 0:
+            raise ValueError("throttle settings must not be negative")
+        if spec.max_actions and spec.interval_seconds <= 0:
+            raise ValueError("throttle interval_seconds must be positive")
+        return spec
+
+
+class _KeyState:
+    __slots__ = ('window_start', 'window_count', 'last_action', 'fingerprint', 'fingerprint_at')
+
+    def __init__(self):
+        self.window_start = 0.0
+        self.window_count = 0
+        self.last_action = None
+        self.fingerprint = None
+        self.fingerprint_at = 0.0
+
+
+def _fingerprint(event: Dict) -> int:
+    return hash(tuple(sorted(
+        (field, str(value)) for field, value in event.items() if field not in _VOLATILE_FIELDS
+    )))
+
+
+class ActionThrottle:
+    """Decides whether a rule match may produce an action"""
+
+    def __init__(self):
+        self.states = {}    # (rule_id, key value) -> _KeyState
+        # allow() runs on the processing thread, reset() on Flask request threads
+        self.lock = threading.Lock()
+        self.stats = {
+            'allowed': 0,
+            'suppressed_rate': 0,
+            'suppressed_cooldown': 0,
+            'suppressed_duplicate': 0
+        }
+
+    def allow(self, rule_id, spec: ThrottleSpec, event: Dict, now: Optional[float] = None) -> bool:
+        """Record a match; returns False when its action should be suppressed"""
+        with self.lock:
+            return self._allow(rule_id, spec, event, now)
+
+    def _allow(self, rule_id, spec: ThrottleSpec, event: Dict, now: Optional[float]) -> bool:
+        if now is None:
+            now = time.monotonic()
+        key = event.get(spec.key)
+        if key is None:
+            symbols = event.get('symbols')
+            key = '|'.join(symbols) if symbols else ''
+        state = self.states.get((rule_id, key))
+        if state is None:
+            state = self.states[(rule_id, key)] = _KeyState()
+
+        if spec.cooldown_seconds and state.last_action is not None \
+                and now - state.last_action < spec.cooldown_seconds:
+            self.stats['suppressed_cooldown'] += 1
+            return False
+
+        if spec.dedup_seconds:
+            fingerprint = _fingerprint(event)
+            if fingerprint == state.fingerprint and now - state.fingerprint_at < spec.dedup_seconds:
+                self.stats['suppressed_duplicate'] += 1
+                return False
+        else:
+            fingerprint = None
+
+        if spec.max_actions:
+            if now - state.window_start >= spec.interval_seconds:
+                state.window_start = now
+                state.window_count = 0
+            if state.window_count >= spec.max_actions:
+                self.stats['suppressed_rate'] += 1
+                return False
+            state.window_count += 1
+
+        state.last_action = now
+        if fingerprint is not None:
+            state.fingerprint = fingerprint
+            state.fingerprint_at = now
+        self.stats['allowed'] += 1
+        return True
+
+    def reset(self, rule_id):
+        """Drop throttle state for a rule (it was changed or removed)"""
+        with self.lock:
+            for state_key in [state_key for state_key in self.states if state_key[0] == rule_id]:
+                del self.states[state_key]
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {**self.stats, 'tracked_keys': len(self.states)}
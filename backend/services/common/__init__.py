@@ -0,0 +1 @@
+# ASCEP Shared Service Utilities
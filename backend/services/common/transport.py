@@ -0,0 +1,272 @@
+"""
+ASCEP Common - Event Bus Transport
+Publish/subscribe for the shared event channels over either Redis Pub/Sub
+(fire-and-forget, the default) or Redis Streams with consumer groups.
+
+With BUS_TRANSPORT=streams, `price_updates`, `events`, `arbitrage_signals`
+and `cep_signals` are written with XADD to `bus:<channel>` streams capped at
+about BUS_STREAM_MAXLEN entries. Each service reads them through its own
+consumer group (XREADGROUP with a batch COUNT, XACK after processing), so a
+restarting consumer resumes from its group's position. Delivery is
+at-least-once: a consumer first re-reads the entries its name holds
+unacknowledged, and entries left pending by any consumer of the group for
+BUS_CLAIM_IDLE_MS (a process that died under another name) are taken over
+with XAUTOCLAIM. The default consumer name is the hostname, so it survives
+restarts. Other channels (alerts, logs, rule updates, subscriptions) stay
+Pub/Sub.
+
+Limitation: groups here provide durable, at-least-once delivery, not
+horizontal scaling. Streams are not partitioned by key, so consumers sharing
+a group would each receive an arbitrary subset of entries, while the
+subscribers keep per-symbol state (price caches, windows, throttles) in
+process. Each group therefore has one consumer. The CEP engine scales inside
+that consumer with its partition workers.
+"""
+
+import logging
+import os
+import socket
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from redis.exceptions import ResponseError
+
+from backend.services.common.tick_codec import binary_client, channel_name
+
+logger = logging.getLogger(__name__)
+
+BUS_TRANSPORT = os.getenv('BUS_TRANSPORT', 'pubsub').lower()  # 'pubsub' or 'streams'
+BUS_STREAM_MAXLEN = int(os.getenv('BUS_STREAM_MAXLEN', 100000))  # approximate cap per stream
+BUS_READ_COUNT = int(os.getenv('BUS_READ_COUNT', 500))  # entries per XREADGROUP
+BUS_CLAIM_IDLE_MS = int(os.getenv('BUS_CLAIM_IDLE_MS', 60000))  # pending this long is reclaimed; 0 disables
+BUS_CHANNELS = frozenset(('price_updates', 'events', 'arbitrage_signals', 'cep_signals'))
+
+
+def stream_key(channel: str) -> str:
+    return f"bus:{channel}"
+
+
+def uses_streams(channel: str, transport: Optional[str] = None) -> bool:
+    return (transport or BUS_TRANSPORT) == 'streams' and channel in BUS_CHANNELS
+
+
+def publish(target, channel: str, payload, transport: Optional[str] = None):
+    """Publish a payload on a client or pipeline through the configured transport"""
+    if uses_streams(channel, transport):
+        target.xadd(stream_key(channel), {'d': payload}, maxlen=BUS_STREAM_MAXLEN, approximate=True)
+    else:
+        target.publish(channel, payload)
+
+
+class BusMessage(NamedTuple):
+    """One received payload; `id` is the stream entry id (None for Pub/Sub)"""
+    channel: str
+    data: bytes
+    id: Optional[bytes] = None
+
+
+class PubSubSubscriber:
+    """Pub/Sub reader with the same interface as StreamSubscriber"""
+
+    transport = 'pubsub'
+
+    def __init__(self, redis_client, channels: Iterable[str]):
+        self.channels = list(channels)
+        self.client = binary_client(redis_client)
+        self.received = 0
+        self._subscribe()
+
+    def _subscribe(self):
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(*self.channels)
+
+    def read(self, count: int = BUS_READ_COUNT, timeout: float = 1.0,
+             max_wait: Optional[float] = None) -> List[BusMessage]:
+        """Block up to `timeout` for a message, then drain what is buffered (up to count / max_wait)"""
+        messages = []
+        message = self.pubsub.get_message(timeout=timeout)
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+        while message is not None:
+            if message['type'] == 'message':
+                messages.append(BusMessage(channel_name(message['channel']), message['data']))
+            if len(messages) >= count or (deadline is not None and time.monotonic() >= deadline):
+                break
+            message = self.pubsub.get_message(timeout=0.0)
+        self.received += len(messages)
+        return messages
+
+    def ack(self, messages: List[BusMessage]):
+        """Pub/Sub has no acknowledgements"""
+
+    def reconnect(self):
+        try:
+            self.pubsub.close()
+        except Exception:
+            pass
+        self._subscribe()
+
+    def get_stats(self) -> Dict:
+        return {'transport': self.transport, 'channels': self.channels, 'received': self.received}
+
+
+class StreamSubscriber:
+    """Consumer-group reader over the `bus:<channel>` streams"""
+
+    transport = 'streams'
+
+    def __init__(self, redis_client, channels: Iterable[str], group: str,
+                 consumer: Optional[str] = None, start_id: str = '$',
+                 claim_idle_ms: int = BUS_CLAIM_IDLE_MS):
+        self.client = binary_client(redis_client)
+        self.group = group
+        # Stable across restarts, so a restarted process finds its own pending entries
+        self.consumer = consumer or os.getenv('BUS_CONSUMER_NAME') or socket.gethostname()
+        self.channels = list(channels)
+        self.keys = {stream_key(channel): channel for channel in self.channels}
+        # Entries delivered to this consumer name but never acked (e.g. before a restart) come first
+        self.pending_from = {key: '0' for key in self.keys}
+        # Entries other consumers of the group left pending are claimed once idle this long
+        self.claim_idle_ms = claim_idle_ms
+        self.next_claim = 0.0
+        self.stats = {'received': 0, 'acked': 0, 'redelivered': 0, 'claimed': 0, 'trimmed': 0}
+        for key in self.keys:
+            try:
+                self.client.xgroup_create(key, group, id=start_id, mkstream=True)
+                logger.info(f"Created consumer group {group} on {key}")
+            except ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+
+    def read(self, count: int = BUS_READ_COUNT, timeout: float = 1.0,
+             max_wait: Optional[float] = None) -> List[BusMessage]:
+        """Redeliver this consumer's pending entries and claim idle ones, then block up to `timeout` for new ones"""
+        if self.pending_from:
+            response = self.client.xreadgroup(self.group, self.consumer, dict(self.pending_from), count=count)
+            if not response:
+                self.pending_from = {}
+            messages = self._messages(response, pending=True)
+            if messages:
+                self.stats['redelivered'] += len(messages)
+                self.stats['received'] += len(messages)
+                return messages
+            if self.pending_from:
+                return []
+        if self.claim_idle_ms and time.monotonic() >= self.next_claim:
+            messages = self._claim(count)
+            if messages:
+                # Keep claiming on the next read until nothing idle is left
+                self.stats['claimed'] += len(messages)
+                self.stats['received'] += len(messages)
+                return messages
+            self.next_claim = time.monotonic() + self.claim_idle_ms / 1000
+        response = self.client.xreadgroup(
+            self.group, self.consumer, {key: '>' for key in self.keys},
+            count=count, block=max(1, int(timeout * 1000))
+        )
+        messages = self._messages(response)
+        self.stats['received'] += len(messages)
+        return messages
+
+    def _claim(self, count: int) -> List[BusMessage]:
+        """XAUTOCLAIM entries idle for claim_idle_ms, from any consumer of the group"""
+        messages = []
+        for key in self.keys:
+            try:
+                response = self.client.xautoclaim(key, self.group, self.consumer, self.claim_idle_ms,
+                                                  start_id='0-0', count=count - len(messages))
+            except ResponseError as e:
+                # XAUTOCLAIM needs Redis >= 6.2
+                logger.warning(f"Cannot reclaim idle entries on {key}; reclaiming disabled: {e}")
+                self.claim_idle_ms = 0
+                return messages
+            messages.extend(self._messages([(key, response[1])]))
+            if len(messages) >= count:
+                break
+        return messages
+
+    def _messages(self, response, pending: bool = False) -> List[BusMessage]:
+        messages = []
+        trimmed = []
+        for key, entries in response or []:
+            key = channel_name(key)
+            if pending:
+                if entries:
+                    self.pending_from[key] = entries[-1][0]
+                else:
+                    self.pending_from.pop(key, None)
+            for entry in entries:
+                if entry is None or entry[0] is None:
+                    # XAUTOCLAIM on Redis 6.2 returns nil for deleted entries (no id to ack)
+                    continue
+                entry_id, fields = entry
+                if not fields:
+                    # Pending entry trimmed by MAXLEN before it was processed
+                    trimmed.append((key, entry_id))
+                    continue
+                messages.append(BusMessage(self.keys[key], fields[b'd'], entry_id))
+        if trimmed:
+            self.stats['trimmed'] += len(trimmed)
+            for key, entry_id in trimmed:
+                self.client.xack(key, self.group, entry_id)
+        return messages
+
+    def ack(self, messages: List[BusMessage]):
+        """XACK processed entries, one pipeline per batch"""
+        ids = {}
+        for message in messages:
+            if message.id is not None:
+                ids.setdefault(stream_key(message.channel), []).append(message.id)
+        if not ids:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, entry_ids in ids.items():
+            pipe.xack(key, self.group, *entry_ids)
+        pipe.execute()
+        self.stats['acked'] += sum(len(entry_ids) for entry_ids in ids.values())
+
+    def reconnect(self):
+        """Stream reads use pooled connections; nothing to re-establish"""
+
+    @staticmethod
+    def _id_ms(entry_id) -> Optional[int]:
+        if not entry_id:
+            return None
+        return int(channel_name(entry_id).split('-')[0])
+
+    def get_lag(self) -> Dict[str, Dict]:
+        """Per-channel group lag: entries not yet delivered, pending acks and age of the backlog"""
+        lag = {}
+        for key, channel in self.keys.items():
+            entry = {'length': None, 'lag': None, 'pending': None, 'lag_ms': None}
+            try:
+                entry['length'] = self.client.xlen(key)
+                generated_ms = self._id_ms(self.client.xinfo_stream(key).get('last-generated-id'))
+                for group in self.client.xinfo_groups(key):
+                    if channel_name(group.get('name')) != self.group:
+                        continue
+                    entry['pending'] = group.get('pending')
+                    entry['lag'] = group.get('lag')  # Redis >= 7.0
+                    delivered_ms = self._id_ms(group.get('last-delivered-id'))
+                    if delivered_ms is not None and generated_ms is not None:
+                        entry['lag_ms'] = max(0, generated_ms - delivered_ms)
+            except Exception as e:
+                entry['error'] = str(e)
+            lag[channel] = entry
+        return lag
+
+    def get_stats(self) -> Dict:
+        return {
+            'transport': self.transport,
+            'group': self.group,
+            'consumer': self.consumer,
+            **self.stats,
+            'streams': self.get_lag()
+        }
+
+
+def subscribe(redis_client, channels: Iterable[str], group: str, transport: Optional[str] = None):
+    """Subscriber for the configured transport; `group` names the service's consumer group"""
+    channels = list(channels)
+    if (transport or BUS_TRANSPORT) == 'streams':
+        return StreamSubscriber(redis_client, channels, group)
+    return PubSubSubscriber(redis_client, channels)
@@ -0,0 +1,88 @@
+"""
+ASCEP Price Feed - Gateway Forwarder
+Asynchronous, batched delivery of ticks to the API gateway.
+
+Feed callbacks only append to a bounded in-memory queue; a background
+thread posts batches over a pooled HTTP session. When the gateway is slow or
+down the queue drops its oldest ticks instead of blocking the feed.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayForwarder:
+    """Posts queued ticks to `{gateway_url}/api/prices` as `{"prices": [...]}` batches"""
+
+    def __init__(self, gateway_url: str, max_queue: int = 5000, batch_size: int = 200,
+                 flush_interval: float = 0.25, timeout: float = 5.0):
+        self.url = f"{gateway_url.rstrip('/')}/api/prices"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.queue = deque(maxlen=max_queue)
+        self.wakeup = threading.Event()
+        self.running = True
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.stats = {
+            'submitted': 0,
+            'sent': 0,
+            'dropped': 0,
+            'batches': 0,
+            'errors': 0,
+            'last_error': None
+        }
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, event: Dict):
+        """Queue a tick for delivery; never blocks (drops the oldest tick when full)"""
+        if len(self.queue) == self.queue.maxlen:
+            self.stats['dropped'] += 1
+        self.queue.append(event)
+        self.stats['submitted'] += 1
+        if len(self.queue) >= self.batch_size:
+            self.wakeup.set()
+
+    def _run(self):
+        while self.running:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            while self.queue:
+                batch = []
+                while self.queue and len(batch) < self.batch_size:
+                    batch.append(self.queue.popleft())
+                self._post(batch)
+
+    def _post(self, batch):
+        try:
+            response = self.session.post(self.url, json={'prices': batch}, timeout=self.timeout)
+            if response.status_code >= 400:
+                raise requests.HTTPError(f"HTTP {response.status_code}")
+            self.stats['sent'] += len(batch)
+            self.stats['batches'] += 1
+        except Exception as e:
+            # The batch is dropped: gateway delivery is best effort and must not build a backlog
+            self.stats['errors'] += 1
+            self.stats['dropped'] += len(batch)
+            self.stats['last_error'] = str(e)
+            logger.warning(f"⚠️ Gateway delivery failed ({len(batch)} ticks): {e}")
+            time.sleep(min(self.flush_interval * 4, 1.0))
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'queued': len(self.queue), 'url': self.url}
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        self.session.close()
@@ -0,0 +1,185 @@
+"""
+ASCEP Price Feed - Local L2 Order Book
+Per-symbol order book kept in sync from a REST snapshot plus the
+`<symbol>@depth@100ms` diff stream.
+
+Sync follows Binance's procedure: diffs are buffered until a snapshot
+arrives, diffs already covered by the snapshot (`u <= lastUpdateId`) are
+dropped, the first applied diff must straddle `lastUpdateId + 1`, and every
+later diff must start at the previous diff's `u + 1`. A break in that
+sequence marks the book unsynced so the feed fetches a new snapshot.
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+
+class _BookSide:
+    """Price levels for one side, kept sorted ascending"""
+
+    __slots__ = ('prices', 'sizes', 'descending')
+
+    def __init__(self, descending: bool):
+        self.prices = []     # sorted ascending
+        self.sizes = {}      # price -> quantity
+        self.descending = descending
+
+    def clear(self):
+        self.prices = []
+        self.sizes = {}
+
+    def update(self, price: float, size: float):
+        if size == 0:
+            if price in self.sizes:
+                del self.sizes[price]
+                del self.prices[bisect_left(self.prices, price)]
+        else:
+            if price not in self.sizes:
+                insort(self.prices, price)
+            self.sizes[price] = size
+
+    def trim(self, max_levels: int):
+        """Drop the levels furthest from the touch beyond max_levels"""
+        excess = len(self.prices) - max_levels
+        if excess <= 0:
+            return
+        if self.descending:
+            dropped, self.prices = self.prices[:excess], self.prices[excess:]
+        else:
+            dropped, self.prices = self.prices[-excess:], self.prices[:-excess]
+        for price in dropped:
+            del self.sizes[price]
+
+    def iter_levels(self):
+        """Best-first (price, size) levels"""
+        prices = reversed(self.prices) if self.descending else iter(self.prices)
+        for price in prices:
+            yield price, self.sizes[price]
+
+    def levels(self, count: int) -> List[Tuple[float, float]]:
+        """The best `count` (price, size) levels"""
+        return list(islice(self.iter_levels(), count))
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self.prices:
+            return None
+        price = self.prices[-1] if self.descending else self.prices[0]
+        return price, self.sizes[price]
+
+
+class OrderBook:
+    """L2 book for one symbol"""
+
+    def __init__(self, symbol: str, max_levels: int = 5000, max_buffered: int = 1000):
+        self.symbol = symbol
+        self.max_levels = max_levels
+        self.bids = _BookSide(descending=True)
+        self.asks = _BookSide(descending=False)
+        self.last_update_id = 0
+        self.synced = False
+        self.snapshot_pending = False
+        self.buffer = deque(maxlen=max_buffered)
+        self.gaps = 0
+        self.snapshots = 0
+        self.updates = 0
+
+    def buffer_diff(self, event: Dict):
+        """Hold a diff until the next snapshot is applied"""
+        self.buffer.append(event)
+
+    def apply_snapshot(self, snapshot: Dict) -> bool:
+        """Load a REST depth snapshot and replay buffered diffs
+
+        Returns False when the snapshot is older than the buffered diffs
+        (or the buffer cannot be bridged); the caller should fetch another.
+        """
+        last_update_id = snapshot['lastUpdateId']
+        buffered = [event for event in self.buffer if event['u'] > last_update_id]
+        if buffered and buffered[0]['U'] > last_update_id + 1:
+            return False
+
+        self.bids.clear()
+        self.asks.clear()
+        for price, size in snapshot.get('bids', []):
+            self.bids.update(float(price), float(size))
+        for price, size in snapshot.get('asks', []):
+            self.asks.update(float(price), float(size))
+        self.last_update_id = last_update_id
+        self.buffer.clear()
+        self.synced = True
+
+        for event in buffered:
+            if not self.apply_diff(event):
+                return False
+        self.bids.trim(self.max_levels)
+        self.asks.trim(self.max_levels)
+        return True
+
+    def apply_diff(self, event: Dict) -> bool:
+        """Apply one depthUpdate; returns False (and unsyncs the book) on a sequence gap"""
+        if event['u'] <= self.last_update_id:
+            return True  # already covered by the snapshot
+        if event['U'] > self.last_update_id + 1:
+            self.gaps += 1
+            self.synced = False
+            self.buffer.clear()
+            self.buffer.append(event)
+            return False
+
+        for price, size in event.get('b', []):
+            self.bids.update(float(price), float(size))
+        for price, size in event.get('a', []):
+            self.asks.update(float(price), float(size))
+        self.last_update_id = event['u']
+        self.updates += 1
+        if len(self.bids.prices) > self.max_levels * 2:
+            self.bids.trim(self.max_levels)
+        if len(self.asks.prices) > self.max_levels * 2:
+            self.asks.trim(self.max_levels)
+        return True
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        return self.asks.best()
+
+    @staticmethod
+    def _fill_price(levels, notional: float) -> Optional[float]:
+        """Average price to trade `notional` (quote currency) against levels; None if too thin"""
+        remaining = notional
+        quantity = 0.0
+        for price, size in levels:
+            level_notional = price * size
+            if level_notional >= remaining:
+                quantity += remaining / price
+                return notional / quantity
+            remaining -= level_notional
+            quantity += size
+        return None
+
+    def depth_at(self, notionals: List[float]) -> Dict[str, List[Optional[float]]]:
+        """Executable [sell, buy] average prices for each quote notional
+
+        Keys are the notional as a compact string, e.g. {"10000": [bid_px, ask_px]}.
+        """
+        return {
+            f"{notional:g}": [
+                self._fill_price(self.bids.iter_levels(), notional),
+                self._fill_price(self.asks.iter_levels(), notional)
+            ]
+            for notional in notionals
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            'synced': self.synced,
+            'last_update_id': self.last_update_id,
+            'bid_levels': len(self.bids.prices),
+            'ask_levels': len(self.asks.prices),
+            'updates': self.updates,
+            'gaps': self.gaps,
+            'snapshots': self.snapshots
+        }
@@ -6,7 +6,6 @@ Standalone service for running price feeds on Railway
 import os
 import sys
 import time
-import requests
 import json
 import redis
 import logging
@@ -15,8 +14,16 @@ from datetime import datetime
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 
+# railway.json runs `python price_feed_service.py` from this directory, which puts
+# only the service directory on the path; the shared codec lives under the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+
+from backend.services.common.tick_codec import encode_event
+
 try:
     from price_feeds import BinanceWebSocketFeed, MockPriceFeed, PriceFeedManager
+    from gateway_forwarder import GatewayForwarder
+    from tick_publisher import TickPublisher
     print("✅ Successfully imported price_feeds module")
 except ImportError as e:
     print(f"❌ Error importing price feeds: {e}")
@@ -38,47 +45,43 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 
 # Global variables for health status
 feed_manager = None
+gateway_forwarder = None
+tick_publisher = None
 service_start_time = datetime.utcnow()
 
-def send_price_to_backend(symbol, price, timestamp):
-    """Send price update to backend API and Redis"""
+# Optional tick delivery to the API gateway (Redis is the primary transport)
+GATEWAY_FORWARDING = os.getenv('GATEWAY_FORWARDING', 'false').lower() == 'true'
+GATEWAY_QUEUE_SIZE = int(os.getenv('GATEWAY_QUEUE_SIZE', 5000))
+GATEWAY_BATCH_SIZE = int(os.getenv('GATEWAY_BATCH_SIZE', 200))
+GATEWAY_FLUSH_INTERVAL = float(os.getenv('GATEWAY_FLUSH_INTERVAL', 0.25))  # seconds
+
+# Latest-value-wins delivery: max drains per second (0 = deliver every tick)
+PRICE_CONFLATION_RATE = float(os.getenv('PRICE_CONFLATION_RATE', 0))
+
+# Feed runtime: thread pool for blocking feed work, per-sink tick queue bound
+FEED_EXECUTOR_WORKERS = int(os.getenv('FEED_EXECUTOR_WORKERS', 4))
+SINK_QUEUE_SIZE = int(os.getenv('SINK_QUEUE_SIZE', 10000))
+
+# Redis tick publishing
+TICK_QUEUE_SIZE = int(os.getenv('TICK_QUEUE_SIZE', 10000))
+TICK_BATCH_SIZE = int(os.getenv('TICK_BATCH_SIZE', 500))  # ticks per pipeline
+TICK_ENCODING = os.getenv('TICK_ENCODING', 'json').lower()  # 'json' or 'binary' on price_updates/events
+
+def send_price_to_backend(tick):
+    """Queue a price update for Redis and (optionally) the API gateway"""
     try:
-        data = {
-            'symbol': symbol,
-            'price': price,
-            'timestamp': timestamp,
-            'type': 'price_update'
-        }
+        data = tick.to_event()
         
-        # Store in Redis
-        if redis_client:
-            price_key = f"price:{symbol}"
-            redis_client.hset(price_key, mapping={
-                'price': price,
-                'timestamp': timestamp
-            })
-            redis_client.expire(price_key, 600)  # 10 minute expiry
-            
-            # Publish to Redis channel for real-time updates
-            redis_client.publish('price_updates', json.dumps(data))
-            redis_client.publish('events', json.dumps(data))
+        # Redis writes are pipelined on the publisher thread
+        if tick_publisher:
+            tick_publisher.submit(data)
         
-        # Send to API Gateway (port 5000)
-        try:
-            # Use environment variable or default to localhost
-            gateway_url = os.getenv('API_GATEWAY_URL', 'http://localhost:5000')
-            response = requests.post(f'{gateway_url}/api/prices', json=data, timeout=5)
-            
-            if response.status_code == 200:
-                logger.info(f"✅ {symbol}: ${price:.6f}")
-            else:
-                logger.warning(f"⚠️ {symbol}: Gateway HTTP {response.status_code}")
-                
-        except Exception as e:
-            logger.warning(f"⚠️ {symbol}: Gateway error - {e}")
-            
+        # Hand off to the gateway forwarder; delivery happens on its own thread
+        if gateway_forwarder:
+            gateway_forwarder.submit(data)
+    
     except Exception as e:
-        logger.error(f"❌ {symbol}: {e}")
+        logger.error(f"❌ {tick.symbol}: {e}")
 
 # Initialize Redis connection
 try:
@@ -153,7 +156,9 @@ def health_check():
         feed_status = feed_manager.get_feed_status()
         status['feeds'] = feed_status
         status['total_feeds'] = len(feed_status)
-        status['connected_feeds'] = sum(1 for connected in feed_status.values() if connected)
+        status['connected_feeds'] = sum(1 for feed in feed_status.values() if feed['connected'])
+        status['feed_gaps'] = sum(feed.get('gaps', 0) for feed in feed_status.values())
+        status['feed_downtime_seconds'] = round(sum(feed.get('downtime_seconds', 0) for feed in feed_status.values()), 3)
     
     return jsonify(status)
 
@@ -166,6 +171,10 @@ def detailed_status():
         'timestamp': datetime.utcnow().isoformat(),
         'uptime': str(datetime.utcnow() - service_start_time),
         'redis_connected': redis_client is not None,
+        'runtime': feed_manager.get_runtime_stats() if feed_manager else None,
+        'conflation': feed_manager.get_conflation_stats() if feed_manager else None,
+        'publisher': tick_publisher.get_stats() if tick_publisher else None,
+        'gateway': gateway_forwarder.get_stats() if gateway_forwarder else None,
         'endpoints': {
             'health': '/health',
             'status': '/status'
@@ -182,7 +191,10 @@ def prices_endpoint():
         try:
             data = request.get_json()
             if data:
-                logger.info(f"Received price update: {data}")
+                if isinstance(data.get('prices'), list):
+                    logger.debug(f"Received {len(data['prices'])} price updates")
+                else:
+                    logger.info(f"Received price update: {data}")
                 return jsonify({'status': 'success', 'message': 'Price update received'}), 200
             else:
                 return jsonify({'error': 'No data provided'}), 400
@@ -221,11 +233,33 @@ def run_flask_app():
     app.run(host='0.0.0.0', port=5002, debug=False, use_reloader=False)
 
 def main():
-    global feed_manager
+    global feed_manager, gateway_forwarder, tick_publisher
     logger.info("🚀 Starting ASCEP Price Feed Service...")
     
+    if redis_client:
+        tick_publisher = TickPublisher(
+            redis_client,
+            max_queue=TICK_QUEUE_SIZE,
+            batch_size=TICK_BATCH_SIZE,
+            dumps=encode_event if TICK_ENCODING == 'binary' else json.dumps
+        )
+        logger.info(f"📦 Publishing ticks as {TICK_ENCODING}")
+    
+    if GATEWAY_FORWARDING:
+        gateway_forwarder = GatewayForwarder(
+            os.getenv('API_GATEWAY_URL', 'http://localhost:5000'),
+            max_queue=GATEWAY_QUEUE_SIZE,
+            batch_size=GATEWAY_BATCH_SIZE,
+            flush_interval=GATEWAY_FLUSH_INTERVAL
+        )
+        logger.info(f"📮 Forwarding ticks to API gateway at {gateway_forwarder.url}")
+    
     # Initialize price feed manager
-    feed_manager = PriceFeedManager()
+    feed_manager = PriceFeedManager(
+        max_rate=PRICE_CONFLATION_RATE,
+        executor_workers=FEED_EXECUTOR_WORKERS,
+        sink_queue_size=SINK_QUEUE_SIZE
+    )
     feed_manager.add_price_callback(send_price_to_backend)
     
     # Crypto symbols (Binance WebSocket - Real-time)
@@ -290,13 +324,17 @@ def main():
             # Log status every 30 seconds
             status = feed_manager.get_feed_status()
             logger.info("📊 Feed Status:")
-            for feed_name, is_connected in status.items():
+            for feed_name, feed_status in status.items():
+                is_connected = feed_status['connected']
                 status_icon = "✅" if is_connected else "❌"
                 logger.info(f"   {status_icon} {feed_name}: {'Connected' if is_connected else 'Disconnected'}")
+                for shard in feed_status.get('shards', []):
+                    if not shard['connected']:
+                        logger.info(f"      ❌ shard {shard['shard']} ({shard['streams']} streams): {shard['last_error']}")
                 
     except KeyboardInterrupt:
         logger.info("🛑 Stopping price feed service...")
-        feed_manager.disconnect_all()
+        feed_manager.shutdown()
         logger.info("✅ Price feed service stopped")
 
 if __name__ == "__main__":
@@ -1,19 +1,25 @@
 """
 ASCEP Data Ingestion - Price Feed Connectors
 Multi-source price feed integration for real-time market data
+
+Feeds run as coroutines on a single asyncio event loop owned by
+PriceFeedManager; blocking calls (REST requests) go to a small thread pool.
 """
 
 import os
 import json
 import time
+import random
 import logging
 import asyncio
-import websocket
+import websockets
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, NamedTuple, Optional
 import threading
 from dotenv import load_dotenv
+from order_book import OrderBook
 
 # Load environment variables
 load_dotenv()
@@ -22,6 +28,27 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class Tick(NamedTuple):
+    """One market data update; optional fields are None when the source does not provide them"""
+    symbol: str
+    price: float
+    timestamp: str
+    source: str = ''
+    volume: Optional[float] = None        # base asset volume traded since the previous volume tick
+    quote_volume: Optional[float] = None  # quote asset volume traded since the previous volume tick
+    bid: Optional[float] = None
+    bid_size: Optional[float] = None
+    ask: Optional[float] = None
+    ask_size: Optional[float] = None
+    depth: Optional[Dict] = None          # quote notional -> [executable bid, ask] from the local book
+    updates: Optional[int] = None         # feed updates conflated into this tick
+    
+    def to_event(self) -> Dict:
+        """Event dictionary published to Redis and the gateway (None fields omitted)"""
+        event = {field: value for field, value in zip(self._fields, self) if value is not None}
+        event['type'] = 'price_update'
+        return event
+
 class PriceFeed:
     """Base class for price feed connectors"""
     
@@ -29,6 +56,7 @@ class PriceFeed:
         self.name = name
         self.symbols = symbols
         self.is_connected = False
+        self.running = False
         self.last_prices = {}
         self.callbacks = []
         
@@ -36,131 +64,511 @@ class PriceFeed:
         """Add callback for price updates"""
         self.callbacks.append(callback)
     
-    def notify_callbacks(self, symbol: str, price: float, timestamp: str):
+    def notify_callbacks(self, tick: Tick):
         """Notify all callbacks with price update"""
         for callback in self.callbacks:
             try:
-                callback(symbol, price, timestamp)
+                callback(tick)
             except Exception as e:
                 logger.error(f"Error in callback: {e}")
     
-    def connect(self):
-        """Connect to price feed"""
+    async def run(self):
+        """Feed coroutine: connect and emit ticks until stopped"""
         raise NotImplementedError
     
     def disconnect(self):
-        """Disconnect from price feed"""
-        raise NotImplementedError
+        """Ask the feed coroutine to stop"""
+        self.running = False
+        self.is_connected = False
+    
+    def get_status(self) -> Dict:
+        """Connection health reported by PriceFeedManager.get_feed_status"""
+        return {'connected': self.is_connected, 'symbols': len(self.symbols)}
+
+# Stream suffix per BINANCE_STREAMS entry
+BINANCE_STREAM_SUFFIXES = {
+    'ticker': '@ticker', 'bookTicker': '@bookTicker', 'depth': '@depth@100ms', 'kline': '@kline_1s'
+}
+
+# Quote assets tried (longest first) when a configured symbol has no '/' and exchangeInfo is off
+BINANCE_QUOTE_ASSETS = ('FDUSD', 'USDT', 'USDC', 'BUSD', 'TUSD', 'BTC', 'ETH', 'BNB', 'EUR', 'TRY')
+
+class _BinanceShard:
+    """One combined-stream connection carrying a subset of the feed's streams"""
+    
+    def __init__(self, index: int, streams: List[str]):
+        self.index = index
+        self.streams = list(streams)
+        self.ws = None
+        self.is_connected = False
+        self.connects = 0
+        self.errors = 0
+        self.messages = 0
+        self.connected_at = None
+        self.last_message = None
+        self.last_error = None
+        self.task = None
+        # Gap accounting: a gap runs from losing a live connection to the next message
+        self.down_since = None
+        self.gaps = 0
+        self.downtime = 0.0
+        self.stale_reconnects = 0
+    
+    def end_gap(self, now: float):
+        if self.down_since is not None:
+            self.gaps += 1
+            self.downtime += now - self.down_since
+            self.down_since = None
+    
+    def current_downtime(self, now: float) -> float:
+        return self.downtime + (now - self.down_since if self.down_since is not None else 0.0)
+    
+    def get_status(self) -> Dict:
+        now = time.monotonic()
+        latency = getattr(self.ws, 'latency', None) if self.ws else None
+        return {
+            'shard': self.index,
+            'connected': self.is_connected,
+            'streams': len(self.streams),
+            'messages': self.messages,
+            'connects': self.connects,
+            'errors': self.errors,
+            'last_message_age': round(now - self.last_message, 3) if self.last_message else None,
+            'ping_latency_ms': round(latency * 1000, 3) if latency else None,
+            'gaps': self.gaps + (1 if self.down_since is not None else 0),
+            'downtime_seconds': round(self.current_downtime(now), 3),
+            'stale_reconnects': self.stale_reconnects,
+            'last_error': self.last_error
+        }
 
 class BinanceWebSocketFeed(PriceFeed):
     """Binance WebSocket price feed connector"""
     
-    def __init__(self, symbols: List[str]):
+    def __init__(self, symbols: List[str], base_url: str = None, streams_per_connection: int = None):
         super().__init__("Binance", symbols)
-        self.ws = None
-        self.ws_thread = None
-        
-    def connect(self):
-        """Connect to Binance WebSocket"""
+        self.base_url = base_url or os.getenv('BINANCE_WS_URL', 'wss://stream.binance.com:9443/stream')
+        # Binance allows up to 1024 streams per connection; smaller shards isolate slow sockets
+        self.streams_per_connection = streams_per_connection or int(os.getenv('BINANCE_STREAMS_PER_CONNECTION', 200))
+        # Reconnect backoff: full jitter over initial * 2^attempt, capped at backoff_max
+        self.backoff_initial = 0.5  # seconds
+        self.backoff_max = float(os.getenv('BINANCE_BACKOFF_MAX', 30))
+        # Liveness: the client pings every ping_interval and drops the socket after ping_timeout without a pong
+        self.ping_interval = float(os.getenv('BINANCE_PING_INTERVAL', 20))
+        self.ping_timeout = float(os.getenv('BINANCE_PING_TIMEOUT', 20))
+        # Staleness: a shard silent this long is reconnected; a silent stream is reported
+        self.stale_after = float(os.getenv('BINANCE_STALE_AFTER', 30))
+        self.shards = []
+        self.stream_updates = {}  # stream -> monotonic time of its last message
+        self.request_id = 0
+        self.loop = None
+        # Optional exchangeInfo lookup of base/quote assets for symbols configured without '/'
+        self.use_exchange_info = os.getenv('BINANCE_EXCHANGE_INFO', 'false').lower() == 'true'
+        self.rest_url = os.getenv('BINANCE_REST_URL', 'https://api.binance.com')
+        # Bidirectional symbol map, e.g. 'BTCUSDT' <-> 'BTC/USDT'
+        self.to_standard = {}
+        self.to_exchange = {}
+        self.build_symbol_map()
+        # Streams consumed per symbol; 'depth' maintains a local L2 book per symbol,
+        # 'kline' supplies per-second traded volume
+        self.stream_types = [
+            stream_type.strip() for stream_type in os.getenv('BINANCE_STREAMS', 'ticker,kline').split(',')
+            if stream_type.strip() in BINANCE_STREAM_SUFFIXES
+        ] or ['ticker']
+        self.depth_notionals = [
+            float(notional) for notional in os.getenv('BINANCE_DEPTH_NOTIONALS', '10000,100000').split(',')
+            if notional.strip()
+        ]
+        self.depth_snapshot_limit = 1000
+        self.books = {}  # standard symbol -> OrderBook
+    
+    def build_symbol_map(self, assets: Dict[str, tuple] = None):
+        """Map every configured symbol to its exchange and standard forms"""
+        self.to_standard = {}
+        self.to_exchange = {}
+        for symbol in self.symbols:
+            self._register_symbol(symbol, assets)
+    
+    def _register_symbol(self, symbol: str, assets: Dict[str, tuple] = None) -> str:
+        """Add one symbol to the map; returns its standard form"""
+        raw = symbol.replace('/', '').upper()
+        if '/' in symbol:
+            standard = symbol.upper()
+        elif assets and raw in assets:
+            standard = '/'.join(assets[raw])
+        else:
+            quote = next((q for q in BINANCE_QUOTE_ASSETS if raw.endswith(q) and len(raw) > len(q)), None)
+            standard = f"{raw[:-len(quote)]}/{quote}" if quote else raw
+        self.to_standard[raw] = standard
+        self.to_exchange[symbol] = raw
+        self.to_exchange[standard] = raw
+        return standard
+    
+    def _fetch_exchange_info(self) -> Dict[str, tuple]:
+        """Base/quote assets for the configured symbols from /api/v3/exchangeInfo (blocking)"""
+        raw_symbols = [symbol.replace('/', '').upper() for symbol in self.symbols]
+        response = requests.get(
+            f"{self.rest_url}/api/v3/exchangeInfo",
+            params={'symbols': json.dumps(raw_symbols, separators=(',', ':'))},
+            timeout=10
+        )
+        response.raise_for_status()
+        return {
+            info['symbol']: (info['baseAsset'], info['quoteAsset'])
+            for info in response.json().get('symbols', [])
+        }
+    
+    def stream_names(self, symbol: str) -> List[str]:
+        """Binance streams for a symbol (e.g., BTC/USDT -> btcusdt@ticker, btcusdt@depth@100ms)"""
+        raw = self.to_exchange.get(symbol)
+        if raw is None:
+            raw = self.to_exchange[self._register_symbol(symbol)]
+        return [f"{raw.lower()}{BINANCE_STREAM_SUFFIXES[stream_type]}" for stream_type in self.stream_types]
+    
+    def _shard_streams(self, streams: List[str]) -> List[List[str]]:
+        size = max(1, self.streams_per_connection)
+        return [streams[i:i + size] for i in range(0, len(streams), size)]
+    
+    async def run(self):
+        """Run one connection per shard until stopped"""
+        self.running = True
+        self.loop = asyncio.get_running_loop()
+        if self.use_exchange_info:
+            try:
+                assets = await self.loop.run_in_executor(None, self._fetch_exchange_info)
+                self.build_symbol_map(assets)
+                logger.info(f"Loaded Binance exchangeInfo for {len(assets)} symbols")
+            except Exception as e:
+                logger.warning(f"⚠️ Binance exchangeInfo unavailable, using configured symbols: {e}")
+        streams = list(dict.fromkeys(
+            stream for symbol in self.symbols for stream in self.stream_names(symbol)
+        ))
+        self.shards = [_BinanceShard(i, chunk) for i, chunk in enumerate(self._shard_streams(streams))]
+        logger.info(f"Connecting to Binance with {len(streams)} streams over {len(self.shards)} connections")
+        for shard in self.shards:
+            shard.task = asyncio.create_task(self._run_shard(shard))
+        watchdog = asyncio.create_task(self._watchdog())
         try:
-            # Convert symbols to Binance format (e.g., EUR/USD -> EURUSDT)
-            binance_symbols = []
-            for symbol in self.symbols:
-                if '/' in symbol:
-                    binance_symbol = symbol.replace('/', '').lower()
-                    binance_symbols.append(binance_symbol)
+            while self.running:
+                # Re-read the shard list: subscribe() may have opened new shards
+                pending = [shard.task for shard in self.shards if not shard.task.done()]
+                if pending:
+                    await asyncio.wait(pending, timeout=1.0)
                 else:
-                    binance_symbols.append(symbol.lower())
-            
-            # Create WebSocket URL - use combined streams endpoint for better performance
-            streams = [f"{symbol}@ticker" for symbol in binance_symbols]
-            
-            # If we have too many streams, use the combined streams endpoint
-            if len(streams) > 5:
-                # Use the combined streams endpoint which is more efficient
-                ws_url = f"wss://stream.binance.com:9443/stream?streams={'/'.join(streams)}"
-            else:
-                # For fewer streams, use the regular endpoint
-                ws_url = f"wss://stream.binance.com:9443/ws/{'/'.join(streams)}"
-            
-            logger.info(f"Connecting to Binance WebSocket with {len(streams)} streams")
-            logger.info(f"WebSocket URL length: {len(ws_url)} characters")
-            
-            # Check if URL is too long (should be under 2048 characters for most servers)
-            if len(ws_url) > 2000:
-                logger.warning(f"WebSocket URL is very long ({len(ws_url)} chars). Consider reducing number of symbols.")
-            
-            # Create WebSocket connection
-            self.ws = websocket.WebSocketApp(
-                ws_url,
-                on_open=self.on_open,
-                on_message=self.on_message,
-                on_error=self.on_error,
-                on_close=self.on_close
-            )
-            
-            # Start WebSocket in separate thread
-            self.ws_thread = threading.Thread(target=self.ws.run_forever)
-            self.ws_thread.daemon = True
-            self.ws_thread.start()
-            
-            self.is_connected = True
-            logger.info("Connected to Binance WebSocket")
-            
-        except Exception as e:
-            logger.error(f"Error connecting to Binance: {e}")
+                    await asyncio.sleep(1.0)
+        finally:
+            watchdog.cancel()
+            for shard in self.shards:
+                shard.task.cancel()
             self.is_connected = False
-    
-    def disconnect(self):
-        """Disconnect from Binance WebSocket"""
-        if self.ws:
-            self.ws.close()
-        self.is_connected = False
         logger.info("Disconnected from Binance WebSocket")
     
-    def on_open(self, ws):
-        """WebSocket open handler"""
-        logger.info("Binance WebSocket opened")
+    def backoff_delay(self, attempt: int) -> float:
+        """Jittered exponential reconnect delay for the given consecutive failure count"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_initial * (2 ** min(attempt, 16))))
+    
+    async def _run_shard(self, shard: _BinanceShard):
+        """Connect, SUBSCRIBE to the shard's streams and read until stopped, reconnecting with backoff"""
+        attempt = 0
+        while self.running:
+            try:
+                async with websockets.connect(self.base_url, ping_interval=self.ping_interval,
+                                              ping_timeout=self.ping_timeout) as ws:
+                    shard.ws = ws
+                    shard.connects += 1
+                    shard.connected_at = time.monotonic()
+                    if shard.streams:
+                        await self._send(ws, 'SUBSCRIBE', shard.streams)
+                    shard.is_connected = True
+                    self._update_connected()
+                    logger.info(f"Binance shard {shard.index} opened ({len(shard.streams)} streams)")
+                    async for message in ws:
+                        now = time.monotonic()
+                        shard.messages += 1
+                        shard.last_message = now
+                        shard.end_gap(now)
+                        attempt = 0
+                        self.on_message(message, now)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                shard.errors += 1
+                shard.last_error = str(e)
+                logger.error(f"Binance shard {shard.index} error: {e}")
+            finally:
+                shard.ws = None
+                shard.is_connected = False
+                if shard.down_since is None and shard.last_message is not None:
+                    shard.down_since = time.monotonic()
+                self._update_connected()
+            
+            if self.running:
+                delay = self.backoff_delay(attempt)
+                attempt += 1
+                logger.info(f"Binance shard {shard.index} closed; reconnecting in {delay:.1f}s (attempt {attempt})")
+                await asyncio.sleep(delay)
+    
+    async def _watchdog(self):
+        """Reconnect shards that stopped delivering messages
+        
+        Binance ignores a SUBSCRIBE for a stream the connection already has, so a
+        single quiet stream cannot be revived in place; it is only reported
+        (`stale_streams`). Reconnecting is left to whole-shard silence.
+        """
+        while self.running:
+            await asyncio.sleep(max(0.1, min(self.stale_after / 2, 5.0)))
+            now = time.monotonic()
+            for shard in self.shards:
+                if shard.ws is None or now - shard.connected_at < self.stale_after:
+                    continue
+                if now - (shard.last_message or shard.connected_at) >= self.stale_after:
+                    shard.stale_reconnects += 1
+                    logger.warning(f"⚠️ Binance shard {shard.index} silent for {self.stale_after}s; reconnecting")
+                    asyncio.create_task(shard.ws.close())
+    
+    def _stale_streams(self, shard: _BinanceShard, now: float) -> int:
+        """Streams on a live shard with no message for stale_after seconds"""
+        if shard.ws is None or shard.connected_at is None:
+            return 0
+        return sum(
+            1 for stream in shard.streams
+            if now - self.stream_updates.get(stream, shard.connected_at) >= self.stale_after
+        )
+    
+    async def _send(self, ws, method: str, streams: List[str]):
+        self.request_id += 1
+        await ws.send(json.dumps({'method': method, 'params': streams, 'id': self.request_id}))
     
-    def on_message(self, ws, message):
+    def _update_connected(self):
+        self.is_connected = any(shard.is_connected for shard in self.shards)
+    
+    def subscribe(self, symbols: List[str]):
+        """Add symbols to a running feed without reconnecting (callable from any thread)"""
+        new = [symbol for symbol in symbols if symbol not in self.symbols]
+        self.symbols.extend(new)
+        for symbol in new:
+            self._register_symbol(symbol)
+        if new and self.loop and self.running:
+            streams = [stream for symbol in new for stream in self.stream_names(symbol)]
+            asyncio.run_coroutine_threadsafe(self._subscribe(streams), self.loop)
+    
+    def unsubscribe(self, symbols: List[str]):
+        """Remove symbols from a running feed without reconnecting (callable from any thread)"""
+        removed = [symbol for symbol in symbols if symbol in self.symbols]
+        for symbol in removed:
+            self.symbols.remove(symbol)
+            standard = self.to_standard.get(self.to_exchange.get(symbol), symbol)
+            self.last_prices.pop(standard, None)
+            self.books.pop(standard, None)
+        if removed and self.loop and self.running:
+            streams = [stream for symbol in removed for stream in self.stream_names(symbol)]
+            asyncio.run_coroutine_threadsafe(self._unsubscribe(streams), self.loop)
+    
+    async def _subscribe(self, streams: List[str]):
+        """Fill shards with spare capacity first, then open new shards"""
+        for shard in self.shards:
+            free = self.streams_per_connection - len(shard.streams)
+            if free <= 0 or not streams:
+                continue
+            chunk, streams = streams[:free], streams[free:]
+            shard.streams.extend(chunk)
+            if shard.ws is not None:
+                await self._send(shard.ws, 'SUBSCRIBE', chunk)
+        for chunk in self._shard_streams(streams):
+            shard = _BinanceShard(len(self.shards), chunk)
+            self.shards.append(shard)
+            shard.task = asyncio.create_task(self._run_shard(shard))
+    
+    async def _unsubscribe(self, streams: List[str]):
+        for shard in self.shards:
+            chunk = [stream for stream in streams if stream in shard.streams]
+            if not chunk:
+                continue
+            shard.streams = [stream for stream in shard.streams if stream not in chunk]
+            for stream in chunk:
+                self.stream_updates.pop(stream, None)
+            if shard.ws is not None:
+                await self._send(shard.ws, 'UNSUBSCRIBE', chunk)
+    
+    def get_status(self) -> Dict:
+        """Feed health, gap totals and one entry per shard connection"""
+        now = time.monotonic()
+        shards = [
+            {**shard.get_status(), 'stale_streams': self._stale_streams(shard, now)}
+            for shard in self.shards
+        ]
+        return {
+            'connected': self.is_connected,
+            'symbols': len(self.symbols),
+            'connections': len(self.shards),
+            'connected_shards': sum(1 for shard in shards if shard['connected']),
+            'gaps': sum(shard['gaps'] for shard in shards),
+            'downtime_seconds': round(sum(shard['downtime_seconds'] for shard in shards), 3),
+            'stale_streams': sum(shard['stale_streams'] for shard in shards),
+            'books': {
+                'total': len(self.books),
+                'synced': sum(1 for book in self.books.values() if book.synced),
+                'sequence_gaps': sum(book.gaps for book in self.books.values()),
+                'snapshots': sum(book.snapshots for book in self.books.values())
+            } if self.books else None,
+            'shards': shards
+        }
+    
+    def on_message(self, message, received_at: float = None):
         """WebSocket message handler"""
         try:
             data = json.loads(message)
             
+            # SUBSCRIBE/UNSUBSCRIBE acknowledgements
+            if 'id' in data and 'data' not in data:
+                if data.get('error'):
+                    logger.error(f"Binance subscription request {data['id']} failed: {data['error']}")
+                return
+            
             # Handle combined streams format (data is wrapped in a 'data' field)
             if 'data' in data:
+                if 'stream' in data:
+                    self.stream_updates[data['stream']] = received_at or time.monotonic()
                 data = data['data']
             
-            if 's' in data and 'c' in data:  # Symbol and close price
-                symbol = data['s']
-                price = float(data['c'])
-                timestamp = datetime.utcnow().isoformat()
-                
-                # Convert back to standard format (e.g., EURUSDT -> EUR/USD)
-                if len(symbol) == 6 and symbol.endswith('USDT'):
-                    base = symbol[:3]
-                    quote = symbol[3:6]
-                    standard_symbol = f"{base}/{quote}"
-                else:
-                    standard_symbol = symbol
-                
-                self.last_prices[standard_symbol] = price
-                self.notify_callbacks(standard_symbol, price, timestamp)
+            if data.get('e') == 'depthUpdate':
+                tick = self._on_depth_update(data)
+            elif data.get('e') == 'kline':
+                tick = self.parse_kline(data)
+            else:
+                tick = self.parse_tick(data)
+            if tick:
+                self.last_prices[tick.symbol] = tick.price
+                self.notify_callbacks(tick)
                 
         except Exception as e:
             logger.error(f"Error processing Binance message: {e}")
             logger.debug(f"Raw message: {message}")
     
-    def on_error(self, ws, error):
-        """WebSocket error handler"""
-        logger.error(f"Binance WebSocket error: {error}")
-        self.is_connected = False
+    def _on_depth_update(self, data: Dict) -> Optional[Tick]:
+        """Apply a depth diff to the symbol's book; a tick once the book is in sync"""
+        symbol = self.to_standard.get(data['s'], data['s'])
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        
+        if not book.synced:
+            book.buffer_diff(data)
+            self._request_snapshot(book, data['s'])
+            return None
+        if not book.apply_diff(data):
+            logger.warning(f"⚠️ Depth sequence gap for {symbol}; resyncing order book")
+            self._request_snapshot(book, data['s'])
+            return None
+        return self._book_tick(book, data.get('E'))
+    
+    def _book_tick(self, book: OrderBook, event_time: Optional[int]) -> Optional[Tick]:
+        best_bid = book.best_bid()
+        best_ask = book.best_ask()
+        if best_bid is None or best_ask is None:
+            return None
+        if event_time:
+            timestamp = datetime.utcfromtimestamp(event_time / 1000).isoformat()
+        else:
+            timestamp = datetime.utcnow().isoformat()
+        return Tick(
+            symbol=book.symbol,
+            price=(best_bid[0] + best_ask[0]) / 2,
+            timestamp=timestamp,
+            source=self.name,
+            bid=best_bid[0],
+            bid_size=best_bid[1],
+            ask=best_ask[0],
+            ask_size=best_ask[1],
+            depth=book.depth_at(self.depth_notionals) if self.depth_notionals else None
+        )
+    
+    def _request_snapshot(self, book: OrderBook, raw_symbol: str):
+        if not book.snapshot_pending and self.loop:
+            book.snapshot_pending = True
+            self.loop.create_task(self._load_snapshot(book, raw_symbol))
+    
+    async def _load_snapshot(self, book: OrderBook, raw_symbol: str):
+        """Fetch REST depth snapshots until one bridges the buffered diffs"""
+        try:
+            for attempt in range(5):
+                if not self.running or self.books.get(book.symbol) is not book:
+                    return
+                try:
+                    snapshot = await self.loop.run_in_executor(None, self._fetch_depth_snapshot, raw_symbol)
+                    if book.apply_snapshot(snapshot):
+                        book.snapshots += 1
+                        logger.info(f"📗 Order book for {book.symbol} synced at update {book.last_update_id}")
+                        return
+                except Exception as e:
+                    logger.error(f"Depth snapshot for {book.symbol} failed: {e}")
+                await asyncio.sleep(self.backoff_delay(attempt))
+            logger.warning(f"⚠️ Could not sync order book for {book.symbol}; retrying on the next diff")
+        finally:
+            book.snapshot_pending = False
+    
+    def _fetch_depth_snapshot(self, raw_symbol: str) -> Dict:
+        """REST depth snapshot for one exchange symbol (blocking)"""
+        response = requests.get(
+            f"{self.rest_url}/api/v3/depth",
+            params={'symbol': raw_symbol, 'limit': self.depth_snapshot_limit},
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def parse_kline(self, data: Dict) -> Optional[Tick]:
+        """Build a volume Tick from a closed 1s kline (open candles are skipped)"""
+        kline = data['k']
+        if not kline.get('x'):
+            return None
+        return Tick(
+            symbol=self.to_standard.get(data['s'], data['s']),
+            price=float(kline['c']),
+            timestamp=datetime.utcfromtimestamp(kline['T'] / 1000).isoformat(),
+            source=self.name,
+            volume=float(kline['v']),
+            quote_volume=float(kline['q'])
+        )
+    
+    def parse_tick(self, data: Dict) -> Optional[Tick]:
+        """Build a Tick from a 24hr ticker or bookTicker payload
+        
+        The ticker's `v`/`q` are rolling 24h totals, not volume traded since the
+        last tick, so they are left out; volume comes from the kline stream.
+        """
+        if 's' not in data:
+            return None
+        symbol = data['s']
+        
+        # Convert back to standard format (e.g., BTCUSDT -> BTC/USDT)
+        standard_symbol = self.to_standard.get(symbol, symbol)
+        
+        # Exchange event time ('E', ms) so downstream ordering follows the source clock
+        if 'E' in data:
+            timestamp = datetime.utcfromtimestamp(data['E'] / 1000).isoformat()
+        else:
+            timestamp = datetime.utcnow().isoformat()
+        
+        bid = float(data['b']) if 'b' in data else None
+        ask = float(data['a']) if 'a' in data else None
+        if 'c' in data:  # Ticker: last price
+            price = float(data['c'])
+        elif bid is not None and ask is not None:  # bookTicker: mid price
+            price = (bid + ask) / 2
+        else:
+            return None
+        
+        return Tick(
+            symbol=standard_symbol,
+            price=price,
+            timestamp=timestamp,
+            source=self.name,
+            bid=bid,
+            bid_size=float(data['B']) if 'B' in data else None,
+            ask=ask,
+            ask_size=float(data['A']) if 'A' in data else None
+        )
     
-    def on_close(self, ws, close_status_code, close_msg):
-        """WebSocket close handler"""
-        logger.info("Binance WebSocket closed")
-        self.is_connected = False
-
 class AlphaVantageFeed(PriceFeed):
     """Alpha Vantage REST API price feed connector"""
     
@@ -169,43 +577,38 @@ class AlphaVantageFeed(PriceFeed):
         self.api_key = api_key or os.getenv('ALPHA_VANTAGE_API_KEY')
         self.base_url = "https://www.alphavantage.co/query"
         self.update_interval = 60  # 60 seconds (free tier limit)
-        self.update_thread = None
         
-    def connect(self):
-        """Connect to Alpha Vantage API"""
+    async def run(self):
+        """Poll Alpha Vantage; the blocking HTTP calls run on the runtime's executor"""
         if not self.api_key:
             logger.error("Alpha Vantage API key not provided")
             return
         
         logger.info("Starting Alpha Vantage price feed")
+        self.running = True
         self.is_connected = True
+        loop = asyncio.get_running_loop()
         
-        # Start update thread
-        self.update_thread = threading.Thread(target=self._update_loop)
-        self.update_thread.daemon = True
-        self.update_thread.start()
-    
-    def disconnect(self):
-        """Disconnect from Alpha Vantage API"""
-        self.is_connected = False
-        logger.info("Stopped Alpha Vantage price feed")
-    
-    def _update_loop(self):
-        """Main update loop"""
-        while self.is_connected:
+        while self.running:
             try:
                 for symbol in self.symbols:
-                    self._fetch_price(symbol)
+                    tick = await loop.run_in_executor(None, self._fetch_price, symbol)
+                    if tick:
+                        self.last_prices[symbol] = tick.price
+                        self.notify_callbacks(tick)
                 
                 # Wait for next update
-                time.sleep(self.update_interval)
+                await asyncio.sleep(self.update_interval)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in Alpha Vantage update loop: {e}")
-                time.sleep(10)  # Wait before retry
+                await asyncio.sleep(10)  # Wait before retry
+        logger.info("Stopped Alpha Vantage price feed")
     
-    def _fetch_price(self, symbol: str):
-        """Fetch price for a symbol"""
+    def _fetch_price(self, symbol: str) -> Optional[Tick]:
+        """Fetch price for a symbol (blocking)"""
         try:
             # Convert symbol format (e.g., EUR/USD -> EURUSD)
             fx_symbol = symbol.replace('/', '')
@@ -227,18 +630,18 @@ class AlphaVantageFeed(PriceFeed):
                 price = float(rate_data['5. Exchange Rate'])
                 timestamp = rate_data['6. Last Refreshed']
                 
-                self.last_prices[symbol] = price
-                self.notify_callbacks(symbol, price, timestamp)
+                return Tick(symbol, price, timestamp, self.name)
                 
         except Exception as e:
             logger.error(f"Error fetching price for {symbol}: {e}")
+        return None
 
 class MockPriceFeed(PriceFeed):
     """Mock price feed for testing and development"""
     
     def __init__(self, symbols: List[str]):
         super().__init__("Mock", symbols)
-        self.update_thread = None
+        self.last_volumes = {symbol: 1000000.0 for symbol in symbols}
         
         # Initialize with mock prices
         for symbol in symbols:
@@ -251,26 +654,13 @@ class MockPriceFeed(PriceFeed):
             else:
                 self.last_prices[symbol] = 1.0000
     
-    def connect(self):
-        """Start mock price feed"""
+    async def run(self):
+        """Mock price update loop"""
         logger.info("Starting mock price feed")
+        self.running = True
         self.is_connected = True
         
-        # Start update thread
-        self.update_thread = threading.Thread(target=self._update_loop)
-        self.update_thread.daemon = True
-        self.update_thread.start()
-    
-    def disconnect(self):
-        """Stop mock price feed"""
-        self.is_connected = False
-        logger.info("Stopped mock price feed")
-    
-    def _update_loop(self):
-        """Mock price update loop"""
-        import random
-        
-        while self.is_connected:
+        while self.running:
             try:
                 for symbol in self.symbols:
                     # Generate random price movement
@@ -286,23 +676,73 @@ class MockPriceFeed(PriceFeed):
                     elif 'GBP/USD' in symbol:
                         new_price = max(1.2000, min(1.3300, new_price))
                     
+                    # Volume drifts around its level with occasional bursts
+                    volume = self.last_volumes[symbol] * random.uniform(0.98, 1.02)
+                    volume = max(500000.0, min(2000000.0, volume))
+                    self.last_volumes[symbol] = volume
+                    if random.random() < 0.01:
+                        volume *= random.uniform(2, 4)
+                    
                     timestamp = datetime.utcnow().isoformat()
                     self.last_prices[symbol] = new_price
-                    self.notify_callbacks(symbol, new_price, timestamp)
+                    self.notify_callbacks(Tick(
+                        symbol=symbol,
+                        price=new_price,
+                        timestamp=timestamp,
+                        source=self.name,
+                        volume=volume,
+                        quote_volume=volume * new_price,
+                        bid=new_price - 0.0001,
+                        bid_size=random.uniform(1, 10) * 100000,
+                        ask=new_price + 0.0001,
+                        ask_size=random.uniform(1, 10) * 100000
+                    ))
                 
                 # Update every 2 seconds
-                time.sleep(2)
+                await asyncio.sleep(2)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in mock update loop: {e}")
-                time.sleep(5)
+                await asyncio.sleep(5)
+        logger.info("Stopped mock price feed")
 
 class PriceFeedManager:
-    """Manager for multiple price feeds"""
+    """Manager for multiple price feeds
     
-    def __init__(self):
+    All feeds run as tasks on one asyncio event loop in a single runtime
+    thread. Each price callback is a sink with its own bounded queue and
+    consumer task, so a slow sink only delays (and, when its queue is full,
+    drops the oldest ticks of) itself. Sinks may be plain functions, which
+    should not block, or coroutine functions. Blocking feed work runs on a
+    small thread pool set as the loop's default executor.
+    
+    With `max_rate` > 0, updates are conflated: only the latest tick per
+    symbol is kept, and a drain task delivers pending ticks to the sinks at
+    most `max_rate` times per second. Memory stays O(symbols) however bursty
+    the feeds are; each delivered tick carries how many updates it replaced
+    in `updates`.
+    """
+    
+    def __init__(self, max_rate: float = 0, executor_workers: int = 4, sink_queue_size: int = 10000):
         self.feeds = {}
         self.price_callbacks = []
+        self.max_rate = max_rate
+        self.executor_workers = executor_workers
+        self.sink_queue_size = sink_queue_size
+        self.pending = {}         # symbol -> latest undelivered tick
+        self.pending_counts = {}  # symbol -> updates received since the last delivery
+        self.conflation_stats = {'received': 0, 'delivered': 0, 'conflated': 0, 'drains': 0}
+        
+        self.loop = None
+        self.loop_thread = None
+        self.loop_ready = threading.Event()
+        self.executor = None
+        self.feed_tasks = {}      # feed name -> asyncio.Task
+        self.sinks = []           # [callback, asyncio.Queue, task, stats]
+        self.pending_event = None
+        self.drain_task = None
         
     def add_feed(self, feed: PriceFeed):
         """Add a price feed"""
@@ -313,32 +753,184 @@ class PriceFeedManager:
     def remove_feed(self, feed_name: str):
         """Remove a price feed"""
         if feed_name in self.feeds:
-            self.feeds[feed_name].disconnect()
-            del self.feeds[feed_name]
+            feed = self.feeds.pop(feed_name)
+            feed.disconnect()
+            self._call_in_loop(self._cancel_feed, feed_name)
             logger.info(f"Removed price feed: {feed_name}")
     
     def connect_all(self):
-        """Connect to all price feeds"""
-        for feed in self.feeds.values():
-            feed.connect()
+        """Start the runtime (if needed) and run every feed as a task"""
+        self._ensure_runtime()
+        for feed in list(self.feeds.values()):
+            self._call_in_loop(self._start_feed, feed)
     
     def disconnect_all(self):
-        """Disconnect from all price feeds"""
+        """Stop all feed tasks; sinks keep draining what was already queued"""
         for feed in self.feeds.values():
             feed.disconnect()
+        for feed_name in list(self.feeds):
+            self._call_in_loop(self._cancel_feed, feed_name)
+    
+    def shutdown(self):
+        """Stop the feeds, the event loop and the executor"""
+        self.disconnect_all()
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join(timeout=5)
+        if self.executor:
+            self.executor.shutdown(wait=False)
     
     def add_price_callback(self, callback: Callable):
-        """Add callback for price updates from any feed"""
+        """Add a sink for price updates from any feed"""
         self.price_callbacks.append(callback)
+        self._call_in_loop(self._start_sink, callback)
     
-    def _on_price_update(self, symbol: str, price: float, timestamp: str):
-        """Handle price updates from feeds"""
+    # -- runtime (everything below runs on the event loop unless noted) --
+    
+    def _ensure_runtime(self):
+        """Start the event loop thread (called from any thread)"""
+        if self.loop_thread and self.loop_thread.is_alive():
+            return
+        self.loop_ready.clear()
+        self.loop_thread = threading.Thread(target=self._run_loop, name="price-feed-runtime", daemon=True)
+        self.loop_thread.start()
+        self.loop_ready.wait()
+    
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="price-feed-io")
+        self.loop.set_default_executor(self.executor)
         for callback in self.price_callbacks:
+            self._start_sink(callback)
+        if self.max_rate > 0:
+            self.pending_event = asyncio.Event()
+            self.drain_task = self.loop.create_task(self._drain_loop())
+        self.loop.call_soon(self.loop_ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+    
+    def _call_in_loop(self, func, *args):
+        """Schedule func on the runtime loop; a no-op before the runtime has started"""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(func, *args)
+    
+    def _start_feed(self, feed: PriceFeed):
+        task = self.feed_tasks.get(feed.name)
+        if task and not task.done():
+            return
+        self.feed_tasks[feed.name] = self.loop.create_task(self._run_feed(feed))
+    
+    def _cancel_feed(self, feed_name: str):
+        task = self.feed_tasks.pop(feed_name, None)
+        if task:
+            task.cancel()
+    
+    async def _run_feed(self, feed: PriceFeed):
+        try:
+            await feed.run()
+        except asyncio.CancelledError:
+            logger.info(f"Stopped price feed: {feed.name}")
+            raise
+        except Exception as e:
+            logger.error(f"Price feed {feed.name} failed: {e}")
+        finally:
+            feed.is_connected = False
+    
+    def _start_sink(self, callback: Callable):
+        if any(sink[0] is callback for sink in self.sinks):
+            return
+        queue = asyncio.Queue(maxsize=self.sink_queue_size)
+        stats = {'delivered': 0, 'dropped': 0, 'errors': 0}
+        sink = [callback, queue, None, stats]
+        sink[2] = self.loop.create_task(self._consume(callback, queue, stats))
+        self.sinks.append(sink)
+    
+    async def _consume(self, callback: Callable, queue: asyncio.Queue, stats: Dict):
+        while True:
+            tick = await queue.get()
             try:
-                callback(symbol, price, timestamp)
+                result = callback(tick)
+                if asyncio.iscoroutine(result):
+                    await result
+                stats['delivered'] += 1
             except Exception as e:
+                stats['errors'] += 1
                 logger.error(f"Error in price callback: {e}")
     
+    def _on_price_update(self, tick: Tick):
+        """Handle price updates from feeds"""
+        if self.max_rate > 0:
+            self.pending[tick.symbol] = tick
+            self.pending_counts[tick.symbol] = self.pending_counts.get(tick.symbol, 0) + 1
+            self.conflation_stats['received'] += 1
+            self.pending_event.set()
+            return
+        self._deliver(tick)
+    
+    def _deliver(self, tick: Tick):
+        """Queue a tick for every sink, dropping a full queue's oldest tick"""
+        for _, queue, _, stats in self.sinks:
+            if queue.full():
+                queue.get_nowait()
+                stats['dropped'] += 1
+            queue.put_nowait(tick)
+    
+    async def _drain_loop(self):
+        """Deliver the latest tick per symbol, at most max_rate times per second"""
+        interval = 1.0 / self.max_rate
+        while True:
+            await self.pending_event.wait()
+            self.pending_event.clear()
+            started = time.monotonic()
+            pending, self.pending = self.pending, {}
+            counts, self.pending_counts = self.pending_counts, {}
+            
+            for symbol, tick in pending.items():
+                self._deliver(tick._replace(updates=counts[symbol]))
+            self.conflation_stats['drains'] += 1
+            self.conflation_stats['delivered'] += len(pending)
+            self.conflation_stats['conflated'] += sum(counts.values()) - len(pending)
+            
+            delay = interval - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+    
+    # -- stats (safe to call from any thread) --
+    
+    def get_conflation_stats(self) -> Dict:
+        """Counters for the conflation buffer (empty when conflation is off)"""
+        if self.max_rate <= 0:
+            return {}
+        return {**self.conflation_stats, 'pending_symbols': len(self.pending), 'max_rate': self.max_rate}
+    
+    def get_runtime_stats(self) -> Dict:
+        """Event loop, feed task and sink queue status"""
+        running = bool(self.loop and self.loop.is_running())
+        return {
+            'running': running,
+            'executor_workers': self.executor_workers,
+            'feeds': {
+                name: 'running' if not task.done() else 'stopped'
+                for name, task in list(self.feed_tasks.items())
+            },
+            'sinks': [
+                {
+                    'callback': getattr(callback, '__name__', repr(callback)),
+                    'queued': queue.qsize(),
+                    'max_queue': self.sink_queue_size,
+                    **stats
+                }
+                for callback, queue, _, stats in list(self.sinks)
+            ]
+        }
+    
     def get_all_prices(self) -> Dict[str, float]:
         """Get all current prices from all feeds"""
         all_prices = {}
@@ -346,9 +938,9 @@ class PriceFeedManager:
             all_prices.update(feed.last_prices)
         return all_prices
     
-    def get_feed_status(self) -> Dict[str, bool]:
-        """Get connection status of all feeds"""
-        return {name: feed.is_connected for name, feed in self.feeds.items()}
+    def get_feed_status(self) -> Dict[str, Dict]:
+        """Get connection health of all feeds (`connected`, plus per-shard detail where sharded)"""
+        return {name: feed.get_status() for name, feed in list(self.feeds.items())}
 
 # Example usage
 if __name__ == "__main__":
@@ -360,8 +952,8 @@ if __name__ == "__main__":
     manager.add_feed(mock_feed)
     
     # Add callback to print price updates
-    def print_price_update(symbol, price, timestamp):
-        print(f"{timestamp} - {symbol}: {price}")
+    def print_price_update(tick):
+        print(f"{tick.timestamp} - {tick.symbol}: {tick.price} (volume {tick.volume})")
     
     manager.add_price_callback(print_price_update)
     
@@ -372,5 +964,5 @@ if __name__ == "__main__":
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
-        manager.disconnect_all()
+        manager.shutdown()
         print("Stopped price feeds") 
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# price_feeds modules import their siblings by bare name (see main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
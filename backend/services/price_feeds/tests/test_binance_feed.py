@@ -0,0 +1,202 @@
+"""
+Binance feed against a local WebSocket stand-in for the combined-stream endpoint:
+sharding across connections, SUBSCRIBE/UNSUBSCRIBE on live connections and
+per-shard status.
+"""
+
+import asyncio
+import json
+
+import pytest
+import websockets
+
+from price_feeds import BinanceWebSocketFeed
+
+
+class StandInServer:
+    """Records every connection's subscription requests and acknowledges them"""
+
+    def __init__(self):
+        self.connections = []  # [websocket, [(method, params)]]
+        self.server = None
+        self.url = None
+
+    async def start(self):
+        self.server = await websockets.serve(self.handler, '127.0.0.1', 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/stream"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handler(self, ws, path=None):
+        requests = []
+        self.connections.append([ws, requests])
+        async for message in ws:
+            request = json.loads(message)
+            requests.append((request['method'], request['params']))
+            await ws.send(json.dumps({'result': None, 'id': request['id']}))
+
+    def subscribed(self, index):
+        """Streams a connection is subscribed to after replaying its requests"""
+        streams = []
+        for method, params in self.connections[index][1]:
+            if method == 'SUBSCRIBE':
+                streams.extend(stream for stream in params if stream not in streams)
+            else:
+                streams = [stream for stream in streams if stream not in params]
+        return streams
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met before timeout")
+        await asyncio.sleep(0.01)
+
+
+def ticker(raw_symbol, price):
+    return json.dumps({
+        'stream': f"{raw_symbol.lower()}@ticker",
+        'data': {'e': '24hrTicker', 'E': 1700000000000, 's': raw_symbol, 'c': str(price)}
+    })
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    monkeypatch.setenv('BINANCE_STREAMS', 'ticker')
+    return lambda symbols, url: BinanceWebSocketFeed(symbols, base_url=url, streams_per_connection=2)
+
+
+def test_shards_subscribe_and_report_status(feed):
+    async def scenario():
+        server = StandInServer()
+        await server.start()
+        binance = feed(['BTC/USDT', 'ETH/USDT', 'SOL/USDT'], server.url)
+        ticks = []
+        binance.add_callback(ticks.append)
+        runner = asyncio.create_task(binance.run())
+        try:
+            # Three streams at two per connection: two shards, each subscribing once open
+            await wait_for(lambda: len(server.connections) == 2
+                           and all(server.subscribed(index) for index in range(2)))
+            assert sorted(map(server.subscribed, range(2))) == [
+                ['btcusdt@ticker', 'ethusdt@ticker'], ['solusdt@ticker']
+            ]
+            by_stream = {stream: shard for shard in binance.shards for stream in shard.streams}
+            first = by_stream['btcusdt@ticker']
+            second = by_stream['solusdt@ticker']
+            first_ws = next(ws for index, (ws, _) in enumerate(server.connections)
+                            if 'btcusdt@ticker' in server.subscribed(index))
+
+            await first_ws.send(ticker('BTCUSDT', 67250.5))
+            await first_ws.send(ticker('ETHUSDT', 3500.25))
+            await wait_for(lambda: len(ticks) == 2)
+            assert [(tick.symbol, tick.price) for tick in ticks] == [('BTC/USDT', 67250.5), ('ETH/USDT', 3500.25)]
+
+            status = binance.get_status()
+            assert status['connections'] == 2
+            assert status['connected_shards'] == 2
+            shards = {shard['shard']: shard for shard in status['shards']}
+            assert shards[first.index]['messages'] >= 2  # two ticks plus the SUBSCRIBE ack
+            assert shards[first.index]['streams'] == 2
+            assert shards[second.index]['streams'] == 1
+            assert shards[second.index]['connects'] == 1
+
+            # A new symbol fills the shard with spare capacity; no new connection is opened
+            binance.subscribe(['ADA/USDT'])
+            await wait_for(lambda: any('adausdt@ticker' in server.subscribed(index) for index in range(2)))
+            assert len(server.connections) == 2
+            assert second.streams == ['solusdt@ticker', 'adausdt@ticker']
+
+            # A full feed opens another shard for the overflow
+            binance.subscribe(['DOT/USDT'])
+            await wait_for(lambda: len(server.connections) == 3 and server.subscribed(2))
+            assert server.subscribed(2) == ['dotusdt@ticker']
+            assert binance.get_status()['connections'] == 3
+
+            # Removing a symbol unsubscribes its stream on the live connection
+            binance.unsubscribe(['BTC/USDT'])
+            await wait_for(lambda: all('btcusdt@ticker' not in server.subscribed(index) for index in range(3)))
+            assert first.streams == ['ethusdt@ticker']
+            assert 'BTC/USDT' not in binance.last_prices
+            assert sorted(stream for index in range(3) for stream in server.subscribed(index)) == [
+                'adausdt@ticker', 'dotusdt@ticker', 'ethusdt@ticker', 'solusdt@ticker'
+            ]
+            assert len(server.connections) == 3
+        finally:
+            binance.disconnect()
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_dropped_shard_reconnects_and_resubscribes(feed):
+    async def scenario():
+        server = StandInServer()
+        await server.start()
+        binance = feed(['BTC/USDT'], server.url)
+        binance.backoff_max = 0.05
+        runner = asyncio.create_task(binance.run())
+        try:
+            await wait_for(lambda: server.connections and server.subscribed(0))
+            shard = binance.shards[0]
+            await server.connections[0][0].send(ticker('BTCUSDT', 67250.5))
+            await wait_for(lambda: shard.messages >= 2)
+
+            await server.connections[0][0].close()
+            await wait_for(lambda: len(server.connections) == 2 and server.subscribed(1))
+            assert server.subscribed(1) == ['btcusdt@ticker']
+
+            await server.connections[1][0].send(ticker('BTCUSDT', 67251.0))
+            await wait_for(lambda: binance.last_prices.get('BTC/USDT') == 67251.0)
+            status = binance.get_status()['shards'][0]
+            assert status['connects'] == 2
+            assert status['gaps'] == 1
+            assert status['connected']
+        finally:
+            binance.disconnect()
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_watchdog_reconnects_silent_shard_and_reports_quiet_streams(feed):
+    async def scenario():
+        server = StandInServer()
+        await server.start()
+        binance = feed(['BTC/USDT', 'ETH/USDT'], server.url)
+        binance.stale_after = 0.3
+        binance.backoff_max = 0.05
+        runner = asyncio.create_task(binance.run())
+        try:
+            await wait_for(lambda: server.connections and server.subscribed(0))
+            shard = binance.shards[0]
+            ws = server.connections[0][0]
+            # Only BTC keeps updating: the shard stays live and ETH is reported, not resubscribed
+            for _ in range(8):
+                await ws.send(ticker('BTCUSDT', 67250.5))
+                await asyncio.sleep(0.05)
+            status = binance.get_status()
+            assert status['stale_streams'] == 1
+            assert status['shards'][0]['stale_streams'] == 1
+            assert server.connections[0][1] == [('SUBSCRIBE', ['btcusdt@ticker', 'ethusdt@ticker'])]
+            assert shard.stale_reconnects == 0
+
+            # A shard silent for stale_after is dropped and reconnected
+            await wait_for(lambda: len(server.connections) == 2 and server.subscribed(1))
+            assert shard.stale_reconnects == 1
+            assert server.subscribed(1) == ['btcusdt@ticker', 'ethusdt@ticker']
+        finally:
+            binance.disconnect()
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+            await server.stop()
+
+    asyncio.run(scenario())
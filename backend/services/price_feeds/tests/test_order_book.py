@@ -0,0 +1,101 @@
+"""
+OrderBook sync: snapshot plus buffered diffs, stale snapshots, sequence gaps
+and the best-price and depth queries built on the sorted sides.
+"""
+
+import pytest
+
+from order_book import OrderBook
+
+
+def diff(first, last, bids=(), asks=()):
+    return {'e': 'depthUpdate', 'U': first, 'u': last,
+            'b': [[str(p), str(q)] for p, q in bids], 'a': [[str(p), str(q)] for p, q in asks]}
+
+
+def snapshot(last_update_id, bids, asks):
+    return {'lastUpdateId': last_update_id,
+            'bids': [[str(p), str(q)] for p, q in bids], 'asks': [[str(p), str(q)] for p, q in asks]}
+
+
+@pytest.fixture
+def book():
+    return OrderBook('BTC/USDT')
+
+
+def test_snapshot_replays_buffered_diffs_it_does_not_cover(book):
+    book.buffer_diff(diff(95, 100, bids=[(99.0, 9)]))           # covered by the snapshot
+    book.buffer_diff(diff(101, 103, bids=[(100.0, 0), (99.5, 2)], asks=[(101.0, 4)]))
+    book.buffer_diff(diff(104, 104, asks=[(102.0, 0)]))
+
+    assert book.apply_snapshot(snapshot(102, bids=[(100.0, 1), (99.0, 3)], asks=[(101.0, 1), (102.0, 5)]))
+    assert book.synced
+    assert book.last_update_id == 104
+    assert book.updates == 2
+    assert not book.buffer
+    assert book.best_bid() == (99.5, 2.0)
+    assert book.best_ask() == (101.0, 4.0)
+    assert book.bids.levels(5) == [(99.5, 2.0), (99.0, 3.0)]
+    assert book.asks.levels(5) == [(101.0, 4.0)]
+
+
+def test_stale_snapshot_is_rejected(book):
+    book.buffer_diff(diff(110, 115, bids=[(100.0, 1)]))
+
+    assert not book.apply_snapshot(snapshot(105, bids=[(99.0, 1)], asks=[(101.0, 1)]))
+    assert not book.synced
+    assert book.best_bid() is None
+    assert len(book.buffer) == 1  # kept for the next snapshot
+
+    assert book.apply_snapshot(snapshot(112, bids=[(99.0, 1)], asks=[(101.0, 1)]))
+    assert book.last_update_id == 115
+    assert book.best_bid() == (100.0, 1.0)
+
+
+def test_sequence_gap_unsyncs_the_book(book):
+    book.apply_snapshot(snapshot(200, bids=[(100.0, 1)], asks=[(101.0, 1)]))
+
+    assert book.apply_diff(diff(195, 200, bids=[(50.0, 1)]))  # already covered: ignored
+    assert book.best_bid() == (100.0, 1.0)
+    assert book.apply_diff(diff(201, 202, bids=[(100.5, 2)]))
+    assert book.last_update_id == 202
+
+    missed = diff(205, 206, asks=[(100.9, 1)])
+    assert not book.apply_diff(missed)
+    assert not book.synced
+    assert book.gaps == 1
+    assert list(book.buffer) == [missed]
+    assert book.best_ask() == (101.0, 1.0)  # the gapped diff was not applied
+    assert book.last_update_id == 202
+
+
+def test_best_prices_follow_level_updates(book):
+    book.apply_snapshot(snapshot(1, bids=[(99.0, 1), (100.0, 2)], asks=[(102.0, 1), (101.0, 3)]))
+    assert book.best_bid() == (100.0, 2.0)
+    assert book.best_ask() == (101.0, 3.0)
+
+    book.apply_diff(diff(2, 2, bids=[(100.0, 0)], asks=[(101.0, 0), (100.5, 1)]))
+    assert book.best_bid() == (99.0, 1.0)
+    assert book.best_ask() == (100.5, 1.0)
+
+    book.apply_diff(diff(3, 3, bids=[(99.0, 0)]))
+    assert book.best_bid() is None
+
+
+def test_depth_at_averages_across_levels(book):
+    book.apply_snapshot(snapshot(1, bids=[(100.0, 1), (99.0, 2)], asks=[(101.0, 1), (102.0, 2)]))
+
+    depth = book.depth_at([50, 200, 1000])
+    assert depth['50'] == [100.0, 101.0]  # filled at the touch
+    # 200 sells 1 @ 100 then 100/99 @ 99; buys 1 @ 101 then 99/102 @ 102
+    assert depth['200'][0] == pytest.approx(200 / (1 + 100 / 99))
+    assert depth['200'][1] == pytest.approx(200 / (1 + 99 / 102))
+    assert depth['1000'] == [None, None]  # deeper than either side
+
+
+def test_trim_keeps_levels_nearest_the_touch():
+    book = OrderBook('BTC/USDT', max_levels=2)
+    book.apply_snapshot(snapshot(1, bids=[(97.0, 1), (98.0, 1), (99.0, 1)],
+                                 asks=[(101.0, 1), (102.0, 1), (103.0, 1)]))
+    assert book.bids.levels(5) == [(99.0, 1.0), (98.0, 1.0)]
+    assert book.asks.levels(5) == [(101.0, 1.0), (102.0, 1.0)]
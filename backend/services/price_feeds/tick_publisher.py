@@ -0,0 +1,122 @@
+"""
+ASCEP Price Feed - Tick Publisher
+Writes ticks to Redis from a background thread, many ticks per pipeline.
+
+Each tick is serialized once and the same payload is published on both
+`price_updates` and `events`. The latest price per symbol is stored once per
+flush (HSET + EXPIRE for the last tick of each symbol in the batch), so a
+busy symbol costs two publishes per tick plus two commands per flush, all in
+one round trip.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict
+
+from backend.services.common.transport import publish
+
+logger = logging.getLogger(__name__)
+
+
+class TickPublisher:
+    """Bounded, pipelined Redis publisher for price ticks"""
+
+    def __init__(self, redis_client, max_queue: int = 10000, batch_size: int = 500,
+                 price_ttl: int = 600, channels=('price_updates', 'events'),
+                 dumps: Callable = json.dumps):
+        self.redis_client = redis_client
+        self.batch_size = batch_size
+        self.price_ttl = price_ttl
+        self.channels = channels
+        self.dumps = dumps
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.stats = {
+            'submitted': 0,
+            'published': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'flush_errors': 0,
+            'commands': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0
+        }
+
+        self.running = True
+        self.flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flush_thread.start()
+
+    def submit(self, event: Dict) -> bool:
+        """Queue one tick event; drops it (and counts the drop) when the queue is full"""
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            with self.lock:
+                self.stats['dropped'] += 1
+            return False
+        with self.lock:
+            self.stats['submitted'] += 1
+        return True
+
+    def _flush_loop(self):
+        """Block for the first tick, then take whatever else is already queued"""
+        while self.running:
+            try:
+                batch = [self.queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        latest = {}
+        start = time.perf_counter()
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for event in batch:
+                payload = self.dumps(event)
+                for channel in self.channels:
+                    publish(pipe, channel, payload)
+                latest[event['symbol']] = event
+            for symbol, event in latest.items():
+                price_key = f"price:{symbol}"
+                pipe.hset(price_key, mapping={'price': event['price'], 'timestamp': event['timestamp']})
+                pipe.expire(price_key, self.price_ttl)
+            pipe.execute()
+            failed = False
+        except Exception as e:
+            failed = True
+            logger.error(f"❌ Error publishing {len(batch)} ticks: {e}")
+        flush_ms = (time.perf_counter() - start) * 1000
+
+        with self.lock:
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = flush_ms
+            if flush_ms > self.stats['max_flush_ms']:
+                self.stats['max_flush_ms'] = flush_ms
+            if failed:
+                self.stats['flush_errors'] += 1
+                self.stats['dropped'] += len(batch)
+            else:
+                self.stats['published'] += len(batch)
+                self.stats['commands'] += len(batch) * len(self.channels) + len(latest) * 2
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+        stats['queued'] = self.queue.qsize()
+        stats['round_trips_per_tick'] = stats['flushes'] / stats['published'] if stats['published'] else 0
+        return stats
+
+    def stop(self):
+        """Stop the flush thread"""
+        self.running = False
+        if self.flush_thread.is_alive():
+            self.flush_thread.join()
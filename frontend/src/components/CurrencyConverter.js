@@ -30,15 +30,10 @@ const CurrencyConverter = ({ priceData, isConnected }) => {
     
     Object.keys(priceData).forEach(symbol => {
       if (symbol.includes('/')) {
-        // Forex pairs
+        // Forex and crypto pairs (e.g. EUR/USD, BTC/USDT)
         const [base, quote] = symbol.split('/');
         if (!currencies.includes(base)) currencies.push(base);
         if (!currencies.includes(quote)) currencies.push(quote);
-      } else if (symbol.includes('USDT')) {
-        // Crypto pairs
-        const crypto = symbol.replace('USDT', '');
-        if (!currencies.includes(crypto)) currencies.push(crypto);
-        if (!currencies.includes('USDT')) currencies.push('USDT');
       }
     });
     return currencies.sort();
@@ -70,8 +65,8 @@ const CurrencyConverter = ({ priceData, isConnected }) => {
         fromRate = priceData[`${fromCurrency}/USD`].price;
       } else if (priceData[`USD/${fromCurrency}`]) {
         fromRate = 1 / priceData[`USD/${fromCurrency}`].price;
-      } else if (priceData[`${fromCurrency}USDT`]) {
-        fromRate = priceData[`${fromCurrency}USDT`].price;
+      } else if (priceData[`${fromCurrency}/USDT`]) {
+        fromRate = priceData[`${fromCurrency}/USDT`].price;
       }
       
       if (toCurrency === 'USD') {
@@ -80,8 +75,8 @@ const CurrencyConverter = ({ priceData, isConnected }) => {
         toRate = priceData[`${toCurrency}/USD`].price;
       } else if (priceData[`USD/${toCurrency}`]) {
         toRate = 1 / priceData[`USD/${toCurrency}`].price;
-      } else if (priceData[`${toCurrency}USDT`]) {
-        toRate = priceData[`${toCurrency}USDT`].price;
+      } else if (priceData[`${toCurrency}/USDT`]) {
+        toRate = priceData[`${toCurrency}/USDT`].price;
       }
       
       rate = toRate / fromRate;
@@ -125,7 +120,7 @@ const CurrencyConverter = ({ priceData, isConnected }) => {
   const getPopularPairs = () => {
     const pairs = [];
     Object.keys(priceData).forEach(symbol => {
-      if (symbol.includes('/') || symbol.includes('USDT')) {
+      if (symbol.includes('/')) {
         pairs.push(symbol);
       }
     });
@@ -205,8 +200,8 @@ const CurrencyConverter = ({ priceData, isConnected }) => {
       return priceData[`${from}/${to}`].price;
     } else if (priceData[`${to}/${from}`]) {
       return 1 / priceData[`${to}/${from}`].price;
-    } else if (priceData[`${from}USDT`] && priceData[`${to}USDT`]) {
-      return priceData[`${to}USDT`].price / priceData[`${from}USDT`].price;
+    } else if (priceData[`${from}/USDT`] && priceData[`${to}/USDT`]) {
+      return priceData[`${to}/USDT`].price / priceData[`${from}/USDT`].price;
     }
     
     return 0;
@@ -4,7 +4,7 @@ import { TrendingUp, AlertTriangle, Activity, DollarSign, BarChart3, PieChart as
 
 const Dashboard = ({ priceData, signals, isConnected, systemStatus }) => {
   const [chartData, setChartData] = useState([]);
-  const [selectedSymbols, setSelectedSymbols] = useState(['BTCUSDT', 'ETHUSDT', 'EUR/USD']);
+  const [selectedSymbols, setSelectedSymbols] = useState(['BTC/USDT', 'ETH/USDT', 'EUR/USD']);
   const [selectedChartType, setSelectedChartType] = useState('line');
   const [arbitrageConfig, setArbitrageConfig] = useState(null);
   const [configLoading, setConfigLoading] = useState(false);
@@ -85,21 +85,21 @@ const Dashboard = ({ priceData, signals, isConnected, systemStatus }) => {
 
   // Color scheme for different symbols
   const symbolColors = {
-    'BTCUSDT': '#F7931A',
-    'ETHUSDT': '#627EEA',
+    'BTC/USDT': '#F7931A',
+    'ETH/USDT': '#627EEA',
     'EUR/USD': '#00D4AA',
     'GBP/USD': '#FF6B6B',
     'USD/JPY': '#4ECDC4',
-    'ADAUSDT': '#0033AD',
-    'DOTUSDT': '#E6007A',
-    'LINKUSDT': '#2A5ADA',
-    'LTCUSDT': '#BFBBBB',
-    'XRPUSDT': '#23292F'
+    'ADA/USDT': '#0033AD',
+    'DOT/USDT': '#E6007A',
+    'LINK/USDT': '#2A5ADA',
+    'LTC/USDT': '#BFBBBB',
+    'XRP/USDT': '#23292F'
   };
 
   // Categorize symbols
   const crypto = Object.keys(priceData).filter(symbol => symbol.includes('USDT'));
-  const forex = Object.keys(priceData).filter(symbol => symbol.includes('/'));
+  const forex = Object.keys(priceData).filter(symbol => symbol.includes('/') && !symbol.includes('USDT'));
 
   // Prepare data for different chart types
   const preparePieData = () => {
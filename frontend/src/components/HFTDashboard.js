@@ -16,7 +16,7 @@ const HFTDashboard = ({ priceData, isConnected }) => {
   const [riskMetrics, setRiskMetrics] = useState({});
   const [tradingSignals, setTradingSignals] = useState([]);
   const [systemHealth, setSystemHealth] = useState({});
-  const [selectedSymbol, setSelectedSymbol] = useState('BTCUSDT');
+  const [selectedSymbol, setSelectedSymbol] = useState('BTC/USDT');
   const [chartData, setChartData] = useState([]);
 
   // Update chart data when priceData changes
@@ -16,7 +16,7 @@ const PriceFeed = ({ priceData, isConnected }) => {
 
   // Categorize symbols
   const crypto = Object.keys(priceData).filter(symbol => symbol.includes('USDT'));
-  const forex = Object.keys(priceData).filter(symbol => symbol.includes('/'));
+  const forex = Object.keys(priceData).filter(symbol => symbol.includes('/') && !symbol.includes('USDT'));
 
   // Prepare data for charts
   const prepareBarData = () => {